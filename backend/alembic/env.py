@@ -2,7 +2,7 @@ from logging.config import fileConfig
 from sqlmodel import SQLModel
 from alembic import context
 from app.config import settings
-from app.models import Professional, Patient, CheckIn  # Importa todos os models
+from app.models import Professional, Patient, CheckIn, RecommendationText, ReturnRule  # Importa todos os models
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,73 @@
+"""patient summary
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.add_column(sa.Column('last_checkin_date', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_weight_kg', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('last_imc', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('next_return_date', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('checkin_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill: resumo calculado a partir do último check-in de cada paciente
+    patients = sa.table(
+        'patients',
+        sa.column('id'),
+        sa.column('last_checkin_date'),
+        sa.column('last_weight_kg'),
+        sa.column('last_imc'),
+        sa.column('next_return_date'),
+        sa.column('checkin_count'),
+    )
+    checkins = sa.table(
+        'checkins',
+        sa.column('id'),
+        sa.column('patient_id'),
+        sa.column('date'),
+        sa.column('weight_kg'),
+        sa.column('imc'),
+        sa.column('next_return_date'),
+    )
+
+    def latest(column):
+        return sa.select(checkins.c[column]).where(
+            checkins.c.patient_id == patients.c.id
+        ).order_by(
+            # Mesmo desempate de app/summary.py (id), senão o backfill pode divergir
+            checkins.c.date.desc(), checkins.c.id.desc()
+        ).limit(1).scalar_subquery()
+
+    op.execute(
+        patients.update().values(
+            last_checkin_date=latest('date'),
+            last_weight_kg=latest('weight_kg'),
+            last_imc=latest('imc'),
+            next_return_date=latest('next_return_date'),
+            checkin_count=sa.select(sa.func.count()).select_from(checkins).where(
+                checkins.c.patient_id == patients.c.id
+            ).scalar_subquery(),
+        )
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.drop_column('checkin_count')
+        batch_op.drop_column('next_return_date')
+        batch_op.drop_column('last_imc')
+        batch_op.drop_column('last_weight_kg')
+        batch_op.drop_column('last_checkin_date')
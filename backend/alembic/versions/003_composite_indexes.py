@@ -0,0 +1,58 @@
+"""composite indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Listagem de pacientes por tenant ordenada por (created_at, id)
+    op.create_index(
+        'ix_patients_professional_created', 'patients',
+        ['professional_id', 'created_at', 'id'], unique=False,
+        postgresql_include=[
+            'full_name', 'goal', 'activity_level', 'last_checkin_date', 'last_imc',
+            'last_weight_kg', 'next_return_date', 'checkin_count'
+        ]
+    )
+    op.create_index(
+        'ix_patients_professional_goal_created', 'patients',
+        ['professional_id', 'goal', 'created_at', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_patients_professional_activity_created', 'patients',
+        ['professional_id', 'activity_level', 'created_at', 'id'], unique=False
+    )
+    # Retornos previstos por tenant
+    op.create_index(
+        'ix_patients_professional_next_return', 'patients',
+        ['professional_id', 'next_return_date'], unique=False
+    )
+    # Histórico do paciente ordenado por (date, id)
+    op.create_index(
+        'ix_checkins_patient_date', 'checkins',
+        ['patient_id', 'date', 'id'], unique=False
+    )
+
+    # Índices de coluna única agora cobertos pelo prefixo dos compostos
+    op.drop_index('ix_patients_professional_id', table_name='patients')
+    op.drop_index('ix_checkins_patient_id', table_name='checkins')
+
+
+def downgrade() -> None:
+    op.create_index('ix_checkins_patient_id', 'checkins', ['patient_id'], unique=False)
+    op.create_index('ix_patients_professional_id', 'patients', ['professional_id'], unique=False)
+    op.drop_index('ix_checkins_patient_date', table_name='checkins')
+    op.drop_index('ix_patients_professional_next_return', table_name='patients')
+    op.drop_index('ix_patients_professional_activity_created', table_name='patients')
+    op.drop_index('ix_patients_professional_goal_created', table_name='patients')
+    op.drop_index('ix_patients_professional_created', table_name='patients')
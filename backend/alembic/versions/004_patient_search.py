@@ -0,0 +1,79 @@
+"""patient name search
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import re
+import unicodedata
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def normalize_name(name: str) -> str:
+    # Cópia de app.search.normalize_name (a migration não depende do código da app)
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[^\W_]+", without_accents.lower()))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.add_column(sa.Column('search_name', sa.String(), nullable=True))
+
+    patients = sa.table(
+        'patients',
+        sa.column('id'),
+        sa.column('full_name'),
+        sa.column('search_name'),
+    )
+    # Em modo offline (--sql) o backfill fica para scripts/search_index.py rebuild
+    rows = [] if context.is_offline_mode() else bind.execute(
+        sa.select(patients.c.id, patients.c.full_name)
+    ).all()
+    if rows:
+        bind.execute(
+            patients.update().where(patients.c.id == sa.bindparam('patient_id')).values(
+                search_name=sa.bindparam('name')
+            ),
+            [{'patient_id': row.id, 'name': normalize_name(row.full_name)} for row in rows]
+        )
+
+    if bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE patients_fts USING fts5("
+            "tenant, search_name, patient_id UNINDEXED, "
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        # ids já estão armazenados como hex de 32 caracteres no SQLite
+        op.execute(
+            "INSERT INTO patients_fts (tenant, search_name, patient_id) "
+            "SELECT professional_id, search_name, id FROM patients"
+        )
+    elif bind.dialect.name == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "CREATE INDEX ix_patients_search_name_trgm "
+            "ON patients USING gin (search_name gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS patients_fts")
+    elif bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_patients_search_name_trgm")
+
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.drop_column('search_name')
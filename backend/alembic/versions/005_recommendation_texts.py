@@ -0,0 +1,111 @@
+"""deduplicated recommendation texts
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+import hashlib
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+# Coluna de texto antiga -> coluna com o id do texto
+TEXT_COLUMNS = {
+    'recommendation_template_diet': 'recommendation_diet_id',
+    'recommendation_template_training': 'recommendation_training_id',
+    'recommendation_template_lifestyle': 'recommendation_lifestyle_id',
+}
+BATCH_SIZE = 5000
+
+
+def text_id(text: str) -> str:
+    # Cópia de app.recommendations.text_id (a migration não depende do código da app)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def upgrade() -> None:
+    if context.is_offline_mode():
+        # Os ids são hashes calculados em Python a partir dos textos existentes
+        raise RuntimeError("A migration 005 move dados e precisa rodar em modo online")
+    bind = op.get_bind()
+
+    op.create_table(
+        'recommendation_texts',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    for id_column in TEXT_COLUMNS.values():
+        op.add_column('checkins', sa.Column(id_column, sa.String(length=32), nullable=True))
+
+    texts = sa.table('recommendation_texts', sa.column('id'), sa.column('text'))
+    checkins = sa.table(
+        'checkins',
+        sa.column('id'),
+        *[sa.column(name) for name in TEXT_COLUMNS],
+        *[sa.column(name) for name in TEXT_COLUMNS.values()]
+    )
+
+    # Percorre os check-ins com algum texto em lotes, por id
+    stored = set()
+    last_id = None
+    while True:
+        statement = sa.select(checkins.c.id, *[checkins.c[name] for name in TEXT_COLUMNS]).where(
+            sa.or_(*[checkins.c[name].isnot(None) for name in TEXT_COLUMNS])
+        ).order_by(checkins.c.id).limit(BATCH_SIZE)
+        if last_id is not None:
+            statement = statement.where(checkins.c.id > last_id)
+        rows = bind.execute(statement).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        new_texts = {}
+        updates = []
+        for row in rows:
+            values = {'checkin_id': row.id}
+            for name, id_column in TEXT_COLUMNS.items():
+                text = getattr(row, name)
+                values[id_column] = text_id(text) if text is not None else None
+                if text is not None and values[id_column] not in stored:
+                    new_texts[values[id_column]] = text
+            updates.append(values)
+
+        if new_texts:
+            bind.execute(texts.insert(), [{'id': key, 'text': text} for key, text in new_texts.items()])
+            stored.update(new_texts)
+        bind.execute(
+            checkins.update().where(checkins.c.id == sa.bindparam('checkin_id')).values(
+                **{id_column: sa.bindparam(id_column) for id_column in TEXT_COLUMNS.values()}
+            ),
+            updates
+        )
+
+    with op.batch_alter_table('checkins') as batch_op:
+        for name, id_column in TEXT_COLUMNS.items():
+            batch_op.drop_column(name)
+            batch_op.create_foreign_key(
+                f'fk_checkins_{id_column}', 'recommendation_texts', [id_column], ['id']
+            )
+
+
+def downgrade() -> None:
+    for name in TEXT_COLUMNS:
+        op.add_column('checkins', sa.Column(name, sa.String(), nullable=True))
+    for name, id_column in TEXT_COLUMNS.items():
+        op.execute(
+            f"UPDATE checkins SET {name} = ("
+            f"SELECT text FROM recommendation_texts WHERE recommendation_texts.id = checkins.{id_column})"
+        )
+
+    with op.batch_alter_table('checkins') as batch_op:
+        for id_column in TEXT_COLUMNS.values():
+            batch_op.drop_constraint(f'fk_checkins_{id_column}', type_='foreignkey')
+            batch_op.drop_column(id_column)
+    op.drop_table('recommendation_texts')
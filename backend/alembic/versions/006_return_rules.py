@@ -0,0 +1,46 @@
+"""return rules per professional
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+try:
+    from sqlalchemy.dialects import postgresql
+    UUID_TYPE = postgresql.UUID(as_uuid=True)
+except ImportError:
+    UUID_TYPE = sa.String(36)  # SQLite fallback
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('return_rules',
+    sa.Column('id', UUID_TYPE, nullable=False),
+    sa.Column('professional_id', UUID_TYPE, nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('goal', sa.String(), nullable=True),
+    sa.Column('adherence', sa.String(), nullable=True),
+    sa.Column('activity_level', sa.String(), nullable=True),
+    sa.Column('imc_class', sa.String(), nullable=True),
+    sa.Column('days', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['professional_id'], ['professionals.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Regras do profissional em ordem de prioridade
+    op.create_index(
+        'ix_return_rules_professional_position', 'return_rules',
+        ['professional_id', 'position'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_return_rules_professional_position', table_name='return_rules')
+    op.drop_table('return_rules')
@@ -0,0 +1,32 @@
+"""row versions for conditional GET
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Linhas existentes começam na versão 1; check-ins nunca editados ficam com updated_at nulo
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    with op.batch_alter_table('checkins') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('checkins') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
+    with op.batch_alter_table('patients') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,24 @@
+"""index for recent check-ins on the dashboard
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_patients_professional_last_checkin', 'patients', ['professional_id', 'last_checkin_date']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_patients_professional_last_checkin', table_name='patients')
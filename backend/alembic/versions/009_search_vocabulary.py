@@ -0,0 +1,48 @@
+"""name terms for typo-tolerant patient search
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # No Postgres a tolerância a erros vem do pg_trgm (migration 004)
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE TABLE patient_search_terms ("
+        "tenant VARCHAR NOT NULL, term VARCHAR NOT NULL, initial VARCHAR NOT NULL, "
+        "length INTEGER NOT NULL, PRIMARY KEY (tenant, term))"
+    )
+    op.execute("CREATE INDEX ix_patient_search_terms_lookup ON patient_search_terms (tenant, initial, length)")
+    # Em modo offline (--sql) o preenchimento fica para scripts/search_index.py rebuild
+    rows = [] if context.is_offline_mode() else bind.execute(
+        sa.text("SELECT professional_id, search_name FROM patients WHERE search_name IS NOT NULL")
+    ).all()
+    # O tenant é o professional_id em hex, como no índice FTS (patients_fts.tenant)
+    terms = {(tenant, term) for tenant, name in rows for term in name.split()}
+    if terms:
+        bind.execute(
+            sa.text(
+                "INSERT INTO patient_search_terms (tenant, term, initial, length) "
+                "VALUES (:tenant, :term, :initial, :length)"
+            ),
+            [{'tenant': tenant, 'term': term, 'initial': term[0], 'length': len(term)} for tenant, term in terms]
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS patient_search_terms")
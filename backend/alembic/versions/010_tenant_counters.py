@@ -0,0 +1,65 @@
+"""tenant counters for the dashboard
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+try:
+    from sqlalchemy.dialects import postgresql
+    UUID_TYPE = postgresql.UUID(as_uuid=True)
+except ImportError:
+    UUID_TYPE = sa.String(36)  # SQLite fallback
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('tenant_counters',
+    sa.Column('professional_id', UUID_TYPE, nullable=False),
+    sa.Column('patients', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['professional_id'], ['professionals.id'], ),
+    sa.PrimaryKeyConstraint('professional_id')
+    )
+    op.create_table('tenant_daily_counters',
+    sa.Column('professional_id', UUID_TYPE, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('checkins', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('returns', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['professional_id'], ['professionals.id'], ),
+    sa.PrimaryKeyConstraint('professional_id', 'day')
+    )
+    # O dashboard passa a ler os contadores; o índice da migration 008 servia só a ele
+    op.drop_index('ix_patients_professional_last_checkin', table_name='patients')
+
+    # Mesmo cálculo de app/tenant_counters.rebuild_tenant_counters
+    day = 'date({})' if op.get_bind().dialect.name == 'sqlite' else 'CAST({} AS DATE)'
+    op.execute(
+        "INSERT INTO tenant_counters (professional_id, patients) "
+        "SELECT professional_id, count(*) FROM patients GROUP BY professional_id"
+    )
+    op.execute(
+        "INSERT INTO tenant_daily_counters (professional_id, day, checkins, returns) "
+        "SELECT professional_id, day, sum(checkins), sum(returns) FROM ("
+        f"SELECT patients.professional_id AS professional_id, {day.format('checkins.date')} AS day, "
+        "1 AS checkins, 0 AS returns "
+        "FROM checkins JOIN patients ON patients.id = checkins.patient_id "
+        "UNION ALL "
+        f"SELECT professional_id, {day.format('next_return_date')}, 0, 1 "
+        "FROM patients WHERE next_return_date IS NOT NULL"
+        ") AS events GROUP BY professional_id, day"
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_patients_professional_last_checkin', 'patients', ['professional_id', 'last_checkin_date']
+    )
+    op.drop_table('tenant_daily_counters')
+    op.drop_table('tenant_counters')
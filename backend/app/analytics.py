@@ -0,0 +1,370 @@
+from datetime import datetime, timedelta
+from operator import itemgetter
+from typing import Optional
+from uuid import UUID
+import numpy as np
+from sqlalchemy import String, cast, exists
+from sqlmodel import Session, select
+from app.models import CheckIn, Goal, Patient
+from app.utils import IMC_CLASS_BOUNDS, IMC_CLASSES
+
+# Análises antropométricas sobre o histórico inteiro, em uma passada
+# vetorizada: os check-ins são lidos em colunas, agrupados por paciente e em
+# ordem de data, e cada métrica por paciente é uma redução (np.*.reduceat)
+# sobre o trecho do paciente. Valores ausentes viram NaN e são ignorados.
+#
+# A leitura (load_checkin_rows) roda em session.run_sync; a montagem das colunas
+# e as contas (*_from_rows) são só CPU e os endpoints as levam para uma thread,
+# para não travar o event loop nas coortes grandes.
+
+SECONDS_PER_WEEK = 7 * 24 * 3600
+# Variação semanal aceita como "manutenção" (kg/semana, em módulo)
+MAINTENANCE_TOLERANCE_KG_PER_WEEK = 0.25
+# Casas decimais dos valores devolvidos pelos endpoints
+PRECISION = 3
+# Sentido esperado do peso por objetivo; 0 = manter
+GOAL_DIRECTION = {
+    Goal.EMAGRECIMENTO: -1,
+    Goal.HIPERTROFIA: 1,
+    Goal.MANUTENCAO: 0,
+    Goal.SAUDE_GERAL: 0,
+}
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Colunas lidas por check-in. O paciente vem como texto (só para achar as
+# fronteiras entre pacientes, sem converter um UUID por linha); altura e
+# objetivo vêm uma vez por paciente.
+CHECKIN_COLUMNS = [
+    cast(CheckIn.patient_id, String).label("patient_key"),
+    CheckIn.date,
+    CheckIn.weight_kg,
+    CheckIn.waist_cm,
+    CheckIn.hip_cm,
+    CheckIn.body_fat_pct,
+]
+PATIENT_COLUMNS = [
+    cast(Patient.id, String).label("patient_key"),
+    Patient.id,
+    Patient.height_cm,
+    Patient.goal,
+]
+
+
+class CheckInArrays:
+    """Colunas dos check-ins agrupados por paciente (em ordem de data) e o início de cada paciente
+
+    rows segue CHECKIN_COLUMNS; patients mapeia a chave de texto do paciente
+    para (id, altura, objetivo).
+    """
+
+    def __init__(self, rows, patients: dict[str, tuple]):
+        # Uma passada por coluna (itemgetter) é bem mais rápida que zip(*rows)
+        keys, dates, weight, waist, hip, body_fat = (
+            list(map(itemgetter(i), rows)) for i in range(len(CHECKIN_COLUMNS))
+        )
+        # datetime -> microssegundos inteiros em Python é bem mais rápido que np.array(dates)
+        self.dates = np.fromiter(
+            ((date - EPOCH) // MICROSECOND for date in dates), np.int64, len(dates)
+        ).astype("datetime64[us]")
+        self.weight = np.array(weight, dtype=float)
+        self.waist = np.array(waist, dtype=float)
+        self.hip = np.array(hip, dtype=float)
+        self.body_fat = np.array(body_fat, dtype=float)
+
+        # Fronteiras entre pacientes: linhas onde a chave muda
+        self.starts = np.array(
+            [0] + [i for i in range(1, len(keys)) if keys[i] != keys[i - 1]] if keys else [],
+            dtype=np.intp
+        )
+        self.counts = np.diff(np.r_[self.starts, len(keys)])
+        groups = [patients[keys[start]] for start in self.starts]
+        self.patient_ids = [patient_id for patient_id, _, _ in groups]
+        self.goals = [goal for _, _, goal in groups]
+        self.height = np.repeat(np.array([height for _, height, _ in groups], dtype=float), self.counts)
+
+        # Semanas desde o primeiro check-in do paciente (eixo x das tendências)
+        seconds = self.dates.astype(np.int64) / 1e6
+        self.weeks = (seconds - np.repeat(seconds[self.starts], self.counts)) / SECONDS_PER_WEEK
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+class CohortTooLarge(Exception):
+    """Mais check-ins que o limite da análise: a requisição deve ser recusada"""
+
+    def __init__(self, max_checkins: int):
+        super().__init__(max_checkins)
+        self.max_checkins = max_checkins
+
+
+def load_checkin_rows(
+    session: Session,
+    patient_filters: list,
+    checkin_filters: list,
+    max_checkins: Optional[int] = None
+) -> tuple[list, dict[str, tuple]]:
+    """Lê os check-ins dos pacientes filtrados (agrupados por paciente, em ordem de data) e os pacientes
+
+    Devolve o que CheckInArrays recebe. Com max_checkins, lê no máximo uma
+    linha além do limite e levanta CohortTooLarge se passar dele.
+    """
+    statement = (
+        select(*CHECKIN_COLUMNS)
+        .join(Patient, Patient.id == CheckIn.patient_id)
+        .where(*patient_filters, *checkin_filters)
+        # Pacientes na ordem de ix_patients_professional_created e, de cada um,
+        # os check-ins por ix_checkins_patient_date: não ordena o resultado inteiro
+        .order_by(Patient.created_at, Patient.id, CheckIn.date, CheckIn.id)
+    )
+    if max_checkins:
+        statement = statement.limit(max_checkins + 1)
+    rows = session.exec(statement).all()
+    if max_checkins and len(rows) > max_checkins:
+        raise CohortTooLarge(max_checkins)
+    if not rows:
+        return [], {}
+    # Só os pacientes que aparecem nos check-ins
+    patients = session.exec(
+        select(*PATIENT_COLUMNS).where(
+            *patient_filters,
+            exists().where(CheckIn.patient_id == Patient.id, *checkin_filters)
+        )
+    ).all()
+    return rows, {key: (patient_id, height, goal) for key, patient_id, height, goal in patients}
+
+
+def load_checkin_arrays(session: Session, patient_filters: list, checkin_filters: list) -> CheckInArrays:
+    """Lê os check-ins dos pacientes filtrados em colunas (leitura e montagem na mesma thread)"""
+    return CheckInArrays(*load_checkin_rows(session, patient_filters, checkin_filters))
+
+
+def imc(weight_kg: np.ndarray, height_cm: np.ndarray) -> np.ndarray:
+    """IMC por linha (calculate_imc vetorizado, sem arredondar)"""
+    return weight_kg / (height_cm / 100) ** 2
+
+
+def waist_hip_ratio(waist_cm: np.ndarray, hip_cm: np.ndarray) -> np.ndarray:
+    """Relação cintura/quadril por linha; NaN sem as duas medidas"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(hip_cm > 0, waist_cm / hip_cm, np.nan)
+
+
+def imc_class_indices(values: np.ndarray) -> np.ndarray:
+    """Índice em IMC_CLASSES de cada IMC (classify_imc vetorizado); -1 para NaN"""
+    indices = np.searchsorted(IMC_CLASS_BOUNDS, values, side="right")
+    return np.where(np.isnan(values), -1, indices)
+
+
+def group_last(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Último valor não nulo de cada grupo (NaN se o grupo não tem nenhum)"""
+    if not len(starts):
+        return np.zeros(0)
+    positions = np.where(np.isnan(values), -1, np.arange(len(values)))
+    last = np.maximum.reduceat(positions, starts)
+    return np.where(last >= starts, values[np.maximum(last, 0)], np.nan)
+
+
+def group_first(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Primeiro valor não nulo de cada grupo (NaN se o grupo não tem nenhum)"""
+    if not len(starts):
+        return np.zeros(0)
+    positions = np.where(np.isnan(values), len(values), np.arange(len(values)))
+    first = np.minimum.reduceat(positions, starts)
+    ends = np.r_[starts[1:], len(values)]
+    return np.where(first < ends, values[np.minimum(first, len(values) - 1)], np.nan)
+
+
+def group_slopes(x: np.ndarray, y: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Inclinação da reta de mínimos quadrados de y em x por grupo (NaN com menos de 2 pontos)"""
+    if not len(starts):
+        return np.zeros(0)
+    valid = ~np.isnan(y)
+    x = np.where(valid, x, 0.0)
+    y = np.where(valid, y, 0.0)
+    n = np.add.reduceat(valid.astype(float), starts)
+    sx = np.add.reduceat(x, starts)
+    sy = np.add.reduceat(y, starts)
+    sxx = np.add.reduceat(x * x, starts)
+    sxy = np.add.reduceat(x * y, starts)
+    denominator = n * sxx - sx * sx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = (n * sxy - sx * sy) / denominator
+    return np.where((n >= 2) & (np.abs(denominator) > 1e-12), slopes, np.nan)
+
+
+def patient_metrics(arrays: CheckInArrays) -> dict[str, np.ndarray]:
+    """Métricas por paciente (uma posição por paciente, na ordem de arrays.patient_ids)"""
+    starts = arrays.starts
+    ends = np.r_[starts[1:], len(arrays)] - 1 if len(starts) else starts
+    imc_values = imc(arrays.weight, arrays.height)
+    whr = waist_hip_ratio(arrays.waist, arrays.hip)
+
+    first_weight = group_first(arrays.weight, starts)
+    last_weight = group_last(arrays.weight, starts)
+    weight_change = last_weight - first_weight
+    weight_rate = group_slopes(arrays.weeks, arrays.weight, starts)
+    last_imc = group_last(imc_values, starts)
+
+    direction = np.array([GOAL_DIRECTION.get(goal, 0) for goal in arrays.goals], dtype=float)
+    with np.errstate(invalid="ignore"):
+        on_track = np.where(
+            direction == 0,
+            np.abs(weight_rate) <= MAINTENANCE_TOLERANCE_KG_PER_WEEK,
+            weight_rate * direction > 0
+        )
+    return {
+        "checkin_count": arrays.counts,
+        "first_date": arrays.dates[starts],
+        "last_date": arrays.dates[ends],
+        "weight_kg": last_weight,
+        "weight_change_kg": weight_change,
+        "weight_rate_kg_per_week": weight_rate,
+        "goal_progress_kg": np.where(direction == 0, np.nan, weight_change * direction),
+        # Sem tendência (menos de 2 pesos) não há como avaliar
+        "on_track": np.where(np.isnan(weight_rate), np.nan, on_track),
+        "imc": last_imc,
+        "imc_class": imc_class_indices(last_imc),
+        "waist_hip_ratio": group_last(whr, starts),
+        "body_fat_pct": group_last(arrays.body_fat, starts),
+        "body_fat_rate_pct_per_week": group_slopes(arrays.weeks, arrays.body_fat, starts),
+    }
+
+
+def nan_to_none(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else round(value, PRECISION)
+
+
+def date_filters(date_from: Optional[datetime], date_to: Optional[datetime]) -> list:
+    filters = []
+    if date_from:
+        filters.append(CheckIn.date >= date_from)
+    if date_to:
+        filters.append(CheckIn.date <= date_to)
+    return filters
+
+
+def load_patient_rows(
+    session: Session,
+    patient_id: UUID,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> tuple[list, dict[str, tuple]]:
+    return load_checkin_rows(session, [Patient.id == patient_id], date_filters(date_from, date_to))
+
+
+def patient_analytics_from_rows(patient_id: UUID, rows: list, patients: dict[str, tuple]) -> Optional[dict]:
+    """Métricas e séries derivadas (IMC, cintura/quadril) de um paciente; None sem check-ins"""
+    arrays = CheckInArrays(rows, patients)
+    if not len(arrays):
+        return None
+
+    metrics = patient_metrics(arrays)
+    imc_class = int(metrics["imc_class"][0])
+    on_track = metrics["on_track"][0]
+    return {
+        "patient_id": patient_id,
+        "goal": arrays.goals[0],
+        "checkin_count": int(metrics["checkin_count"][0]),
+        "first_date": metrics["first_date"][0].item(),
+        "last_date": metrics["last_date"][0].item(),
+        **{
+            name: nan_to_none(metrics[name][0]) for name in (
+                "weight_kg", "weight_change_kg", "weight_rate_kg_per_week", "goal_progress_kg",
+                "imc", "waist_hip_ratio", "body_fat_pct", "body_fat_rate_pct_per_week"
+            )
+        },
+        "imc_class": IMC_CLASSES[imc_class] if imc_class >= 0 else None,
+        "on_track": None if np.isnan(on_track) else bool(on_track),
+        # orjson escreve NaN como null
+        "series": {
+            "dates": arrays.dates.astype(datetime).tolist(),
+            "imc": np.round(imc(arrays.weight, arrays.height), 2).tolist(),
+            "waist_hip_ratio": np.round(waist_hip_ratio(arrays.waist, arrays.hip), 3).tolist(),
+        },
+    }
+
+
+def summarize(values: np.ndarray) -> dict:
+    """Média e mediana ignorando NaN (None se não há valores)"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"mean": None, "median": None}
+    return {"mean": round(float(values.mean()), PRECISION), "median": round(float(np.median(values)), PRECISION)}
+
+
+def compute_patient_analytics(
+    session: Session,
+    patient_id: UUID,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Optional[dict]:
+    """load_patient_rows e patient_analytics_from_rows na mesma thread (scripts)"""
+    return patient_analytics_from_rows(patient_id, *load_patient_rows(session, patient_id, date_from, date_to))
+
+
+def load_cohort_rows(
+    session: Session,
+    professional_id: UUID,
+    goal: Optional[Goal] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    max_checkins: Optional[int] = None
+) -> tuple[list, dict[str, tuple]]:
+    patient_filters = [Patient.professional_id == professional_id]
+    if goal:
+        patient_filters.append(Patient.goal == goal)
+    return load_checkin_rows(session, patient_filters, date_filters(date_from, date_to), max_checkins)
+
+
+def cohort_analytics_from_rows(rows: list, patients: dict[str, tuple]) -> dict:
+    """Agregados do tenant: distribuição de IMC e tendências por objetivo
+
+    As métricas são calculadas por paciente (como em /patients/{id}/analytics)
+    e depois agregadas; só entram pacientes com check-ins no intervalo.
+    """
+    arrays = CheckInArrays(rows, patients)
+    metrics = patient_metrics(arrays)
+
+    imc_classes = metrics["imc_class"]
+    class_counts = np.bincount(imc_classes[imc_classes >= 0], minlength=len(IMC_CLASSES))
+    goals = np.array([patient_goal.value for patient_goal in arrays.goals], dtype=object)
+
+    by_goal = []
+    for patient_goal in Goal:
+        mask = goals == patient_goal.value
+        if not mask.any():
+            continue
+        on_track = metrics["on_track"][mask]
+        by_goal.append({
+            "goal": patient_goal,
+            "patients": int(mask.sum()),
+            "on_track": int(np.nansum(on_track)),
+            "evaluated": int((~np.isnan(on_track)).sum()),
+            "weight_change_kg": summarize(metrics["weight_change_kg"][mask]),
+            "weight_rate_kg_per_week": summarize(metrics["weight_rate_kg_per_week"][mask]),
+            "waist_hip_ratio": summarize(metrics["waist_hip_ratio"][mask]),
+            "body_fat_rate_pct_per_week": summarize(metrics["body_fat_rate_pct_per_week"][mask]),
+        })
+
+    return {
+        "patients": len(arrays.patient_ids),
+        "checkins": len(arrays),
+        "imc_classes": dict(zip(IMC_CLASSES, class_counts.tolist())),
+        "imc": summarize(metrics["imc"]),
+        "goals": by_goal,
+    }
+
+
+def compute_cohort_analytics(
+    session: Session,
+    professional_id: UUID,
+    goal: Optional[Goal] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> dict:
+    """load_cohort_rows e cohort_analytics_from_rows na mesma thread (scripts)"""
+    return cohort_analytics_from_rows(*load_cohort_rows(session, professional_id, goal, date_from, date_to))
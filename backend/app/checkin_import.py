@@ -0,0 +1,218 @@
+import codecs
+import csv
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional, Union
+from uuid import UUID, uuid4
+from pydantic import ValidationError
+from sqlmodel import Session, select
+from app.models import Patient, CheckIn
+from app.schemas import CheckInCreate
+from app.recommendations import intern_texts
+from app.summary import backfill_patient_summaries
+from app.tenant_counters import add_daily, checkin_days
+from app.return_rules import get_return_rules
+from app.utils import calculate_imc
+
+IMPORT_FORMATS = ("csv", "ndjson")
+IMPORT_BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+# Registro lido: (linha de origem, campos) ou (linha de origem, mensagem de erro)
+Record = tuple[int, Union[dict, str]]
+
+
+class RecordParser:
+    """Converte linhas de CSV (com cabeçalho) ou NDJSON em registros, uma linha por vez
+
+    Alimentado incrementalmente (feed), serve tanto ao upload em streaming
+    quanto à leitura de arquivo. Campos CSV entre aspas podem conter quebras
+    de linha: a linha só é processada quando as aspas estão balanceadas.
+    """
+
+    def __init__(self, fmt: str):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Formato inválido: {fmt}")
+        self.fmt = fmt
+        self.header: Optional[list[str]] = None
+        self.line_number = 0
+        self._pending: list[str] = []
+        self._pending_start = 0
+
+    def feed(self, line: str) -> Optional[Record]:
+        self.line_number += 1
+        if self.fmt == "ndjson":
+            if not line.strip():
+                return None
+            try:
+                values = json.loads(line)
+            except ValueError as e:
+                return self.line_number, f"JSON inválido: {e}"
+            if not isinstance(values, dict):
+                return self.line_number, "Cada linha deve ser um objeto JSON"
+            return self.line_number, values
+
+        if not self._pending:
+            self._pending_start = self.line_number
+        self._pending.append(line)
+        text = "\n".join(self._pending)
+        if text.count('"') % 2:
+            return None
+        self._pending = []
+
+        if not text.strip():
+            return None
+        fields = next(csv.reader([text]))
+        if self.header is None:
+            self.header = [field.strip() for field in fields]
+            return None
+        if len(fields) != len(self.header):
+            return self._pending_start, f"Esperadas {len(self.header)} colunas, encontradas {len(fields)}"
+        # Célula vazia equivale a campo ausente
+        return self._pending_start, {key: value for key, value in zip(self.header, fields) if value != ""}
+
+    def finish(self) -> Optional[Record]:
+        if self._pending:
+            self._pending = []
+            return self._pending_start, "Aspas não fechadas no fim do arquivo"
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Divide o corpo recebido em streaming em linhas de texto UTF-8"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'linha'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+def load_patients(
+    session: Session,
+    professional_id: UUID,
+    patient_ids: set[UUID],
+    patients: dict[UUID, Optional[tuple]]
+) -> None:
+    """Carrega (altura, objetivo, nível de atividade) dos pacientes ainda não vistos; ausentes ou de outro tenant ficam None"""
+    missing = patient_ids - patients.keys()
+    if not missing:
+        return
+    rows = session.exec(
+        select(Patient.id, Patient.height_cm, Patient.goal, Patient.activity_level).where(
+            Patient.professional_id == professional_id,
+            Patient.id.in_(missing)
+        )
+    ).all()
+    for patient_id in missing:
+        patients[patient_id] = None
+    for patient_id, height_cm, goal, activity_level in rows:
+        patients[patient_id] = (height_cm, goal, activity_level)
+
+
+def import_batch(
+    session: Session,
+    professional_id: UUID,
+    records: list[Record],
+    patients: dict[UUID, Optional[tuple]]
+) -> tuple[int, list[tuple[int, str]]]:
+    """Valida e insere um lote de registros (sem commit); retorna (inseridos, erros por linha)
+
+    patients é o cache de pacientes do tenant compartilhado entre lotes.
+    """
+    errors = []
+    parsed = []
+    for line, values in records:
+        if isinstance(values, str):
+            errors.append((line, values))
+            continue
+        try:
+            patient_id = UUID(str(values.get("patient_id", "")))
+        except ValueError:
+            errors.append((line, "patient_id: UUID inválido"))
+            continue
+        try:
+            data = CheckInCreate.model_validate(values)
+        except ValidationError as e:
+            errors.append((line, format_validation_error(e)))
+            continue
+        parsed.append((line, patient_id, data))
+
+    load_patients(session, professional_id, {patient_id for _, patient_id, _ in parsed}, patients)
+
+    now = datetime.utcnow()
+    rows = []
+    suggest = []
+    for line, patient_id, data in parsed:
+        patient = patients[patient_id]
+        if patient is None:
+            errors.append((line, "Paciente não encontrado"))
+            continue
+        height_cm, goal, activity_level = patient
+        row = {
+            "id": uuid4(),
+            "patient_id": patient_id,
+            **data.model_dump(),
+            "imc": calculate_imc(data.weight_kg, height_cm),
+            "created_at": now,
+        }
+        if row["next_return_date"] is None:
+            suggest.append((row, goal, activity_level))
+        rows.append(row)
+
+    if suggest:
+        # Próximo retorno sugerido para o lote inteiro de uma vez
+        rules = get_return_rules(session, professional_id)
+        suggested = rules.next_return_dates(
+            [row["date"] for row, _, _ in suggest],
+            [goal for _, goal, _ in suggest],
+            [row["adherence"] for row, _, _ in suggest],
+            [activity_level for _, _, activity_level in suggest],
+            [row["imc"] for row, _, _ in suggest]
+        )
+        for (row, _, _), next_return in zip(suggest, suggested):
+            row["next_return_date"] = next_return
+
+    if rows:
+        # executemany direto na tabela, sem o bulk insert do ORM; o resumo
+        # dos pacientes afetados e os contadores do tenant mudam na mesma transação
+        intern_texts(session, rows)
+        session.execute(CheckIn.__table__.insert(), rows)
+        add_daily(session, checkins=checkin_days(professional_id, [row["date"] for row in rows]))
+        backfill_patient_summaries(session, professional_id, {row["patient_id"] for row in rows}, touch=True)
+
+    return len(rows), sorted(errors)
+
+
+class ImportResult:
+    """Acumula o resultado de uma importação em lotes"""
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def add(self, imported: int, errors: list[tuple[int, str]]) -> None:
+        self.imported += imported
+        self.failed += len(errors)
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        self.errors.extend({"line": line, "error": error} for line, error in errors[:room])
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
@@ -5,6 +5,29 @@ from typing import List
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./enutri.db"
+    DATABASE_ASYNC: bool = True  # AsyncSession (asyncpg/aiosqlite); False usa a sessão síncrona em threads
+    ASYNC_DATABASE_URL: str = ""  # Vazio: derivada de DATABASE_URL
+    DB_POOL_SIZE: int = 5  # Conexões mantidas por engine (por worker)
+    DB_MAX_OVERFLOW: int = 10  # Conexões extras sob pico
+    DB_POOL_TIMEOUT: int = 10  # Segundos esperando conexão livre antes de erro
+    DB_POOL_RECYCLE: int = 1800  # Recria conexões mais antigas que isso (segundos)
+    DB_POOL_PRE_PING: bool = True  # Descarta conexões mortas antes de usar
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Postgres: statement_timeout por conexão
+    SQLITE_JOURNAL_MODE: str = "wal"
+    SQLITE_SYNCHRONOUS: str = "normal"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    
+    # Métricas de requisição (/metrics) e log de consultas lentas (sem valores)
+    METRICS_ENABLED: bool = True
+    SLOW_QUERY_MS: int = 200  # Consultas a partir disso vão para o log como warning; 0 desabilita
+    
+    # Perfil de requisições sob demanda (ver app/profiling.py)
+    PROFILING_ENABLED: bool = False  # False não registra o middleware
+    PROFILING_TOKEN: str = ""  # Header X-Profile com este valor perfila a requisição; vazio desabilita o header
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fração das requisições perfiladas por amostragem
+    PROFILING_ENGINE: str = "cprofile"  # cprofile (.pstats) ou pyinstrument (.speedscope.json, requer o pacote)
+    PROFILING_DIR: str = "./profiles"
+    PROFILING_MAX_FILES: int = 100  # Buffer circular: os perfis mais antigos são apagados
     
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -13,6 +36,31 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    PASSWORD_HASH_WORKERS: int = 0  # Threads do bcrypt; 0 = número de núcleos
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Tarefas na fila além das threads antes de recusar (503)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # Cache do profissional autenticado; 0 desabilita
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Importação/exportação em lote
+    BULK_PROCESS_WORKERS: int = 0  # Processos para validação e Fernet; 0 = número de núcleos, 1 = sem pool
+    
+    # Análises (/analytics/cohort)
+    ANALYTICS_COHORT_MAX_CHECKINS: int = 500000  # Acima disso a coorte é recusada (422); 0 = sem limite
+    
+    # Cache de leitura por paciente (detalhe e check-ins; ver app/read_cache.py)
+    READ_CACHE_BACKEND: str = ""  # redis (requer o pacote redis), memory (só com um worker) ou none; vazio = redis se READ_CACHE_URL, senão none
+    READ_CACHE_URL: str = ""  # redis://host:6379/0 com READ_CACHE_BACKEND=redis
+    READ_CACHE_TTL_SECONDS: int = 300  # 0 desabilita
+    READ_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Limite do backend memory, por worker
+    
+    # Templates de recomendação
+    TEMPLATES_DIR: str = ""  # Diretório com <objetivo>/<tipo>.txt personalizados; vazio = padrões embutidos
+    TEMPLATES_CACHE_MAX_AGE: int = 300  # Cache-Control max-age (segundos) das respostas de templates
+    PATIENT_GOAL_CACHE_TTL_SECONDS: int = 10  # Cache do objetivo do paciente, por worker; 0 desabilita
+    PATIENT_GOAL_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Servidor
+    WEB_CONCURRENCY: int = 1  # Workers do uvicorn/gunicorn (ambos leem esta variável); caches por worker dependem dele
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000"
@@ -23,6 +71,8 @@ class Settings(BaseSettings):
     RETURN_RULE_MANUTENCAO: int = 30
     RETURN_RULE_SAUDE_GERAL: int = 30
     RETURN_RULE_REDUCAO_ADESAO_BAIXA: int = 7
+    RETURN_RULE_CACHE_TTL_SECONDS: int = 300  # Cache das regras compiladas por profissional; 0 desabilita
+    RETURN_RULE_CACHE_MAX_ENTRIES: int = 10000
     
     class Config:
         env_file = ".env"
@@ -1,18 +1,167 @@
+from typing import Any, Callable, Optional
+from sqlalchemy import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
+from app.engine import configure_engine, engine_options
+from app.search import init_search_backend
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=False
+# Drivers assíncronos usados para cada driver síncrono
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+
+def to_async_url(url: str) -> str:
+    """Converte a URL síncrona para o driver assíncrono equivalente"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {parsed.get_backend_name()}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def create_engine_for(url: str) -> Engine:
+    return configure_engine(create_engine(url, **engine_options(url)))
+
+
+def create_async_engine_for(url: str, async_url: Optional[str] = None) -> AsyncEngine:
+    async_url = async_url or to_async_url(url)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    configure_engine(async_engine.sync_engine)
+    return async_engine
+
+
+# Engine síncrona: migrações, scripts e criação de tabelas
+engine = create_engine_for(settings.DATABASE_URL)
+
+async_engine: Optional[AsyncEngine] = (
+    create_async_engine_for(settings.DATABASE_URL, settings.ASYNC_DATABASE_URL or None)
+    if settings.DATABASE_ASYNC else None
 )
 
 
 def init_db():
     SQLModel.metadata.create_all(engine)
+    init_search_backend(engine)
+
+
+class BufferedResult:
+    """Resultado já lido por completo (mesma interface usada dos resultados do SQLAlchemy)"""
+
+    def __init__(self, rows: list):
+        self._rows = rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def all(self) -> list:
+        return list(self._rows)
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+    def one_or_none(self):
+        if len(self._rows) > 1:
+            raise MultipleResultsFound("Mais de uma linha encontrada")
+        return self.first()
+
+    def one(self):
+        if not self._rows:
+            raise NoResultFound("Nenhuma linha encontrada")
+        return self.one_or_none()
+
+
+class StreamedResult:
+    """Resultado com cursor aberto, lido em partições no threadpool (como AsyncResult.partitions)"""
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size: Optional[int] = None):
+        partitions = self._result.partitions(size)
+        while True:
+            partition = await run_in_threadpool(next, partitions, None)
+            if partition is None:
+                return
+            yield partition
+
+    async def close(self) -> None:
+        await run_in_threadpool(self._result.close)
+
+
+class ThreadedSession:
+    """Adaptador com a interface de AsyncSession sobre a Session síncrona
+
+    Cada operação de I/O roda no threadpool, então o event loop não bloqueia
+    mesmo com DATABASE_ASYNC desabilitado.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def get_bind(self):
+        return self.sync_session.get_bind()
+
+    async def exec(self, statement, **kwargs):
+        def execute():
+            result = self.sync_session.exec(statement, **kwargs)
+            if hasattr(result, "returns_rows") and not result.returns_rows:
+                return result
+            return BufferedResult(result.all())
+        return await run_in_threadpool(execute)
+
+    async def stream(self, statement, **kwargs) -> StreamedResult:
+        return StreamedResult(await run_in_threadpool(self.sync_session.execute, statement, **kwargs))
+
+    async def get(self, entity, ident):
+        return await run_in_threadpool(self.sync_session.get, entity, ident)
+
+    async def run_sync(self, fn: Callable[..., Any], *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def flush(self) -> None:
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self) -> None:
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.refresh, instance)
+
+    async def delete(self, instance) -> None:
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
 
+def make_session_dependency(sync_engine: Engine, async_engine: Optional[AsyncEngine] = None):
+    """Cria a dependência de sessão: AsyncSession se houver engine assíncrona, senão ThreadedSession"""
+    async def get_session():
+        if async_engine is not None:
+            # expire_on_commit=False: atributos não são recarregados implicitamente após commit
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                yield session
+        else:
+            session = ThreadedSession(Session(sync_engine, expire_on_commit=False))
+            try:
+                yield session
+            finally:
+                await session.close()
+    return get_session
 
-def get_session():
-    with Session(engine) as session:
-        yield session
 
+get_session = make_session_dependency(engine, async_engine)
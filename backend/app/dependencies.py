@@ -1,9 +1,11 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from uuid import UUID
 from app.database import get_session
 from app.models import Professional
+from app.principals import principal_cache
 from app.security import decode_token
 
 security = HTTPBearer()
@@ -11,7 +13,7 @@ security = HTTPBearer()
 
 async def get_current_professional(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> Professional:
     token = credentials.credentials
     payload = decode_token(token)
@@ -38,8 +40,12 @@ async def get_current_professional(
             detail="Token inválido",
         )
     
+    professional = principal_cache.get(professional_id_uuid)
+    if professional is not None:
+        return professional
+    
     statement = select(Professional).where(Professional.id == professional_id_uuid)
-    professional = session.exec(statement).first()
+    professional = (await session.exec(statement)).first()
     
     if professional is None:
         raise HTTPException(
@@ -47,5 +53,6 @@ async def get_current_professional(
             detail="Profissional não encontrado",
         )
     
+    principal_cache.put(professional)
     return professional
 
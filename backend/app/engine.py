@@ -0,0 +1,185 @@
+import time
+from typing import Optional
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from app.config import settings
+from app.metrics import instrument_engine, render_samples
+from app.search import register_sqlite_functions
+
+
+class PoolMetrics:
+    """Contadores de checkout do pool (o tamanho e o overflow vêm do próprio pool)"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class TimedPoolMixin:
+    """Mede quanto tempo cada checkout esperou por uma conexão livre"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.record(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """Argumentos de create_engine/create_async_engine ajustados por banco"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    options = {"echo": False}
+    connect_args = {}
+
+    if backend == "sqlite":
+        # busy timeout do driver: espera o lock de escrita em vez de falhar na hora
+        connect_args["timeout"] = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+        if not is_async:
+            connect_args["check_same_thread"] = False
+        if is_memory_sqlite(url):
+            # Banco em memória usa o pool padrão do dialeto (uma conexão por thread)
+            return {**options, "connect_args": connect_args}
+    elif backend == "postgresql":
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    options.update(
+        connect_args=connect_args,
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def configure_engine(engine: Engine) -> Engine:
+    """Aplica os PRAGMAs e as funções da busca do SQLite a cada nova conexão e instrumenta as consultas (ver app/metrics.py)
+
+    Para engines assíncronas, passar .sync_engine.
+    """
+    instrument_engine(engine)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def set_sqlite_functions(dbapi_connection, connection_record):
+            register_sqlite_functions(dbapi_connection)
+
+    if engine.dialect.name == "sqlite" and not is_memory_sqlite(str(engine.url)):
+        @event.listens_for(engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.close()
+
+    return engine
+
+
+def pool_stats(engine: Engine) -> dict:
+    pool: Pool = engine.pool
+    stats = {"dialect": engine.dialect.name, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            avg_wait_ms=round(metrics.wait_seconds_total / metrics.checkouts * 1000, 3) if metrics.checkouts else 0.0,
+            max_wait_ms=round(metrics.wait_seconds_max * 1000, 3),
+        )
+    return stats
+
+
+
+# Métricas de pool em /metrics: (nome sem o prefixo db_pool_, ajuda, tipo)
+POOL_METRICS = (
+    ("size", "Conexões mantidas pelo pool", "gauge"),
+    ("max_overflow", "Conexões extras permitidas sob pico", "gauge"),
+    ("checked_out", "Conexões em uso", "gauge"),
+    ("overflow", "Conexões extras abertas", "gauge"),
+    ("checkouts_total", "Checkouts de conexão", "counter"),
+    ("timeouts_total", "Checkouts que estouraram DB_POOL_TIMEOUT", "counter"),
+    ("wait_seconds_total", "Tempo total esperando conexão livre", "counter"),
+    ("wait_seconds_max", "Maior espera por conexão livre", "gauge"),
+)
+
+
+def pool_metric_values(engine: Engine) -> dict:
+    """Valores de POOL_METRICS do pool da engine (segundos, como o Prometheus espera)"""
+    pool: Pool = engine.pool
+    values = {}
+    if isinstance(pool, QueuePool):
+        values.update(
+            size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+        )
+    metrics: Optional[PoolMetrics] = getattr(pool, "metrics", None)
+    if metrics is not None:
+        values.update(
+            checkouts_total=metrics.checkouts,
+            timeouts_total=metrics.timeouts,
+            wait_seconds_total=metrics.wait_seconds_total,
+            wait_seconds_max=metrics.wait_seconds_max,
+        )
+    return values
+
+
+def pool_metric_lines(engines: dict[str, Engine]) -> list[str]:
+    """Métricas dos pools no formato do Prometheus, com label pool (sync, async)"""
+    values = {name: pool_metric_values(engine) for name, engine in engines.items()}
+    lines = []
+    for key, help, kind in POOL_METRICS:
+        samples = [((name,), pool[key]) for name, pool in values.items() if key in pool]
+        if samples:
+            lines.extend(render_samples(f"db_pool_{key}", help, kind, ("pool",), samples))
+    return lines
@@ -0,0 +1,106 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterator, Optional
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from app.models import CheckIn
+from app.recommendations import TEXT_FIELDS, text_column
+
+EXPORT_FORMATS = ("csv", "ndjson")
+# Linhas por partição lida do cursor do servidor (yield_per)
+EXPORT_PARTITION_SIZE = 2000
+GZIP_LEVEL = 6
+
+CHECKIN_EXPORT_FIELDS = [
+    "id", "patient_id", "date", "weight_kg", "waist_cm", "hip_cm", "body_fat_pct",
+    "adherence", "observations", "imc", "recommendation_template_diet",
+    "recommendation_template_training", "recommendation_template_lifestyle",
+    "next_return_date", "created_at"
+]
+
+# Colunas lidas na exportação de check-ins, na ordem de CHECKIN_EXPORT_FIELDS
+# (os textos de recomendação exigem join_texts na consulta)
+CHECKIN_EXPORT_COLUMNS = [
+    text_column(field) if field in TEXT_FIELDS else getattr(CheckIn, field)
+    for field in CHECKIN_EXPORT_FIELDS
+]
+
+
+def isoformat(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def checkin_export_row(row) -> dict:
+    return {
+        "id": str(row.id),
+        "patient_id": str(row.patient_id),
+        "date": row.date.isoformat(),
+        "weight_kg": row.weight_kg,
+        "waist_cm": row.waist_cm,
+        "hip_cm": row.hip_cm,
+        "body_fat_pct": row.body_fat_pct,
+        "adherence": row.adherence.value if row.adherence else None,
+        "observations": row.observations,
+        "imc": row.imc,
+        "recommendation_template_diet": row.recommendation_template_diet,
+        "recommendation_template_training": row.recommendation_template_training,
+        "recommendation_template_lifestyle": row.recommendation_template_lifestyle,
+        "next_return_date": isoformat(row.next_return_date),
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def encode_rows(rows: list[dict], fields: list[str], fmt: str, header: bool) -> str:
+    if fmt == "ndjson":
+        return b"\n".join(orjson.dumps(row) for row in rows).decode() + "\n" if rows else ""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_partitions(session, statement, size: int = EXPORT_PARTITION_SIZE) -> AsyncIterator[list]:
+    """Percorre o resultado com cursor do servidor, size linhas por vez
+
+    Funciona com AsyncSession e ThreadedSession; a memória usada não depende
+    do total de linhas. A sessão precisa continuar aberta até o fim do
+    iterador (caso das respostas em streaming).
+    """
+    result = await session.stream(statement.execution_options(yield_per=size))
+    try:
+        async for partition in result.partitions():
+            yield partition
+    finally:
+        await result.close()
+
+
+async def gzip_chunks(chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    """Comprime o texto em gzip à medida que é gerado"""
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def accepts_gzip(request: Request) -> bool:
+    return any(
+        encoding.split(";")[0].strip() == "gzip"
+        for encoding in request.headers.get("accept-encoding", "").split(",")
+    )
+
+
+def export_response(request: Request, chunks: AsyncIterator[str], fmt: str, filename: str) -> StreamingResponse:
+    """Resposta de download em streaming, em gzip quando o cliente aceita"""
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    if accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+        chunks = gzip_chunks(chunks)
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
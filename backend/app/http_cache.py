@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response, status
+
+# Recursos por profissional: o navegador guarda, mas sempre revalida (304 sem corpo)
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110): W/ é ignorado e * casa com tudo"""
+    if not if_none_match:
+        return False
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def version_etag(version: int) -> str:
+    """ETag fraco a partir da versão da linha (o corpo pode variar em bytes, não em conteúdo)"""
+    return f'W/"{version}"'
+
+
+def http_date(value: datetime) -> str:
+    """Data em formato HTTP (IMF-fixdate); datetimes sem fuso são UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def has_validators(request: Request) -> bool:
+    headers = request.headers
+    return "if-none-match" in headers or "if-modified-since" in headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Avalia If-None-Match e, só na ausência dele, If-Modified-Since (RFC 9110, 13.2.2)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # Last-Modified tem resolução de segundos
+    return last_modified.replace(microsecond=0) <= since
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str,
+    media_type: str = "application/json",
+    vary: Optional[str] = None,
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """Resposta com ETag e Cache-Control; 304 sem corpo quando o cliente já tem a versão"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if vary:
+        headers["Vary"] = vary
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def private_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> Response:
+    """cached_response para recursos do profissional autenticado: JSON, sempre revalidado"""
+    return cached_response(
+        request, body, etag, PRIVATE_REVALIDATE,
+        vary="Authorization",
+        last_modified=last_modified
+    )
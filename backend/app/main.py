@@ -1,8 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.config import settings
-from app.database import init_db
-from app.routers import auth, patients, checkins, templates
+from app.database import init_db, engine, async_engine
+from app.engine import pool_metric_lines, pool_stats
+from app.security import password_pool
+from app.principals import principal_cache
+from app.template_registry import patient_goal_cache
+from app.return_rules import return_rule_cache
+from app.read_cache import read_cache
+from app.metrics import MetricsMiddleware, render_metrics
+from app.profiling import ProfilingMiddleware
+from app.patient_bulk import shutdown_process_pool
+from app.routers import auth, patients, checkins, templates, dashboard, export, agenda, return_rules, analytics
 
 app = FastAPI(
     title="E-Nutri API",
@@ -20,11 +30,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Latência, consultas e tempo de banco por rota (envolve CORS e as rotas)
+app.add_middleware(MetricsMiddleware)
+
+# Perfil sob demanda (adicionado por último: cobre toda a pilha); desligado, nem é registrado
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Routers
 app.include_router(auth.router)
 app.include_router(patients.router)
 app.include_router(checkins.router)
 app.include_router(templates.router)
+app.include_router(dashboard.router)
+app.include_router(export.router)
+app.include_router(agenda.router)
+app.include_router(return_rules.router)
+app.include_router(analytics.router)
 
 
 @app.on_event("startup")
@@ -32,6 +54,12 @@ async def startup_event():
     init_db()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    password_pool.shutdown()
+    shutdown_process_pool()
+
+
 @app.get("/")
 async def root():
     return {
@@ -45,3 +73,51 @@ async def root():
 async def health():
     return {"status": "ok"}
 
+
+@app.get("/health/password-pool")
+async def password_pool_health():
+    """Ocupação e contadores do pool de hashing de senhas"""
+    return password_pool.stats()
+
+
+@app.get("/health/principal-cache")
+async def principal_cache_health():
+    """Acertos, falhas e ocupação do cache de profissionais autenticados"""
+    return principal_cache.stats()
+
+
+@app.get("/health/patient-goal-cache")
+async def patient_goal_cache_health():
+    """Acertos e ocupação do cache de objetivo dos pacientes (templates por paciente)"""
+    return patient_goal_cache.stats()
+
+
+@app.get("/health/return-rule-cache")
+async def return_rule_cache_health():
+    """Acertos e ocupação do cache de regras de retorno compiladas"""
+    return return_rule_cache.stats()
+
+
+@app.get("/health/read-cache")
+async def read_cache_health():
+    """Taxa de acerto e memória do cache de leitura por paciente"""
+    return await read_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métricas do worker no formato texto do Prometheus"""
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    return PlainTextResponse(render_metrics(pool_metric_lines(engines)), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Ocupação e tempo de espera dos pools de conexão"""
+    stats = {"sync": pool_stats(engine)}
+    if async_engine is not None:
+        stats["async"] = pool_stats(async_engine.sync_engine)
+    return stats
+
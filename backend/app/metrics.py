@@ -0,0 +1,236 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Iterable, Optional
+from sqlalchemy import Engine, event
+from app.config import settings
+
+# Métricas de requisição em processo, expostas em /metrics no formato texto do
+# Prometheus (cada worker tem as suas; o Prometheus soma por instância).
+#
+# O middleware mede a latência por template de rota (/patients/{patient_id},
+# não o caminho com o id) e abre um RequestMetrics em uma ContextVar. Os
+# eventos de cursor das engines somam consultas e tempo de banco nele: a
+# ContextVar chega às consultas da AsyncSession (greenlets do SQLAlchemy
+# herdam o contexto) e às da ThreadedSession (run_in_threadpool copia o
+# contexto; o objeto mutável é o mesmo).
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+UNMATCHED_ROUTE = "unmatched"  # 404 fora das rotas: sem o caminho, para não explodir a cardinalidade
+
+# Literais de string e números no texto SQL (os valores vão como parâmetros, mas text() pode embutir)
+SQL_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+SQL_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+SQL_WHITESPACE = re.compile(r"\s+")
+SLOW_QUERY_MAX_CHARS = 2000
+
+
+class Histogram:
+    """Histograma com buckets fixos, por combinação de labels"""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [contagem por bucket (o último é +Inf), soma]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            base = format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else format_value(bound)
+                lines.append(f'{self.name}_bucket{{{base}{"," if base else ""}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {format_value(total)}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Contador monotônico sem labels"""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {format_value(self.value)}"]
+
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values))
+
+
+def format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+REQUEST_LABELS = ("method", "route", "status")
+ROUTE_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota",
+    REQUEST_LABELS, LATENCY_BUCKETS
+)
+request_statements = Histogram(
+    "http_request_db_statements", "Consultas SQL emitidas por requisição",
+    ROUTE_LABELS, STATEMENT_BUCKETS
+)
+request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Tempo em consultas SQL por requisição",
+    ROUTE_LABELS, LATENCY_BUCKETS
+)
+db_statements = Counter("db_statements_total", "Consultas SQL executadas (com ou sem requisição)")
+db_duration = Counter("db_statement_duration_seconds_total", "Tempo total em consultas SQL")
+db_slow_statements = Counter("db_slow_statements_total", "Consultas acima de SLOW_QUERY_MS")
+
+METRICS = (request_duration, request_statements, request_db_duration, db_statements, db_duration, db_slow_statements)
+
+
+class RequestMetrics:
+    """Consultas e tempo de banco da requisição corrente"""
+
+    __slots__ = ("scope", "statements", "db_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar("current_request", default=None)
+
+
+def route_template(scope: dict) -> str:
+    # O roteador do FastAPI grava a rota escolhida no scope compartilhado
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def redact_statement(statement: str) -> str:
+    """Texto SQL sem literais (LGPD): valores nunca são registrados, nem os parâmetros"""
+    statement = SQL_STRING_LITERAL.sub("'?'", statement)
+    statement = SQL_NUMBER_LITERAL.sub("?", statement)
+    statement = SQL_WHITESPACE.sub(" ", statement).strip()
+    return statement[:SLOW_QUERY_MAX_CHARS]
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    db_statements.inc()
+    db_duration.inc(elapsed)
+    request = current_request.get()
+    if request is not None:
+        request.statements += 1
+        request.db_seconds += elapsed
+    if settings.SLOW_QUERY_MS > 0 and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        db_slow_statements.inc()
+        logger.warning(
+            "Consulta lenta: %.1f ms, rota %s, %s: %s",
+            elapsed * 1000,
+            route_template(request.scope) if request is not None else "-",
+            f"{len(parameters)} lotes de parâmetros" if executemany else "parâmetros omitidos",
+            redact_statement(statement)
+        )
+
+
+def instrument_engine(engine: Engine) -> Engine:
+    """Conta consultas e tempo de banco da engine (para engines assíncronas, passar .sync_engine)"""
+    if settings.METRICS_ENABLED and not event.contains(engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    return engine
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede latência, consultas e tempo de banco por rota
+
+    ASGI puro (sem BaseHTTPMiddleware) para não bufferizar respostas em
+    streaming; a latência vai até o último byte do corpo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope)
+        token = current_request.set(metrics)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = route_template(scope)
+            method = scope["method"]
+            request_duration.observe((method, route, str(status_code)), elapsed)
+            request_statements.observe((method, route), metrics.statements)
+            request_db_duration.observe((method, route), metrics.db_seconds)
+
+
+def render_samples(name: str, help: str, kind: str, label_names: tuple[str, ...], samples: list) -> list[str]:
+    """Família gauge/counter a partir de valores lidos na hora: [(labels, valor)]"""
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{{{format_labels(label_names, labels)}}} {format_value(value)}")
+    return lines
+
+
+def render_metrics(extra: Iterable[str] = ()) -> str:
+    """Métricas do processo mais as coletadas na hora por quem chama (pools, em app/main.py)"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
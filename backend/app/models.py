@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from typing import Optional, List
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID, uuid4
 from enum import Enum
 
@@ -45,10 +46,25 @@ class Professional(SQLModel, table=True):
 
 class Patient(SQLModel, table=True):
     __tablename__ = "patients"
+    __table_args__ = (
+        # Listagem por tenant ordenada por (created_at, id); INCLUDE permite index-only scan no Postgres
+        Index(
+            "ix_patients_professional_created", "professional_id", "created_at", "id",
+            postgresql_include=[
+                "full_name", "goal", "activity_level", "last_checkin_date", "last_imc",
+                "last_weight_kg", "next_return_date", "checkin_count"
+            ]
+        ),
+        Index("ix_patients_professional_goal_created", "professional_id", "goal", "created_at", "id"),
+        Index("ix_patients_professional_activity_created", "professional_id", "activity_level", "created_at", "id"),
+        # Retornos previstos por tenant (dashboard)
+        Index("ix_patients_professional_next_return", "professional_id", "next_return_date"),
+    )
     
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    professional_id: UUID = Field(foreign_key="professionals.id", index=True)
+    professional_id: UUID = Field(foreign_key="professionals.id")
     full_name: str
+    search_name: Optional[str] = None  # Nome normalizado para busca (ver app/search.py)
     birth_date: datetime
     sex: Sex
     height_cm: float
@@ -57,18 +73,97 @@ class Patient(SQLModel, table=True):
     notes: Optional[str] = None
     cpf_last4: Optional[str] = None  # Últimos 4 dígitos para busca
     cpf_encrypted: Optional[str] = None  # CPF completo criptografado
+    # Resumo do último check-in, mantido na escrita dos check-ins (ver app/summary.py)
+    last_checkin_date: Optional[datetime] = None
+    last_weight_kg: Optional[float] = None
+    last_imc: Optional[float] = None
+    next_return_date: Optional[datetime] = None
+    checkin_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Incrementada a cada escrita no paciente ou nos seus check-ins (ETag do detalhe e do histórico)
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)  # Também tocada pelas escritas nos check-ins
     
     professional: Professional = Relationship(back_populates="patients")
-    checkins: List["CheckIn"] = Relationship(back_populates="patient")
+    checkins: List["CheckIn"] = Relationship(
+        back_populates="patient",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+    )
+
+
+class TenantCounter(SQLModel, table=True):
+    """Total de pacientes do profissional, mantido nas escritas (ver app/tenant_counters.py)"""
+    __tablename__ = "tenant_counters"
+    
+    professional_id: UUID = Field(foreign_key="professionals.id", primary_key=True)
+    patients: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+class TenantDailyCounter(SQLModel, table=True):
+    """Check-ins e retornos previstos do profissional por dia (UTC), mantidos nas escritas
+
+    returns conta os pacientes cujo próximo retorno (resumo em Patient) cai no dia.
+    """
+    __tablename__ = "tenant_daily_counters"
+    
+    professional_id: UUID = Field(foreign_key="professionals.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    checkins: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    returns: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+
+
+class ReturnRule(SQLModel, table=True):
+    """Regra de intervalo de retorno do profissional; campos None valem para qualquer valor
+
+    Entre as regras que se aplicam a um check-in vale a mais específica (mais
+    campos preenchidos) e, no empate, a de menor posição. Sem regra aplicável
+    vale o padrão da configuração (ver app/return_rules.py).
+    """
+    __tablename__ = "return_rules"
+    __table_args__ = (
+        Index("ix_return_rules_professional_position", "professional_id", "position"),
+    )
+    
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    professional_id: UUID = Field(foreign_key="professionals.id")
+    position: int
+    goal: Optional[Goal] = None
+    adherence: Optional[Adherence] = None
+    activity_level: Optional[ActivityLevel] = None
+    imc_class: Optional[str] = None  # Uma de app.utils.IMC_CLASSES
+    days: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class RecommendationText(SQLModel, table=True):
+    """Texto de recomendação armazenado uma única vez, endereçado pelo hash do conteúdo
+
+    Imutável: o mesmo texto sempre gera o mesmo id (ver app/recommendations.py).
+    """
+    __tablename__ = "recommendation_texts"
+    
+    id: str = Field(primary_key=True, max_length=32)  # blake2b de 128 bits (hex)
+    text: str
+
+
+def recommendation_relationship(column: str):
+    # Somente leitura e carregado por JOIN junto com o check-in; a escrita é pelo id
+    return Relationship(sa_relationship_kwargs={
+        "foreign_keys": f"[CheckIn.{column}]",
+        "lazy": "joined",
+        "viewonly": True,
+    })
 
 
 class CheckIn(SQLModel, table=True):
     __tablename__ = "checkins"
+    __table_args__ = (
+        # Histórico do paciente ordenado por (date, id)
+        Index("ix_checkins_patient_date", "patient_id", "date", "id"),
+    )
     
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    patient_id: UUID = Field(foreign_key="patients.id", index=True)
+    patient_id: UUID = Field(foreign_key="patients.id")
     date: datetime
     weight_kg: float
     waist_cm: Optional[float] = None
@@ -77,11 +172,28 @@ class CheckIn(SQLModel, table=True):
     adherence: Optional[Adherence] = None
     observations: Optional[str] = None
     imc: float  # Calculado e salvo
-    recommendation_template_diet: Optional[str] = None
-    recommendation_template_training: Optional[str] = None
-    recommendation_template_lifestyle: Optional[str] = None
+    # Textos de recomendação deduplicados em recommendation_texts
+    recommendation_diet_id: Optional[str] = Field(default=None, foreign_key="recommendation_texts.id")
+    recommendation_training_id: Optional[str] = Field(default=None, foreign_key="recommendation_texts.id")
+    recommendation_lifestyle_id: Optional[str] = Field(default=None, foreign_key="recommendation_texts.id")
     next_return_date: Optional[datetime] = None
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})  # Incrementada a cada edição (ETag)
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None  # Última edição; None se nunca foi editado
     
     patient: Patient = Relationship(back_populates="checkins")
-
+    recommendation_diet: Optional[RecommendationText] = recommendation_relationship("recommendation_diet_id")
+    recommendation_training: Optional[RecommendationText] = recommendation_relationship("recommendation_training_id")
+    recommendation_lifestyle: Optional[RecommendationText] = recommendation_relationship("recommendation_lifestyle_id")
+    
+    @property
+    def recommendation_template_diet(self) -> Optional[str]:
+        return self.recommendation_diet.text if self.recommendation_diet else None
+    
+    @property
+    def recommendation_template_training(self) -> Optional[str]:
+        return self.recommendation_training.text if self.recommendation_training else None
+    
+    @property
+    def recommendation_template_lifestyle(self) -> Optional[str]:
+        return self.recommendation_lifestyle.text if self.recommendation_lifestyle else None
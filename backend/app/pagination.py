@@ -0,0 +1,48 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+
+def encode_cursor(sort_value: datetime, row_id: UUID) -> str:
+    """Gera cursor opaco a partir da chave de ordenação (valor, id)"""
+    payload = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decodifica cursor opaco ou levanta exceção 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def keyset_page(statement, sort_column, id_column, cursor: Optional[str], limit: int):
+    """Aplica paginação por cursor (ordem decrescente por (sort_column, id_column))
+
+    Busca limit + 1 linhas para saber se existe próxima página.
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        statement = statement.where(
+            tuple_(sort_column, id_column) < tuple_(sort_value, row_id)
+        )
+    return statement.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def next_cursor(rows: list, limit: int, sort_key: str, id_key: str = "id") -> Optional[str]:
+    """Remove a linha excedente e retorna o cursor da próxima página (ou None)"""
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_key), getattr(last, id_key))
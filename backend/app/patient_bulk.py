@@ -0,0 +1,191 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Iterator, Optional
+from uuid import UUID, uuid4
+from pydantic import ValidationError
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
+from app.checkin_import import Record, format_validation_error
+from app.config import settings
+from app.export import encode_rows
+from app.models import Patient
+from app.schemas import PatientCreate
+from app.search import index_patients, normalize_name
+from app.tenant_counters import add_patients
+from app.security import decrypt_cpf, encrypt_cpf, mask_cpf
+
+EXPORT_FIELDS = [
+    "id", "full_name", "birth_date", "sex", "height_cm", "activity_level", "goal",
+    "notes", "cpf", "cpf_masked", "created_at", "updated_at"
+]
+
+# Colunas lidas por export_row (sem carregar a entidade inteira)
+EXPORT_COLUMNS = [
+    Patient.id, Patient.full_name, Patient.birth_date, Patient.sex, Patient.height_cm,
+    Patient.activity_level, Patient.goal, Patient.notes, Patient.cpf_last4,
+    Patient.cpf_encrypted, Patient.created_at, Patient.updated_at
+]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def export_statement(professional_id: UUID):
+    """Pacientes do profissional para exportação, em ordem estável (created_at, id)"""
+    return select(*EXPORT_COLUMNS).where(
+        Patient.professional_id == professional_id
+    ).order_by(Patient.created_at, Patient.id)
+
+
+def process_workers() -> int:
+    return settings.BULK_PROCESS_WORKERS or os.cpu_count() or 1
+
+
+def process_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de processos para validação e Fernet em lote (None com um único worker)
+
+    Usa spawn: o processo da API já tem threads (event loop, pools) e fork
+    poderia herdar locks travados.
+    """
+    global _process_pool
+    if process_workers() <= 1:
+        return None
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=process_workers(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def split(items: list, parts: int) -> list[list]:
+    size = -(-len(items) // parts)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# Importação
+
+def prepare_patients(records: list[Record]) -> tuple[list[dict], list[tuple[int, str]]]:
+    """Valida e criptografa os CPFs de um lote (roda nos processos do pool)"""
+    rows = []
+    errors = []
+    for line, values in records:
+        if isinstance(values, str):
+            errors.append((line, values))
+            continue
+        try:
+            data = PatientCreate.model_validate(values)
+        except ValidationError as e:
+            errors.append((line, format_validation_error(e)))
+            continue
+
+        cpf_encrypted = None
+        cpf_last4 = None
+        if data.cpf:
+            cpf_clean = "".join(filter(str.isdigit, data.cpf))
+            cpf_encrypted = encrypt_cpf(cpf_clean)
+            cpf_last4 = cpf_clean[-4:]
+
+        rows.append({
+            "id": uuid4(),
+            **data.model_dump(exclude={"cpf"}),
+            "search_name": normalize_name(data.full_name),
+            "cpf_encrypted": cpf_encrypted,
+            "cpf_last4": cpf_last4,
+        })
+    return rows, errors
+
+
+def merge_prepared(parts: list[tuple[list, list]]) -> tuple[list[dict], list[tuple[int, str]]]:
+    rows = [row for part_rows, _ in parts for row in part_rows]
+    errors = sorted(error for _, part_errors in parts for error in part_errors)
+    return rows, errors
+
+
+async def prepare_batch(records: list[Record]) -> tuple[list[dict], list[tuple[int, str]]]:
+    """prepare_patients dividido entre os processos do pool, sem bloquear o event loop"""
+    pool = process_pool()
+    if pool is None:
+        return await run_in_threadpool(prepare_patients, records)
+    loop = asyncio.get_running_loop()
+    parts = await asyncio.gather(*[
+        loop.run_in_executor(pool, prepare_patients, part)
+        for part in split(records, process_workers())
+    ])
+    return merge_prepared(parts)
+
+
+def submit_prepare(pool: ProcessPoolExecutor, records: list[Record]) -> list[Future]:
+    """Dispara prepare_patients no pool sem esperar (ver merge_prepared para juntar)"""
+    return [pool.submit(prepare_patients, part) for part in split(records, process_workers())]
+
+
+def insert_patients(session: Session, professional_id: UUID, rows: list[dict]) -> int:
+    """Insere um lote já preparado e o indexa para busca (sem commit)"""
+    if not rows:
+        return 0
+    now = datetime.utcnow()
+    for row in rows:
+        row.update(professional_id=professional_id, created_at=now, updated_at=now)
+    session.execute(Patient.__table__.insert(), rows)
+    index_patients(session, rows)
+    add_patients(session, professional_id, len(rows))
+    return len(rows)
+
+
+# Exportação
+
+def export_row(patient: Patient, include_cpf: bool) -> dict:
+    """Linha de exportação; o CPF só é descriptografado quando include_cpf
+
+    Sem include_cpf, cpf fica vazio e a máscara vai em cpf_masked (ignorada
+    pela importação): a exportação padrão reimporta sem erro, só sem CPF.
+    """
+    cpf = decrypt_cpf(patient.cpf_encrypted) if include_cpf and patient.cpf_encrypted else None
+    cpf_masked = mask_cpf("00000000000" + patient.cpf_last4) if patient.cpf_last4 else None
+    return {
+        "id": str(patient.id),
+        "full_name": patient.full_name,
+        "birth_date": patient.birth_date.isoformat(),
+        "sex": patient.sex.value,
+        "height_cm": patient.height_cm,
+        "activity_level": patient.activity_level.value,
+        "goal": patient.goal.value,
+        "notes": patient.notes,
+        "cpf": cpf,
+        "cpf_masked": cpf_masked,
+        "created_at": patient.created_at.isoformat(),
+        "updated_at": patient.updated_at.isoformat(),
+    }
+
+
+def export_chunks(batches: Iterator[list[Patient]], fmt: str, include_cpf: bool) -> Iterator[str]:
+    header = True
+    for patients in batches:
+        yield encode_rows([export_row(patient, include_cpf) for patient in patients], EXPORT_FIELDS, fmt, header)
+        header = False
+    if header and fmt == "csv":
+        yield encode_rows([], EXPORT_FIELDS, fmt, header)
+
+
+async def export_chunks_async(batches: AsyncIterator[list[Patient]], fmt: str, include_cpf: bool) -> AsyncIterator[str]:
+    """Como export_chunks; com include_cpf a descriptografia de cada lote roda em thread"""
+    header = True
+    async for patients in batches:
+        if include_cpf:
+            rows = await run_in_threadpool(lambda: [export_row(patient, True) for patient in patients])
+        else:
+            rows = [export_row(patient, False) for patient in patients]
+        yield encode_rows(rows, EXPORT_FIELDS, fmt, header)
+        header = False
+    if header and fmt == "csv":
+        yield encode_rows([], EXPORT_FIELDS, fmt, header)
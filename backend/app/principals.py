@@ -0,0 +1,39 @@
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import event
+from app.cache import TTLCache
+from app.config import settings
+from app.models import Professional
+
+
+class PrincipalCache(TTLCache[dict]):
+    """Cache LRU com TTL dos profissionais autenticados, indexado pelo sub do JWT
+
+    Guarda apenas os valores das colunas e devolve uma instância nova (fora
+    de qualquer sessão) a cada acerto, para que requisições não compartilhem
+    o mesmo objeto ORM.
+    """
+
+    def get(self, professional_id: UUID) -> Optional[Professional]:
+        values = super().get(professional_id)
+        return Professional(**values) if values is not None else None
+
+    def put(self, professional: Professional) -> None:
+        if not self.enabled:
+            return
+        values = {column.key: getattr(professional, column.key) for column in Professional.__table__.columns}
+        super().put(professional.id, values)
+
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+
+
+# Alterações via ORM invalidam a entrada no flush. UPDATE/DELETE em massa
+# (fora do ORM) e outros processos dependem do TTL.
+@event.listens_for(Professional, "after_update")
+@event.listens_for(Professional, "after_delete")
+def invalidate_professional(mapper, connection, target: Professional) -> None:
+    principal_cache.invalidate(target.id)
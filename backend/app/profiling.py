@@ -0,0 +1,161 @@
+import cProfile
+import hmac
+import logging
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.metrics import route_template
+
+# Perfil de uma requisição inteira sob demanda, para investigar rotas lentas
+# em produção: resolução de dependências (incluindo get_current_professional),
+# handler, SQL e serialização. Desligado por padrão; com PROFILING_ENABLED=false
+# o middleware nem é registrado (custo zero).
+#
+# Gatilhos: o header X-Profile com o valor de PROFILING_TOKEN (segredo de
+# administração; o profissional autenticado não basta) ou amostragem de
+# PROFILING_SAMPLE_RATE das requisições. Só uma requisição é perfilada por vez
+# no worker: os profilers do Python são por thread e o event loop é um só.
+#
+# Os arquivos vão para PROFILING_DIR, que funciona como buffer circular de
+# PROFILING_MAX_FILES perfis (os mais antigos são apagados):
+# - cprofile: .pstats (pstats, snakeviz, flameprof/gprof2dot para flamegraph).
+#   Conta só CPU do event loop; o tempo esperando o banco (await) não aparece.
+#   Limitações: o profiler vale para a thread do loop inteira, então a CPU de
+#   outras requisições atendidas ao mesmo tempo entra no perfil; e o que roda
+#   no threadpool (todo o SQL com DATABASE_ASYNC=false, via ThreadedSession, e
+#   o trabalho de run_in_threadpool) fica de fora. Use com pouca concorrência.
+# - pyinstrument: .speedscope.json (speedscope.app). Amostrador com modo async:
+#   o tempo em await é atribuído à linha que esperou, então o SQL aparece, e
+#   outras tarefas do loop aparecem só como espera (atribuição por requisição).
+#   O threadpool também não é amostrado: com ThreadedSession o SQL aparece como
+#   espera em run_sync, sem o detalhe. Requer o pacote pyinstrument (não está
+#   em requirements.txt).
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PYINSTRUMENT_INTERVAL = 0.001  # Segundos entre amostras
+FILENAME_UNSAFE = re.compile(r"[^A-Za-z0-9_]+")
+
+
+class CProfileCapture:
+    extension = ".pstats"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profiler.enable()
+
+    def stop(self) -> None:
+        self.profiler.disable()
+
+    def write(self, path: Path) -> None:
+        self.profiler.dump_stats(str(path))
+
+
+class PyinstrumentCapture:
+    extension = ".speedscope.json"
+
+    def __init__(self):
+        from pyinstrument import Profiler
+        self.profiler = Profiler(interval=PYINSTRUMENT_INTERVAL, async_mode="enabled")
+
+    def start(self) -> None:
+        self.profiler.start()
+
+    def stop(self) -> None:
+        self.profiler.stop()
+
+    def write(self, path: Path) -> None:
+        from pyinstrument.renderers import SpeedscopeRenderer
+        path.write_text(self.profiler.output(SpeedscopeRenderer()))
+
+
+def capture_class(engine: str):
+    if engine == "cprofile":
+        return CProfileCapture
+    if engine == "pyinstrument":
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            raise RuntimeError("PROFILING_ENGINE=pyinstrument requer o pacote pyinstrument (pip install pyinstrument)")
+        return PyinstrumentCapture
+    raise RuntimeError(f"PROFILING_ENGINE desconhecido: {engine}")
+
+
+def profile_filename(profile_id: str, method: str, route: str, elapsed: float, extension: str) -> str:
+    # O id começa pelo horário: a ordem alfabética é a ordem de gravação
+    route = FILENAME_UNSAFE.sub("-", route).strip("-") or "root"
+    return f"{profile_id}_{method}_{route}_{elapsed * 1000:.0f}ms{extension}"
+
+
+def trim_profiles(directory: Path, max_files: int) -> None:
+    """Apaga os perfis mais antigos além de max_files (vários workers podem apagar o mesmo)"""
+    files = sorted(path for path in directory.iterdir() if path.is_file())
+    for path in files[:max(len(files) - max_files, 0)]:
+        path.unlink(missing_ok=True)
+
+
+def write_profile(capture, directory: Path, filename: str, max_files: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    capture.write(directory / filename)
+    trim_profiles(directory, max_files)
+
+
+class ProfilingMiddleware:
+    """Middleware ASGI que perfila requisições pedidas pelo header ou sorteadas
+
+    Registrar só com PROFILING_ENABLED (ver app/main.py). A requisição
+    perfilada recebe X-Profile-Id com o prefixo do nome do arquivo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.capture_class = capture_class(settings.PROFILING_ENGINE)
+        self.token = settings.PROFILING_TOKEN.encode()
+        self.directory = Path(settings.PROFILING_DIR)
+        self.active = False
+
+    def requested(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token)
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{uuid4().hex[:6]}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            await send(message)
+
+        # O loop é de uma thread só: a checagem e a marcação acima não concorrem
+        self.active = True
+        capture = self.capture_class()
+        start = time.perf_counter()
+        capture.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            capture.stop()
+            elapsed = time.perf_counter() - start
+            self.active = False
+            filename = profile_filename(profile_id, scope["method"], route_template(scope), elapsed, capture.extension)
+            try:
+                # A resposta já foi enviada; gravar fora do loop não atrasa as demais
+                await run_in_threadpool(write_profile, capture, self.directory, filename, settings.PROFILING_MAX_FILES)
+            except Exception:
+                logger.exception("Falha ao gravar o perfil %s", filename)
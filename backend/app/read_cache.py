@@ -0,0 +1,252 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional
+from uuid import UUID, uuid4
+from app.config import settings
+
+# Cache de leitura das respostas por paciente (detalhe e páginas de check-ins)
+#
+# As chaves levam (profissional, paciente, versão): cada paciente tem um
+# token de versão guardado no próprio backend e as escritas trocam o token
+# depois do commit. Entradas de versões antigas ficam inacessíveis e saem por
+# LRU/TTL. A versão é lida antes da consulta ao banco, então uma leitura que
+# corre junto com uma escrita grava sob a versão antiga e nunca é servida
+# depois dela. Como a chave inclui o profissional, um acerto só acontece para
+# quem já passou pela verificação de posse ao preencher a entrada.
+#
+# O token de versão só é visto por quem compartilha o backend: com memory,
+# uma escrita em um worker não invalida os demais, que seguem servindo o corpo
+# antigo (e 304 para o ETag antigo) por até READ_CACHE_TTL_SECONDS. Por isso
+# memory só é aceito com um worker (WEB_CONCURRENCY=1) e o padrão é redis quando
+# READ_CACHE_URL está definido, senão nenhum cache.
+
+
+class CachedResponse(NamedTuple):
+    """Corpo serializado com os validadores HTTP (ETag e Last-Modified) da resposta"""
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+    def encode(self) -> bytes:
+        # Uma linha por validador antes do corpo; nenhum dos dois contém quebra de linha
+        last_modified = self.last_modified.isoformat() if self.last_modified else ""
+        return f"{self.etag}\n{last_modified}\n".encode() + self.body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedResponse":
+        etag, last_modified, body = data.split(b"\n", 2)
+        return cls(body, etag.decode(), datetime.fromisoformat(last_modified.decode()) if last_modified else None)
+
+
+class MemoryBackend:
+    """LRU em processo com TTL e limite de memória (bytes dos valores e chaves)
+
+    Usado só no event loop (as rotas são async), por isso sem lock.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    async def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self.bytes -= len(key) + len(value)
+
+
+class RedisBackend:
+    """Backend compartilhado entre workers em um servidor compatível com Redis
+
+    Requer o pacote redis (não incluído em requirements.txt). O servidor deve
+    usar uma política de despejo (maxmemory-policy allkeys-lru).
+    """
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = "enutri:read:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("READ_CACHE_BACKEND=redis requer o pacote redis (pip install redis)")
+        return cls(redis_asyncio.Redis.from_url(url))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.client.set(self.prefix + key, value, px=int(ttl_seconds * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    async def stats(self) -> dict:
+        # entries conta todas as chaves do banco Redis, não só as deste cache
+        stats = {"entries": await self.client.dbsize(), "bytes": None, "max_bytes": None}
+        try:
+            info = await self.client.info("memory")
+        except Exception:
+            # Servidores compatíveis nem sempre implementam INFO
+            return stats
+        stats["bytes"] = info.get("used_memory")
+        stats["max_bytes"] = info.get("maxmemory")
+        return stats
+
+
+class ReadCache:
+    """Respostas serializadas por (profissional, paciente, versão, visão)
+
+    visão identifica a resposta e os parâmetros que a alteram (por exemplo
+    "detail:20" ou "checkins::50"). ttl_seconds <= 0 desabilita o cache.
+    """
+
+    def __init__(self, backend, ttl_seconds: float):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None and self.ttl_seconds > 0
+
+    @staticmethod
+    def _version_key(professional_id: UUID, patient_id: UUID) -> str:
+        return f"{professional_id}:{patient_id}:v"
+
+    async def version(self, professional_id: UUID, patient_id: UUID) -> str:
+        """Token de versão atual do paciente; cria um se ainda não existe"""
+        if not self.enabled:
+            return ""
+        key = self._version_key(professional_id, patient_id)
+        version = await self.backend.get(key)
+        if version is None:
+            version = uuid4().hex.encode()
+            # Dura mais que as respostas para não órfãs-las à toa; se expirar, um novo token é criado
+            await self.backend.set(key, version, self.ttl_seconds * 2)
+        return version.decode() if isinstance(version, bytes) else version
+
+    async def get(self, professional_id: UUID, patient_id: UUID, version: str, view: str) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        data = await self.backend.get(f"{professional_id}:{patient_id}:{version}:{view}")
+        if data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedResponse.decode(data)
+
+    async def put(
+        self,
+        professional_id: UUID,
+        patient_id: UUID,
+        version: str,
+        view: str,
+        response: CachedResponse
+    ) -> None:
+        if self.enabled:
+            await self.backend.set(
+                f"{professional_id}:{patient_id}:{version}:{view}", response.encode(), self.ttl_seconds
+            )
+
+    async def invalidate(self, professional_id: UUID, *patient_ids: UUID) -> None:
+        """Troca a versão dos pacientes; chamar depois do commit da escrita"""
+        if not self.enabled:
+            return
+        for patient_id in patient_ids:
+            await self.backend.set(
+                self._version_key(professional_id, patient_id), uuid4().hex.encode(), self.ttl_seconds * 2
+            )
+            self.invalidations += 1
+
+    async def stats(self) -> dict:
+        total = self.hits + self.misses
+        stats = {
+            "backend": self.backend.name if self.backend is not None else None,
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+        }
+        if self.backend is not None:
+            stats.update(await self.backend.stats())
+        return stats
+
+
+def backend_name(name: str) -> str:
+    if name:
+        return name
+    return "redis" if settings.READ_CACHE_URL else "none"
+
+
+def create_backend(name: str):
+    name = backend_name(name)
+    if name == "memory":
+        if settings.WEB_CONCURRENCY > 1:
+            raise RuntimeError(
+                "READ_CACHE_BACKEND=memory não é compartilhado entre workers "
+                f"(WEB_CONCURRENCY={settings.WEB_CONCURRENCY}); use redis ou none"
+            )
+        return MemoryBackend(settings.READ_CACHE_MAX_BYTES)
+    if name == "redis":
+        return RedisBackend.from_url(settings.READ_CACHE_URL)
+    if name == "none":
+        return None
+    raise ValueError(f"READ_CACHE_BACKEND inválido: {name} (memory, redis ou none)")
+
+
+read_cache = ReadCache(create_backend(settings.READ_CACHE_BACKEND), settings.READ_CACHE_TTL_SECONDS)
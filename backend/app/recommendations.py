@@ -0,0 +1,77 @@
+import hashlib
+from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from app.models import CheckIn, RecommendationText
+
+# Campo de texto exposto pela API -> coluna de CheckIn com o id do texto
+TEXT_FIELDS = {
+    "recommendation_template_diet": "recommendation_diet_id",
+    "recommendation_template_training": "recommendation_training_id",
+    "recommendation_template_lifestyle": "recommendation_lifestyle_id",
+}
+
+# Um alias de recommendation_texts por coluna, para leituras em colunas (exportação)
+TEXT_ALIASES = {
+    field: aliased(RecommendationText, name=column.removesuffix("_id"))
+    for field, column in TEXT_FIELDS.items()
+}
+
+
+def text_id(text: str) -> str:
+    """Id endereçado pelo conteúdo: blake2b de 128 bits do texto em UTF-8"""
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def store_texts(session: Session, texts: dict[str, str]) -> None:
+    """Grava os textos (id -> texto) que ainda não existem; idempotente"""
+    if not texts:
+        return
+    rows = [{"id": id, "text": text} for id, text in texts.items()]
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement = sqlite.insert(RecommendationText).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        statement = postgresql.insert(RecommendationText).on_conflict_do_nothing()
+    else:
+        existing = set(session.exec(
+            select(RecommendationText.id).where(RecommendationText.id.in_(texts))
+        ).all())
+        rows = [row for row in rows if row["id"] not in existing]
+        statement = insert(RecommendationText)
+    if rows:
+        session.execute(statement, rows)
+
+
+def intern_texts(session: Session, rows: list[dict]) -> None:
+    """Troca, em cada dict, os campos de texto presentes pelo id do texto e grava os novos
+
+    Campos ausentes não são tocados (atualizações parciais); None vira id None.
+    """
+    texts: dict[str, str] = {}
+    for row in rows:
+        for field, column in TEXT_FIELDS.items():
+            if field not in row:
+                continue
+            text: Optional[str] = row.pop(field)
+            if text is None:
+                row[column] = None
+                continue
+            row[column] = text_id(text)
+            texts[row[column]] = text
+    store_texts(session, texts)
+
+
+def text_column(field: str):
+    """Coluna com o texto de field (exige join_texts na mesma consulta)"""
+    return TEXT_ALIASES[field].text.label(field)
+
+
+def join_texts(statement):
+    """LEFT JOIN de uma consulta sobre checkins com os três textos de recomendação"""
+    for field, column in TEXT_FIELDS.items():
+        alias = TEXT_ALIASES[field]
+        statement = statement.outerjoin(alias, alias.id == getattr(CheckIn, column))
+    return statement
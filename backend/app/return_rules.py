@@ -0,0 +1,158 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from itertools import product
+from typing import Optional, Sequence
+from uuid import UUID
+from sqlalchemy import event
+from sqlmodel import Session, select
+from app.cache import TTLCache
+from app.config import settings
+from app.models import ActivityLevel, Adherence, Goal, ReturnRule
+from app.utils import IMC_CLASS_BOUNDS, IMC_CLASSES
+
+MIN_DEFAULT_RETURN_DAYS = 7
+MAX_RETURN_RULES = 500
+
+# Intervalo padrão por objetivo, lido da configuração uma vez
+DEFAULT_DAYS_BY_GOAL = {
+    Goal.EMAGRECIMENTO: settings.RETURN_RULE_EMAGRECIMENTO,
+    Goal.HIPERTROFIA: settings.RETURN_RULE_HIPERTROFIA,
+    Goal.MANUTENCAO: settings.RETURN_RULE_MANUTENCAO,
+    Goal.SAUDE_GERAL: settings.RETURN_RULE_SAUDE_GERAL,
+}
+
+# Valores de cada dimensão da tabela; adesão None é "não informada"
+RULE_ADHERENCES = (None, *Adherence)
+RULE_FIELDS = ("goal", "adherence", "activity_level", "imc_class")
+
+
+def default_days(goal: Goal, adherence: Optional[Adherence]) -> int:
+    """Padrão da configuração: dias por objetivo, reduzidos se a adesão é baixa (mínimo 7)"""
+    days = DEFAULT_DAYS_BY_GOAL.get(goal, 30)
+    if adherence == Adherence.BAIXA:
+        days -= settings.RETURN_RULE_REDUCAO_ADESAO_BAIXA
+    return max(days, MIN_DEFAULT_RETURN_DAYS)
+
+
+class ReturnRuleTable:
+    """Regras de retorno compiladas em uma tabela de dias por combinação
+
+    Na construção, cada combinação de objetivo × adesão × nível de atividade
+    × classe de IMC recebe os dias da regra mais específica que se aplica
+    (no empate, a primeira da lista) ou o padrão da configuração. A consulta
+    vira um índice em uma lista plana: o deslocamento de (objetivo, adesão,
+    atividade) vem de um dict e a classe de IMC de um bisect.
+
+    rules são objetos com os atributos de ReturnRule (linhas do banco ou
+    schemas), já na ordem de posição. Imutável depois de construída.
+    """
+
+    def __init__(self, rules: Sequence = ()):
+        ranked = sorted(
+            enumerate(rules),
+            key=lambda item: (-sum(getattr(item[1], field) is not None for field in RULE_FIELDS), item[0])
+        )
+        self.rule_count = len(ranked)
+        self._offsets = {}
+        self._deltas = []
+        for goal, adherence, activity_level in product(Goal, RULE_ADHERENCES, ActivityLevel):
+            self._offsets[goal, adherence, activity_level] = len(self._deltas)
+            for imc_class in IMC_CLASSES:
+                days = next(
+                    (
+                        rule.days for _, rule in ranked
+                        if (rule.goal is None or rule.goal == goal)
+                        and (rule.adherence is None or rule.adherence == adherence)
+                        and (rule.activity_level is None or rule.activity_level == activity_level)
+                        and (rule.imc_class is None or rule.imc_class == imc_class)
+                    ),
+                    None
+                )
+                if days is None:
+                    days = default_days(goal, adherence)
+                self._deltas.append(timedelta(days=days))
+
+    def days(
+        self,
+        goal: Goal,
+        adherence: Optional[Adherence],
+        activity_level: ActivityLevel,
+        imc: float
+    ) -> int:
+        return self._deltas[self._offsets[goal, adherence, activity_level] + bisect_right(IMC_CLASS_BOUNDS, imc)].days
+
+    def next_return_date(
+        self,
+        current_date: datetime,
+        goal: Goal,
+        adherence: Optional[Adherence],
+        activity_level: ActivityLevel,
+        imc: float
+    ) -> datetime:
+        """Sugere a data do próximo retorno de um check-in"""
+        return current_date + self._deltas[
+            self._offsets[goal, adherence, activity_level] + bisect_right(IMC_CLASS_BOUNDS, imc)
+        ]
+
+    def next_return_dates(
+        self,
+        dates: Sequence[datetime],
+        goals: Sequence[Goal],
+        adherences: Sequence[Optional[Adherence]],
+        activity_levels: Sequence[ActivityLevel],
+        imcs: Sequence[float]
+    ) -> list[datetime]:
+        """Versão em lote de next_return_date sobre colunas paralelas (uma posição por check-in)"""
+        offsets = self._offsets
+        deltas = self._deltas
+        return [
+            current_date + deltas[offsets[key] + bisect_right(IMC_CLASS_BOUNDS, imc)]
+            for current_date, key, imc in zip(dates, zip(goals, adherences, activity_levels), imcs)
+        ]
+
+
+# Sem regras cadastradas: só os padrões da configuração
+DEFAULT_RETURN_RULES = ReturnRuleTable()
+
+# Tabela compilada por profissional
+return_rule_cache: TTLCache[ReturnRuleTable] = TTLCache(
+    ttl_seconds=settings.RETURN_RULE_CACHE_TTL_SECONDS,
+    max_entries=settings.RETURN_RULE_CACHE_MAX_ENTRIES
+)
+
+
+def get_return_rules(session: Session, professional_id: UUID) -> ReturnRuleTable:
+    """Regras compiladas do profissional, do cache ou do banco (síncrona; nas rotas via run_sync)"""
+    rules = return_rule_cache.get(professional_id)
+    if rules is not None:
+        return rules
+    rows = session.exec(
+        select(ReturnRule.goal, ReturnRule.adherence, ReturnRule.activity_level, ReturnRule.imc_class, ReturnRule.days)
+        .where(ReturnRule.professional_id == professional_id)
+        .order_by(ReturnRule.position)
+    ).all()
+    rules = ReturnRuleTable(rows) if rows else DEFAULT_RETURN_RULES
+    return_rule_cache.put(professional_id, rules)
+    return rules
+
+
+def replace_return_rules(session: Session, professional_id: UUID, rules: Sequence) -> None:
+    """Substitui as regras do profissional pelas da lista, nessa ordem (sem commit)"""
+    existing = session.exec(select(ReturnRule).where(ReturnRule.professional_id == professional_id)).all()
+    for rule in existing:
+        session.delete(rule)
+    for position, rule in enumerate(rules):
+        session.add(ReturnRule(
+            professional_id=professional_id,
+            position=position,
+            **{field: getattr(rule, field) for field in (*RULE_FIELDS, "days")}
+        ))
+    session.flush()
+
+
+# Alterações via ORM invalidam a tabela do profissional no flush; as demais dependem do TTL
+@event.listens_for(ReturnRule, "after_insert")
+@event.listens_for(ReturnRule, "after_update")
+@event.listens_for(ReturnRule, "after_delete")
+def invalidate_return_rules(mapper, connection, target: ReturnRule) -> None:
+    return_rule_cache.invalidate(target.professional_id)
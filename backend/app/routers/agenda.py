@@ -0,0 +1,133 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import cast, union_all, Date
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_session
+from app.dependencies import get_current_professional
+from app.models import Professional, Patient
+from app.schemas import AgendaResponse
+from app.serialization import row_dicts
+
+router = APIRouter(prefix="/agenda", tags=["agenda"])
+
+MAX_AGENDA_DAYS = 92
+MAX_OVERDUE_DAYS = 365
+
+AGENDA_COLUMNS = [
+    Patient.id,
+    Patient.full_name,
+    Patient.goal,
+    Patient.next_return_date,
+    Patient.last_checkin_date
+]
+
+
+def return_day(dialect_name: str):
+    """Dia (UTC) do próximo retorno; no SQLite date() devolve 'AAAA-MM-DD'"""
+    if dialect_name == "sqlite":
+        return func.date(Patient.next_return_date)
+    return cast(Patient.next_return_date, Date)
+
+
+def compute_agenda(
+    session: Session,
+    professional_id: UUID,
+    date_from: date,
+    date_to: date,
+    limit_per_day: int,
+    overdue_limit: int,
+    overdue_days: int,
+    today: Optional[date] = None
+) -> dict:
+    """Retornos por dia no intervalo e retornos atrasados
+
+    Usa o próximo retorno mantido em Patient a cada check-in (ver
+    app/summary.py) e o índice (professional_id, next_return_date): cada
+    consulta é um intervalo do índice, sem ler check-ins. A contagem por dia
+    é feita no índice; só as linhas listadas (limit_per_day por dia, em um
+    UNION ALL de consultas com LIMIT) chegam ao Python. Atrasados são os
+    retornos vencidos nos últimos overdue_days dias. A ordenação é só por
+    next_return_date para o LIMIT parar no índice, sem ordenar o dia inteiro.
+    """
+    today = today or datetime.utcnow().date()
+    start = datetime.combine(date_from, time.min)
+    end = datetime.combine(date_to + timedelta(days=1), time.min)
+    today_start = datetime.combine(today, time.min)
+    day = return_day(session.get_bind().dialect.name).label("day")
+    overdue = (
+        Patient.professional_id == professional_id,
+        Patient.next_return_date >= today_start - timedelta(days=overdue_days),
+        Patient.next_return_date < today_start
+    )
+
+    counts = session.exec(
+        select(day, func.count()).where(
+            Patient.professional_id == professional_id,
+            Patient.next_return_date >= start,
+            Patient.next_return_date < end
+        ).group_by(day)
+    ).all()
+    days = {
+        date.fromisoformat(str(day_value)): {"date": str(day_value), "count": count, "patients": []}
+        for day_value, count in counts
+    }
+
+    if limit_per_day and days:
+        per_day = []
+        for day_value in sorted(days):
+            day_start = datetime.combine(day_value, time.min)
+            per_day.append(
+                select(*AGENDA_COLUMNS).where(
+                    Patient.professional_id == professional_id,
+                    Patient.next_return_date >= day_start,
+                    Patient.next_return_date < day_start + timedelta(days=1)
+                ).order_by(Patient.next_return_date).limit(limit_per_day).subquery().select()
+            )
+        listed = session.exec(union_all(*per_day)).all()
+        for row in row_dicts(listed):
+            days[row["next_return_date"].date()]["patients"].append(row)
+
+    overdue_count = session.exec(
+        select(func.count()).select_from(Patient).where(*overdue)
+    ).one()
+    overdue_rows = session.exec(
+        select(*AGENDA_COLUMNS).where(*overdue).order_by(
+            Patient.next_return_date.desc()
+        ).limit(overdue_limit)
+    ).all() if overdue_limit else []
+
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": [days[day_value] for day_value in sorted(days)],
+        "overdue": {"count": overdue_count, "patients": row_dicts(overdue_rows)},
+    }
+
+
+@router.get("", response_model=AgendaResponse)
+async def get_agenda(
+    date_from: Optional[date] = Query(None, alias="from", description="Primeiro dia (padrão: hoje)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Último dia, inclusive (padrão: from + 6 dias)"),
+    limit_per_day: int = Query(20, ge=0, le=200, description="Pacientes listados por dia (a contagem é sempre total)"),
+    overdue_limit: int = Query(50, ge=0, le=500, description="Pacientes atrasados listados"),
+    overdue_days: int = Query(30, ge=1, le=MAX_OVERDUE_DAYS, description="Janela dos atrasados: retornos vencidos nos últimos N dias"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Agenda de retornos do profissional: retornos por dia e atrasados"""
+    date_from = date_from or datetime.utcnow().date()
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from or (date_to - date_from).days >= MAX_AGENDA_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Intervalo inválido: 'to' deve estar entre 'from' e {MAX_AGENDA_DAYS} dias depois"
+        )
+
+    agenda = await session.run_sync(
+        compute_agenda, professional.id, date_from, date_to, limit_per_day, overdue_limit, overdue_days
+    )
+    return ORJSONResponse(agenda)
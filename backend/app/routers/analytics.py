@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.analytics import CohortTooLarge, cohort_analytics_from_rows, load_cohort_rows
+from app.config import settings
+from app.database import get_session
+from app.dependencies import get_current_professional
+from app.models import Professional, Goal
+from app.schemas import CohortAnalyticsResponse
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/cohort", response_model=CohortAnalyticsResponse)
+async def get_cohort_analytics(
+    goal: Optional[Goal] = None,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Indicadores de todos os pacientes do profissional: classes de IMC e tendências por objetivo
+    
+    Recusa (422) coortes com mais de ANALYTICS_COHORT_MAX_CHECKINS check-ins;
+    filtrar por objetivo ou período reduz a coorte.
+    """
+    try:
+        rows, patients = await session.run_sync(
+            load_cohort_rows, professional.id, goal, date_from, date_to, settings.ANALYTICS_COHORT_MAX_CHECKINS
+        )
+    except CohortTooLarge as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Coorte com mais de {exc.max_checkins} check-ins; filtre por objetivo ou período (from/to)"
+        )
+    # Montagem das colunas e contas com NumPy fora do event loop
+    cohort = await run_in_threadpool(cohort_analytics_from_rows, rows, patients)
+    return ORJSONResponse(cohort)
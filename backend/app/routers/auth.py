@@ -1,58 +1,78 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database import get_session
 from app.models import Professional
 from app.schemas import LoginRequest, Token, RefreshTokenRequest, ProfessionalResponse
 from app.security import (
-    verify_password,
-    get_password_hash,
+    PasswordPoolBusy,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
-    decode_token,
-    get_current_professional
+    decode_token
 )
+from app.dependencies import get_current_professional
 from datetime import timedelta
 from app.config import settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+def password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servidor ocupado, tente novamente em instantes",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=ProfessionalResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     data: LoginRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Registra novo profissional (opcional, pode ser apenas via seed)"""
     # Verifica se email já existe
     statement = select(Professional).where(Professional.email == data.email)
-    existing = session.exec(statement).first()
+    existing = (await session.exec(statement)).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email já cadastrado"
         )
     
+    try:
+        password_hash = await get_password_hash_async(data.password)
+    except PasswordPoolBusy:
+        raise password_pool_busy()
+    
     professional = Professional(
         name=data.email.split("@")[0],  # Nome padrão do email
         email=data.email,
-        password_hash=get_password_hash(data.password)
+        password_hash=password_hash
     )
     session.add(professional)
-    session.commit()
-    session.refresh(professional)
+    await session.commit()
+    await session.refresh(professional)
     return professional
 
 
 @router.post("/login", response_model=Token)
 async def login(
     data: LoginRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Login do profissional"""
     statement = select(Professional).where(Professional.email == data.email)
-    professional = session.exec(statement).first()
+    professional = (await session.exec(statement)).first()
+    
+    try:
+        valid = professional is not None and await verify_password_async(data.password, professional.password_hash)
+    except PasswordPoolBusy:
+        raise password_pool_busy()
     
-    if not professional or not verify_password(data.password, professional.password_hash):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
@@ -75,7 +95,7 @@ async def login(
 @router.post("/refresh", response_model=Token)
 async def refresh_token(
     data: RefreshTokenRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Renova access token usando refresh token"""
     payload = decode_token(data.refresh_token)
@@ -104,7 +124,7 @@ async def refresh_token(
         )
     
     statement = select(Professional).where(Professional.id == professional_id_uuid)
-    professional = session.exec(statement).first()
+    professional = (await session.exec(statement)).first()
     
     if not professional:
         raise HTTPException(
@@ -1,27 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Optional
 from uuid import UUID
 from app.database import get_session
 from app.models import Professional, Patient, CheckIn
-from app.schemas import CheckInCreate, CheckInUpdate, CheckInResponse
-from app.security import get_current_professional
-from app.utils import calculate_imc, suggest_next_return_date
+from app.schemas import CheckInCreate, CheckInUpdate, CheckInResponse, CheckInPage, CheckInImportResult
+from app.dependencies import get_current_professional
+from app.utils import calculate_imc
+from app.return_rules import get_return_rules
+from app.summary import lock_patient, refresh_patient_summary
+from app.recommendations import intern_texts
+from app.serialization import checkin_rows_statement, row_dicts
+from app.pagination import keyset_page, next_cursor
+from app.read_cache import CachedResponse, read_cache
+from app.http_cache import has_validators, not_modified, private_response, version_etag
+from app.row_versions import checkin_validators, patient_validators
+from app.checkin_import import IMPORT_BATCH_SIZE, ImportResult, RecordParser, import_batch, iter_lines
 from datetime import datetime
 
 router = APIRouter(prefix="/checkins", tags=["checkins"])
 
 
-def verify_patient_ownership(
+async def verify_patient_ownership(
     patient_id: UUID,
     professional: Professional,
-    session: Session
+    session: AsyncSession,
+    for_update: bool = False
 ) -> Patient:
     """Verifica ownership e retorna paciente ou levanta exceção"""
     statement = select(Patient).where(
         Patient.id == patient_id,
         Patient.professional_id == professional.id
     )
-    patient = session.exec(statement).first()
+    if for_update:
+        # Bloqueia o paciente para manter o resumo consistente
+        statement = statement.with_for_update()
+    patient = (await session.exec(statement)).first()
     
     if not patient:
         raise HTTPException(
@@ -32,17 +48,17 @@ def verify_patient_ownership(
     return patient
 
 
-def verify_checkin_ownership(
+async def verify_checkin_ownership(
     checkin_id: UUID,
     professional: Professional,
-    session: Session
+    session: AsyncSession
 ) -> CheckIn:
     """Verifica ownership do check-in via paciente"""
     statement = select(CheckIn).join(Patient).where(
         CheckIn.id == checkin_id,
         Patient.professional_id == professional.id
     )
-    checkin = session.exec(statement).first()
+    checkin = (await session.exec(statement)).first()
     
     if not checkin:
         raise HTTPException(
@@ -53,21 +69,45 @@ def verify_checkin_ownership(
     return checkin
 
 
-@router.get("/patients/{patient_id}/checkins", response_model=list[CheckInResponse])
+@router.get("/patients/{patient_id}/checkins", response_model=CheckInPage)
 async def list_checkins(
     patient_id: UUID,
+    request: Request,
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página"),
+    limit: int = Query(50, ge=1, le=200),
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    """Lista check-ins de um paciente"""
-    verify_patient_ownership(patient_id, professional, session)
+    """Lista check-ins de um paciente (ETag e Last-Modified do paciente; 304 se não mudou)"""
+    version = await read_cache.version(professional.id, patient_id)
+    view = f"checkins:{cursor or ''}:{limit}"
+    cached = await read_cache.get(professional.id, patient_id, version, view)
+    if cached is not None:
+        return private_response(request, *cached)
     
-    statement = select(CheckIn).where(
-        CheckIn.patient_id == patient_id
-    ).order_by(CheckIn.date.desc())
+    if has_validators(request):
+        # Sonda barata da versão do paciente antes de ler a página
+        validators = await session.run_sync(patient_validators, professional.id, patient_id)
+        if validators is not None and not_modified(request, *validators):
+            return private_response(request, b"", *validators)
     
-    checkins = session.exec(statement).all()
-    return [CheckInResponse.model_validate(c) for c in checkins]
+    patient = await verify_patient_ownership(patient_id, professional, session)
+    
+    statement = keyset_page(
+        checkin_rows_statement().where(CheckIn.patient_id == patient_id),
+        CheckIn.date, CheckIn.id, cursor, limit
+    )
+    
+    checkins = (await session.exec(statement)).all()
+    # next_cursor remove a linha excedente: precisa vir antes de serializar
+    cursor = next_cursor(checkins, limit, "date")
+    cached = CachedResponse(
+        ORJSONResponse({"items": row_dicts(checkins), "next_cursor": cursor}).body,
+        version_etag(patient.version),
+        patient.updated_at
+    )
+    await read_cache.put(professional.id, patient_id, version, view, cached)
+    return private_response(request, *cached)
 
 
 @router.post("/patients/{patient_id}/checkins", response_model=CheckInResponse, status_code=status.HTTP_201_CREATED)
@@ -75,10 +115,10 @@ async def create_checkin(
     patient_id: UUID,
     data: CheckInCreate,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Cria novo check-in para um paciente"""
-    patient = verify_patient_ownership(patient_id, professional, session)
+    patient = await verify_patient_ownership(patient_id, professional, session, for_update=True)
     
     # Calcula IMC
     imc = calculate_imc(data.weight_kg, patient.height_cm)
@@ -86,12 +126,23 @@ async def create_checkin(
     # Sugere próximo retorno se não fornecido
     next_return = data.next_return_date
     if not next_return:
-        next_return = suggest_next_return_date(
+        rules = await session.run_sync(get_return_rules, professional.id)
+        next_return = rules.next_return_date(
+            data.date,
             patient.goal,
             data.adherence,
-            data.date
+            patient.activity_level,
+            imc
         )
     
+    # Textos de recomendação viram referências a recommendation_texts
+    texts = {
+        "recommendation_template_diet": data.recommendation_template_diet,
+        "recommendation_template_training": data.recommendation_template_training,
+        "recommendation_template_lifestyle": data.recommendation_template_lifestyle,
+    }
+    await session.run_sync(intern_texts, [texts])
+    
     checkin = CheckIn(
         patient_id=patient_id,
         date=data.date,
@@ -102,28 +153,91 @@ async def create_checkin(
         adherence=data.adherence,
         observations=data.observations,
         imc=imc,
-        recommendation_template_diet=data.recommendation_template_diet,
-        recommendation_template_training=data.recommendation_template_training,
-        recommendation_template_lifestyle=data.recommendation_template_lifestyle,
-        next_return_date=next_return
+        next_return_date=next_return,
+        **texts
     )
     
     session.add(checkin)
-    session.commit()
-    session.refresh(checkin)
+    await session.run_sync(refresh_patient_summary, patient)
+    await session.commit()
+    await read_cache.invalidate(professional.id, patient.id)
+    await session.refresh(checkin)
     
     return CheckInResponse.model_validate(checkin)
 
 
+@router.post("/import", response_model=CheckInImportResult)
+async def import_checkins(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="csv ou ndjson (padrão: pelo Content-Type)"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Importa check-ins em lote a partir de CSV ou NDJSON (uma linha por check-in, com patient_id)
+    
+    Linhas inválidas são reportadas com o número da linha sem interromper a
+    importação; cada lote válido é gravado em sua própria transação.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "json" in content_type else "csv"
+    
+    parser = RecordParser(format)
+    patients = {}
+    result = ImportResult()
+    batch = []
+    
+    async def flush():
+        imported, errors = await session.run_sync(import_batch, professional.id, batch, patients)
+        await session.commit()
+        result.add(imported, errors)
+        batch.clear()
+    
+    try:
+        try:
+            async for line in iter_lines(request.stream()):
+                record = parser.feed(line)
+                if record is not None:
+                    batch.append(record)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        await flush()
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Arquivo não está em UTF-8 (linha {parser.line_number + 1})"
+            )
+        
+        record = parser.finish()
+        if record is not None:
+            batch.append(record)
+        if batch:
+            await flush()
+    finally:
+        # Uma invalidação por paciente do profissional visto na importação, inclusive
+        # se ela parar no meio (os lotes anteriores já estão gravados)
+        await read_cache.invalidate(professional.id, *[
+            patient_id for patient_id, patient in patients.items() if patient is not None
+        ])
+    
+    return result.as_dict()
+
+
 @router.get("/{checkin_id}", response_model=CheckInResponse)
 async def get_checkin(
     checkin_id: UUID,
+    request: Request,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    """Retorna detalhes de um check-in"""
-    checkin = verify_checkin_ownership(checkin_id, professional, session)
-    return CheckInResponse.model_validate(checkin)
+    """Retorna detalhes de um check-in (com ETag e Last-Modified; 304 se não mudou)"""
+    if has_validators(request):
+        validators = await session.run_sync(checkin_validators, professional.id, checkin_id)
+        if validators is not None and not_modified(request, *validators):
+            return private_response(request, b"", *validators)
+    
+    checkin = await verify_checkin_ownership(checkin_id, professional, session)
+    body = ORJSONResponse(CheckInResponse.model_validate(checkin).model_dump()).body
+    return private_response(request, body, version_etag(checkin.version), checkin.updated_at or checkin.created_at)
 
 
 @router.put("/{checkin_id}", response_model=CheckInResponse)
@@ -131,13 +245,13 @@ async def update_checkin(
     checkin_id: UUID,
     data: CheckInUpdate,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Atualiza um check-in"""
-    checkin = verify_checkin_ownership(checkin_id, professional, session)
+    checkin = await verify_checkin_ownership(checkin_id, professional, session)
     
-    # Busca paciente para recalcular IMC se peso mudou
-    patient = session.get(Patient, checkin.patient_id)
+    # Busca paciente (bloqueado) para recalcular IMC e o resumo
+    patient = await session.run_sync(lock_patient, checkin.patient_id)
     
     update_data = data.model_dump(exclude_unset=True)
     
@@ -152,19 +266,28 @@ async def update_checkin(
     if "adherence" in update_data and "next_return_date" not in update_data:
         if not checkin.next_return_date or update_data["adherence"] != checkin.adherence:
             date = update_data.get("date", checkin.date)
-            next_return = suggest_next_return_date(
+            rules = await session.run_sync(get_return_rules, professional.id)
+            next_return = rules.next_return_date(
+                date,
                 patient.goal,
                 update_data.get("adherence"),
-                date
+                patient.activity_level,
+                update_data.get("imc", checkin.imc)
             )
             update_data["next_return_date"] = next_return
     
+    await session.run_sync(intern_texts, [update_data])
+    
     for field, value in update_data.items():
         setattr(checkin, field, value)
+    checkin.version = CheckIn.version + 1
+    checkin.updated_at = datetime.utcnow()
     
     session.add(checkin)
-    session.commit()
-    session.refresh(checkin)
+    await session.run_sync(refresh_patient_summary, patient)
+    await session.commit()
+    await read_cache.invalidate(professional.id, patient.id)
+    await session.refresh(checkin)
     
     return CheckInResponse.model_validate(checkin)
 
@@ -173,13 +296,16 @@ async def update_checkin(
 async def delete_checkin(
     checkin_id: UUID,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Deleta um check-in"""
-    checkin = verify_checkin_ownership(checkin_id, professional, session)
+    checkin = await verify_checkin_ownership(checkin_id, professional, session)
+    patient = await session.run_sync(lock_patient, checkin.patient_id)
     
-    session.delete(checkin)
-    session.commit()
+    await session.delete(checkin)
+    await session.run_sync(refresh_patient_summary, patient)
+    await session.commit()
+    await read_cache.invalidate(professional.id, patient.id)
     
     return None
 
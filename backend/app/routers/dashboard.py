@@ -0,0 +1,74 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from uuid import UUID
+from app.database import get_session
+from app.dependencies import get_current_professional
+from app.models import Professional, TenantCounter, TenantDailyCounter
+from app.schemas import DashboardStatsResponse
+from datetime import datetime, timedelta
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def compute_dashboard_stats(
+    session: Session,
+    professional_id: UUID,
+    upcoming_days: int,
+    recent_days: int,
+    now: datetime | None = None
+) -> DashboardStatsResponse:
+    """Calcula os indicadores do dashboard a partir dos contadores do tenant (ver app/tenant_counters.py)
+
+    Lê uma linha de tenant_counters e no máximo upcoming_days + recent_days + 2
+    de tenant_daily_counters, independente do número de pacientes. As janelas
+    são em dias inteiros (UTC): retornos de hoje até hoje + upcoming_days e
+    check-ins de hoje - recent_days até hoje, inclusive.
+    """
+    today = (now or datetime.utcnow()).date()
+
+    total_patients = (
+        select(TenantCounter.patients)
+        .where(TenantCounter.professional_id == professional_id)
+        .scalar_subquery()
+    )
+
+    def window_sum(column, start, end):
+        return (
+            select(func.sum(column))
+            .where(
+                TenantDailyCounter.professional_id == professional_id,
+                TenantDailyCounter.day.between(start, end)
+            )
+            .scalar_subquery()
+        )
+
+    upcoming_returns = window_sum(TenantDailyCounter.returns, today, today + timedelta(days=upcoming_days))
+    recent_checkins = window_sum(TenantDailyCounter.checkins, today - timedelta(days=recent_days), today)
+
+    row = session.exec(select(total_patients, upcoming_returns, recent_checkins)).one()
+
+    return DashboardStatsResponse(
+        total_patients=row[0] or 0,
+        upcoming_returns=row[1] or 0,
+        recent_checkins=row[2] or 0,
+        upcoming_days=upcoming_days,
+        recent_days=recent_days
+    )
+
+
+@router.get("/stats", response_model=DashboardStatsResponse)
+async def get_dashboard_stats(
+    upcoming_days: int = Query(7, ge=1, le=365, description="Janela de retornos próximos (dias)"),
+    recent_days: int = Query(30, ge=1, le=365, description="Janela de consultas recentes (dias)"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Retorna indicadores agregados do dashboard do profissional logado
+
+    Custo constante no tamanho do tenant: lê contadores mantidos nas escritas
+    de pacientes e check-ins, com janelas em dias inteiros (UTC).
+    """
+    return await session.run_sync(
+        compute_dashboard_stats, professional.id, upcoming_days, recent_days
+    )
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.database import get_session
+from app.models import Professional, Patient, CheckIn
+from app.dependencies import get_current_professional
+from app.export import (
+    CHECKIN_EXPORT_COLUMNS,
+    CHECKIN_EXPORT_FIELDS,
+    checkin_export_row,
+    encode_rows,
+    export_response,
+    stream_partitions
+)
+from app.patient_bulk import export_chunks_async, export_row, export_statement
+from app.recommendations import join_texts
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def checkins_statement(professional_id):
+    # Ordem do índice ix_checkins_patient_date: histórico de cada paciente em sequência
+    return join_texts(select(*CHECKIN_EXPORT_COLUMNS).join(
+        Patient, CheckIn.patient_id == Patient.id
+    )).where(
+        Patient.professional_id == professional_id
+    ).order_by(CheckIn.patient_id, CheckIn.date, CheckIn.id)
+
+
+async def checkin_chunks(session, professional_id, fmt: str):
+    header = fmt == "csv"
+    async for rows in stream_partitions(session, checkins_statement(professional_id)):
+        yield encode_rows([checkin_export_row(row) for row in rows], CHECKIN_EXPORT_FIELDS, fmt, header)
+        header = False
+    if header:
+        yield encode_rows([], CHECKIN_EXPORT_FIELDS, fmt, header)
+
+
+@router.get("")
+async def export_all(
+    request: Request,
+    include_cpf: bool = Query(False, description="Preenche a coluna cpf com o CPF completo (descriptografado); cpf_masked vem sempre"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Exporta todos os dados do profissional (backup / portabilidade LGPD) em NDJSON
+
+    Cada linha traz "type": "patient" ou "checkin"; todos os pacientes vêm
+    antes dos check-ins.
+    """
+    async def chunks():
+        async for rows in stream_partitions(session, export_statement(professional.id)):
+            if include_cpf:
+                records = await run_in_threadpool(lambda: [export_row(row, True) for row in rows])
+            else:
+                records = [export_row(row, False) for row in rows]
+            yield encode_rows([{"type": "patient", **record} for record in records], [], "ndjson", False)
+        async for rows in stream_partitions(session, checkins_statement(professional.id)):
+            yield encode_rows([{"type": "checkin", **checkin_export_row(row)} for row in rows], [], "ndjson", False)
+
+    return export_response(request, chunks(), "ndjson", "e-nutri")
+
+
+@router.get("/patients")
+async def export_patients(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    include_cpf: bool = Query(False, description="Preenche a coluna cpf com o CPF completo (descriptografado); cpf_masked vem sempre"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Exporta os pacientes do profissional em streaming (CSV ou NDJSON)"""
+    batches = stream_partitions(session, export_statement(professional.id))
+    return export_response(request, export_chunks_async(batches, format, include_cpf), format, "pacientes")
+
+
+@router.get("/checkins")
+async def export_checkins(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Exporta todos os check-ins do profissional em streaming (CSV ou NDJSON)"""
+    return export_response(request, checkin_chunks(session, professional.id, format), format, "checkins")
@@ -1,5 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, func
+import asyncio
+import json
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from typing import Optional
 from uuid import UUID
 from app.database import get_session
@@ -8,28 +14,46 @@ from app.schemas import (
     PatientCreate,
     PatientUpdate,
     PatientResponse,
-    PatientListResponse,
+    PatientListPage,
     PatientDetailResponse,
-    CheckInResponse
+    PatientImportResult,
+    PatientSeriesResponse,
+    PatientAnalyticsResponse
 )
-from app.security import get_current_professional, encrypt_cpf, mask_cpf
+from app.dependencies import get_current_professional
+from app.security import encrypt_cpf, mask_cpf
 from app.utils import calculate_imc
+from app.pagination import keyset_page, next_cursor
+from app.search import apply_name_search, index_patient, remove_patient
+from app.checkin_import import IMPORT_BATCH_SIZE, ImportResult, RecordParser, iter_lines
+from app.patient_bulk import insert_patients, prepare_batch
+from app.series import DOWNSAMPLE_METHODS, downsample, parse_fields
+from app.analytics import load_patient_rows, patient_analytics_from_rows
+from app.tenant_counters import add_patients, remove_patient_counts
+from app.serialization import checkin_rows_statement, row_dicts
+from app.read_cache import CachedResponse, read_cache
+from app.http_cache import has_validators, not_modified, private_response, version_etag
+from app.row_versions import patient_validators
 from datetime import datetime
 
 router = APIRouter(prefix="/patients", tags=["patients"])
 
+# Upload com progresso: até SPOOL_MAX_MEMORY em memória, o resto em disco
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+SPOOL_READ_SIZE = 64 * 1024
 
-def verify_patient_ownership(
+
+async def verify_patient_ownership(
     patient_id: UUID,
     professional: Professional,
-    session: Session
+    session: AsyncSession
 ) -> Patient:
     """Verifica ownership e retorna paciente ou levanta exceção"""
     statement = select(Patient).where(
         Patient.id == patient_id,
         Patient.professional_id == professional.id
     )
-    patient = session.exec(statement).first()
+    patient = (await session.exec(statement)).first()
     
     if not patient:
         raise HTTPException(
@@ -40,21 +64,30 @@ def verify_patient_ownership(
     return patient
 
 
-@router.get("", response_model=list[PatientListResponse])
+@router.get("", response_model=PatientListPage)
 async def list_patients(
     search: Optional[str] = Query(None, description="Busca por nome"),
     goal: Optional[Goal] = Query(None),
     activity_level: Optional[ActivityLevel] = Query(None),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página"),
     limit: int = Query(100, ge=1, le=100),
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Lista pacientes do profissional logado com busca e filtros"""
-    statement = select(Patient).where(Patient.professional_id == professional.id)
-    
-    if search:
-        statement = statement.where(Patient.full_name.ilike(f"%{search}%"))
+    # Último check-in vem do resumo mantido em Patient (sem consultar check-ins)
+    statement = select(
+        Patient.id,
+        Patient.full_name,
+        Patient.goal,
+        Patient.activity_level,
+        Patient.created_at,
+        Patient.last_checkin_date,
+        Patient.last_imc.label("current_imc"),
+        Patient.last_weight_kg,
+        Patient.next_return_date,
+        Patient.checkin_count
+    ).where(Patient.professional_id == professional.id)
     
     if goal:
         statement = statement.where(Patient.goal == goal)
@@ -62,44 +95,24 @@ async def list_patients(
     if activity_level:
         statement = statement.where(Patient.activity_level == activity_level)
     
-    statement = statement.order_by(Patient.created_at.desc()).offset(skip).limit(limit)
-    patients = session.exec(statement).all()
-    
-    # Busca último check-in e IMC atual para cada paciente
-    result = []
-    for patient in patients:
-        # Último check-in
-        checkin_stmt = select(CheckIn).where(
-            CheckIn.patient_id == patient.id
-        ).order_by(CheckIn.date.desc()).limit(1)
-        last_checkin = session.exec(checkin_stmt).first()
-        
-        # IMC atual (do último check-in ou calculado se não houver)
-        current_imc = None
-        if last_checkin:
-            current_imc = last_checkin.imc
-        elif patient.height_cm:
-            # Se não houver check-in, não podemos calcular IMC sem peso
-            pass
-        
-        result.append(PatientListResponse(
-            id=patient.id,
-            full_name=patient.full_name,
-            goal=patient.goal,
-            activity_level=patient.activity_level,
-            created_at=patient.created_at,
-            last_checkin_date=last_checkin.date if last_checkin else None,
-            current_imc=current_imc
-        ))
+    if search:
+        # Busca retorna os mais relevantes (sem paginação por cursor)
+        statement = apply_name_search(statement, session, professional.id, search).limit(limit)
+        rows = (await session.exec(statement)).all()
+        cursor = None
+    else:
+        statement = keyset_page(statement, Patient.created_at, Patient.id, cursor, limit)
+        rows = (await session.exec(statement)).all()
+        cursor = next_cursor(rows, limit, "created_at")
     
-    return result
+    return ORJSONResponse({"items": row_dicts(rows), "next_cursor": cursor})
 
 
 @router.post("", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
 async def create_patient(
     data: PatientCreate,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Cria novo paciente"""
     # Processa CPF se fornecido
@@ -125,8 +138,10 @@ async def create_patient(
     )
     
     session.add(patient)
-    session.commit()
-    session.refresh(patient)
+    await session.run_sync(index_patient, patient)
+    await session.run_sync(add_patients, professional.id, 1)
+    await session.commit()
+    await session.refresh(patient)
     
     # Retorna com CPF mascarado
     response = PatientResponse.model_validate(patient)
@@ -136,27 +151,230 @@ async def create_patient(
     return response
 
 
+@router.post("/import", response_model=PatientImportResult)
+async def import_patients(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="csv ou ndjson (padrão: pelo Content-Type)"),
+    progress: bool = Query(False, description="Responde em NDJSON com uma linha de progresso por lote"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Importa pacientes em lote a partir de CSV ou NDJSON (campos de PatientCreate)
+    
+    Validação e criptografia do CPF rodam no pool de processos, um lote à
+    frente da inserção. Linhas inválidas são reportadas sem interromper a
+    importação; cada lote é gravado em sua própria transação.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+    
+    async def run_import(chunks):
+        parser = RecordParser(format)
+        result = ImportResult()
+        batch = []
+        pending = None  # Lote anterior sendo preparado no pool
+        
+        async def insert_pending():
+            rows, errors = await pending
+            imported = await session.run_sync(insert_patients, professional.id, rows)
+            await session.commit()
+            result.add(imported, errors)
+        
+        try:
+            async for line in iter_lines(chunks):
+                record = parser.feed(line)
+                if record is not None:
+                    batch.append(record)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    task = asyncio.ensure_future(prepare_batch(batch))
+                    batch = []
+                    if pending is not None:
+                        await insert_pending()
+                        yield result
+                    pending = task
+        except UnicodeDecodeError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Arquivo não está em UTF-8 (linha {parser.line_number + 1})"
+            )
+        
+        record = parser.finish()
+        if record is not None:
+            batch.append(record)
+        if pending is not None:
+            await insert_pending()
+        if batch:
+            pending = asyncio.ensure_future(prepare_batch(batch))
+            await insert_pending()
+        yield result
+    
+    if not progress:
+        async for result in run_import(request.stream()):
+            pass
+        return result.as_dict()
+    
+    # A StreamingResponse disputa o receive() com request.stream(), então o
+    # corpo é salvo em arquivo temporário antes de a resposta começar
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    async for chunk in request.stream():
+        spool.write(chunk)
+    spool.seek(0)
+    
+    async def spooled_chunks():
+        while chunk := spool.read(SPOOL_READ_SIZE):
+            yield chunk
+    
+    async def progress_lines():
+        try:
+            async for result in run_import(spooled_chunks()):
+                yield json.dumps({"imported": result.imported, "failed": result.failed}) + "\n"
+            yield json.dumps({"done": True, **result.as_dict()}, ensure_ascii=False) + "\n"
+        finally:
+            spool.close()
+    
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+
+async def patient_not_modified(
+    request: Request,
+    patient_id: UUID,
+    professional: Professional,
+    session: AsyncSession
+):
+    """304 se o cliente enviou validadores e o paciente não mudou; None caso contrário
+    
+    A sonda lê só a versão e updated_at, então o 304 sai sem montar a resposta.
+    """
+    if not has_validators(request):
+        return None
+    validators = await session.run_sync(patient_validators, professional.id, patient_id)
+    if validators is None or not not_modified(request, *validators):
+        return None
+    return private_response(request, b"", *validators)
+
+
 @router.get("/{patient_id}", response_model=PatientDetailResponse)
 async def get_patient(
     patient_id: UUID,
+    request: Request,
+    checkins_limit: int = Query(20, ge=1, le=200, description="Check-ins na primeira página"),
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    """Retorna detalhes do paciente com check-ins"""
-    patient = verify_patient_ownership(patient_id, professional, session)
+    """Retorna detalhes do paciente com check-ins (com ETag e Last-Modified; 304 se não mudou)
+    
+    Com o cache de leitura quente a resposta sai sem consultar o banco.
+    """
+    # Versão lida antes do banco: uma escrita concorrente troca a versão e descarta esta entrada
+    version = await read_cache.version(professional.id, patient_id)
+    view = f"detail:{checkins_limit}"
+    cached = await read_cache.get(professional.id, patient_id, version, view)
+    if cached is not None:
+        return private_response(request, *cached)
     
-    # Busca check-ins ordenados por data
-    checkin_stmt = select(CheckIn).where(
-        CheckIn.patient_id == patient.id
-    ).order_by(CheckIn.date.desc())
-    checkins = session.exec(checkin_stmt).all()
+    response = await patient_not_modified(request, patient_id, professional, session)
+    if response is not None:
+        return response
     
-    response = PatientDetailResponse.model_validate(patient)
+    patient = await verify_patient_ownership(patient_id, professional, session)
+    
+    # Primeira página de check-ins ordenados por data, só com as colunas da resposta
+    checkin_stmt = keyset_page(
+        checkin_rows_statement().where(CheckIn.patient_id == patient.id),
+        CheckIn.date, CheckIn.id, None, checkins_limit
+    )
+    checkins = (await session.exec(checkin_stmt)).all()
+    checkins_cursor = next_cursor(checkins, checkins_limit, "date")
+    
+    # Valida como PatientResponse para não carregar o relacionamento patient.checkins inteiro
+    response = PatientResponse.model_validate(patient).model_dump()
     if patient.cpf_last4:
-        response.cpf_masked = mask_cpf("00000000000" + patient.cpf_last4)
-    response.checkins = [CheckInResponse.model_validate(c) for c in checkins]
+        response["cpf_masked"] = mask_cpf("00000000000" + patient.cpf_last4)
+    response["checkins"] = row_dicts(checkins)
+    response["checkins_next_cursor"] = checkins_cursor
     
-    return response
+    cached = CachedResponse(ORJSONResponse(response).body, version_etag(patient.version), patient.updated_at)
+    await read_cache.put(professional.id, patient_id, version, view, cached)
+    return private_response(request, *cached)
+
+
+@router.get("/{patient_id}/series", response_model=PatientSeriesResponse)
+async def get_patient_series(
+    patient_id: UUID,
+    request: Request,
+    fields: str = Query("weight_kg,imc", description="Campos separados por vírgula: weight_kg, imc, waist_cm, hip_cm, body_fat_pct"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    points: Optional[int] = Query(None, ge=3, le=5000, description="Máximo de pontos; acima disso a série é reduzida"),
+    method: str = Query("lttb", pattern=f"^({'|'.join(DOWNSAMPLE_METHODS)})$", description="lttb ou avg (médias por intervalo)"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Evolução do paciente em colunas (uma lista por campo), para gráficos
+    
+    Lê só a data e os campos pedidos, sem os textos de recomendação. Com
+    ETag e Last-Modified do paciente; 304 se não mudou.
+    """
+    try:
+        names = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    response = await patient_not_modified(request, patient_id, professional, session)
+    if response is not None:
+        return response
+    patient = await verify_patient_ownership(patient_id, professional, session)
+    
+    statement = select(CheckIn.date, *[getattr(CheckIn, name) for name in names]).where(CheckIn.patient_id == patient.id)
+    if date_from:
+        statement = statement.where(CheckIn.date >= date_from)
+    if date_to:
+        statement = statement.where(CheckIn.date <= date_to)
+    rows = (await session.exec(statement.order_by(CheckIn.date, CheckIn.id))).all()
+    
+    dates = [row[0] for row in rows]
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(names, start=1)}
+    if points and len(dates) > points:
+        dates, columns = downsample(dates, columns, points, method)
+    
+    body = ORJSONResponse({
+        "patient_id": patient.id,
+        "total": len(rows),
+        "downsampled": len(dates) < len(rows),
+        "dates": dates,
+        "series": columns,
+    }).body
+    return private_response(request, body, version_etag(patient.version), patient.updated_at)
+
+
+@router.get("/{patient_id}/analytics", response_model=PatientAnalyticsResponse)
+async def get_patient_analytics(
+    patient_id: UUID,
+    request: Request,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Indicadores do paciente no histórico: IMC, cintura/quadril, tendências de peso e gordura e progresso no objetivo
+    
+    Com ETag e Last-Modified do paciente; 304 se não mudou.
+    """
+    response = await patient_not_modified(request, patient_id, professional, session)
+    if response is not None:
+        return response
+    patient = await verify_patient_ownership(patient_id, professional, session)
+    rows, patients = await session.run_sync(load_patient_rows, patient.id, date_from, date_to)
+    analytics = await run_in_threadpool(patient_analytics_from_rows, patient.id, rows, patients)
+    if analytics is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Paciente sem check-ins no período"
+        )
+    return private_response(request, ORJSONResponse(analytics).body, version_etag(patient.version), patient.updated_at)
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
@@ -164,10 +382,10 @@ async def update_patient(
     patient_id: UUID,
     data: PatientUpdate,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Atualiza dados do paciente"""
-    patient = verify_patient_ownership(patient_id, professional, session)
+    patient = await verify_patient_ownership(patient_id, professional, session)
     
     # Atualiza campos fornecidos
     update_data = data.model_dump(exclude_unset=True)
@@ -186,11 +404,14 @@ async def update_patient(
     for field, value in update_data.items():
         setattr(patient, field, value)
     
+    patient.version = Patient.version + 1
     patient.updated_at = datetime.utcnow()
     
     session.add(patient)
-    session.commit()
-    session.refresh(patient)
+    await session.run_sync(index_patient, patient)
+    await session.commit()
+    await read_cache.invalidate(professional.id, patient.id)
+    await session.refresh(patient)
     
     response = PatientResponse.model_validate(patient)
     if patient.cpf_last4:
@@ -203,13 +424,16 @@ async def update_patient(
 async def delete_patient(
     patient_id: UUID,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Deleta paciente (cascata deleta check-ins)"""
-    patient = verify_patient_ownership(patient_id, professional, session)
+    patient = await verify_patient_ownership(patient_id, professional, session)
     
-    session.delete(patient)
-    session.commit()
+    await session.run_sync(remove_patient, patient)
+    await session.run_sync(remove_patient_counts, patient)
+    await session.delete(patient)
+    await session.commit()
+    await read_cache.invalidate(professional.id, patient_id)
     
     return None
 
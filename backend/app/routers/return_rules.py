@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_session
+from app.dependencies import get_current_professional
+from app.models import Professional, ReturnRule
+from app.return_rules import MAX_RETURN_RULES, replace_return_rules, return_rule_cache
+from app.schemas import ReturnRulesResponse, ReturnRulesUpdate
+
+router = APIRouter(prefix="/return-rules", tags=["return-rules"])
+
+
+@router.get("", response_model=ReturnRulesResponse)
+async def list_return_rules(
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Regras de intervalo de retorno do profissional, em ordem de prioridade"""
+    rules = (await session.exec(
+        select(ReturnRule).where(ReturnRule.professional_id == professional.id).order_by(ReturnRule.position)
+    )).all()
+    return {"rules": rules}
+
+
+@router.put("", response_model=ReturnRulesResponse)
+async def update_return_rules(
+    data: ReturnRulesUpdate,
+    professional: Professional = Depends(get_current_professional),
+    session: AsyncSession = Depends(get_session)
+):
+    """Substitui as regras de retorno do profissional
+
+    Campos omitidos valem para qualquer valor. Vale a regra mais específica
+    que se aplica ao check-in e, no empate, a primeira da lista; sem regra
+    aplicável vale o padrão por objetivo. Lista vazia volta aos padrões.
+    """
+    if len(data.rules) > MAX_RETURN_RULES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Máximo de {MAX_RETURN_RULES} regras"
+        )
+    await session.run_sync(replace_return_rules, professional.id, data.rules)
+    await session.commit()
+    # O flush já invalidou; de novo após o commit para não manter regras lidas durante a transação
+    return_rule_cache.invalidate(professional.id)
+    return {"rules": data.rules}
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from app.schemas import DefaultTemplatesResponse
-from app.models import Professional, Patient, Goal
-from app.security import get_current_professional
-from app.utils import get_default_templates
-from sqlmodel import Session, select
+from app.models import Professional, Goal
+from app.config import settings
+from app.dependencies import get_current_professional
+from app.http_cache import cached_response
+from app.template_registry import resolve_patient_goal, template_registry
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.database import get_session
 from uuid import UUID
 from fastapi import HTTPException, status
@@ -12,31 +14,34 @@ router = APIRouter(prefix="/templates", tags=["templates"])
 
 
 @router.get("/defaults/{goal}", response_model=DefaultTemplatesResponse)
-async def get_default_templates_for_goal(goal: Goal):
-    """Retorna templates padrão baseados no objetivo"""
-    templates = get_default_templates(goal)
-    return DefaultTemplatesResponse(
-        diet=templates["diet"],
-        training=templates["training"],
-        lifestyle=templates["lifestyle"]
+async def get_default_templates_for_goal(goal: Goal, request: Request):
+    """Retorna templates padrão baseados no objetivo (com ETag; 304 se não mudou)"""
+    templates = template_registry[goal]
+    return cached_response(
+        request, templates.body, templates.etag,
+        f"public, max-age={settings.TEMPLATES_CACHE_MAX_AGE}"
     )
 
 
 @router.get("/defaults/patient/{patient_id}", response_model=DefaultTemplatesResponse)
 async def get_default_templates_for_patient(
     patient_id: UUID,
+    request: Request,
     professional: Professional = Depends(get_current_professional),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    """Retorna templates padrão baseados no objetivo do paciente"""
-    from app.routers.patients import verify_patient_ownership
+    """Retorna templates padrão baseados no objetivo do paciente (com ETag; 304 se não mudou)"""
+    goal = await resolve_patient_goal(session, professional.id, patient_id)
+    if goal is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Paciente não encontrado"
+        )
     
-    patient = verify_patient_ownership(patient_id, professional, session)
-    templates = get_default_templates(patient.goal)
-    
-    return DefaultTemplatesResponse(
-        diet=templates["diet"],
-        training=templates["training"],
-        lifestyle=templates["lifestyle"]
+    templates = template_registry[goal]
+    # O objetivo do paciente pode mudar: o navegador sempre revalida (304 sem corpo)
+    return cached_response(
+        request, templates.body, templates.etag,
+        "private, no-cache",
+        vary="Authorization"
     )
-
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlmodel import Session, func, select
+from app.http_cache import version_etag
+from app.models import CheckIn, Patient
+
+# Sondas de versão para GET condicional: leem só (versão, data de modificação)
+# pela chave primária, com a verificação de posse, antes de montar a resposta.
+# Síncronas; nas rotas via run_sync.
+
+
+def patient_validators(session: Session, professional_id: UUID, patient_id: UUID) -> Optional[tuple[str, datetime]]:
+    """(ETag, Last-Modified) do paciente, que cobrem o detalhe e o histórico; None se não é do profissional"""
+    row = session.exec(
+        select(Patient.version, Patient.updated_at).where(
+            Patient.id == patient_id,
+            Patient.professional_id == professional_id
+        )
+    ).first()
+    if row is None:
+        return None
+    return version_etag(row.version), row.updated_at
+
+
+def checkin_validators(session: Session, professional_id: UUID, checkin_id: UUID) -> Optional[tuple[str, datetime]]:
+    """(ETag, Last-Modified) de um check-in; None se não é de um paciente do profissional"""
+    row = session.exec(
+        select(CheckIn.version, func.coalesce(CheckIn.updated_at, CheckIn.created_at)).join(Patient).where(
+            CheckIn.id == checkin_id,
+            Patient.professional_id == professional_id
+        )
+    ).first()
+    if row is None:
+        return None
+    return version_etag(row[0]), row[1]
@@ -1,8 +1,9 @@
 from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 from app.models import Sex, ActivityLevel, Goal, Adherence
+from app.utils import IMC_CLASSES
 
 
 # Auth
@@ -100,6 +101,11 @@ class PatientResponse(BaseModel):
     goal: Goal
     notes: Optional[str] = None
     cpf_masked: Optional[str] = None  # Sempre mascarado
+    last_checkin_date: Optional[datetime] = None
+    last_weight_kg: Optional[float] = None
+    last_imc: Optional[float] = None
+    next_return_date: Optional[datetime] = None
+    checkin_count: int = 0
     created_at: datetime
     updated_at: datetime
     
@@ -115,11 +121,19 @@ class PatientListResponse(BaseModel):
     created_at: datetime
     last_checkin_date: Optional[datetime] = None
     current_imc: Optional[float] = None
+    last_weight_kg: Optional[float] = None
+    next_return_date: Optional[datetime] = None
+    checkin_count: int = 0
     
     class Config:
         from_attributes = True
 
 
+class PatientListPage(BaseModel):
+    items: list[PatientListResponse]
+    next_cursor: Optional[str] = None
+
+
 # CheckIn
 class CheckInCreate(BaseModel):
     date: datetime
@@ -177,9 +191,93 @@ class CheckInResponse(BaseModel):
         from_attributes = True
 
 
+class CheckInPage(BaseModel):
+    items: list[CheckInResponse]
+    next_cursor: Optional[str] = None
+
+
+class CheckInImportError(BaseModel):
+    line: int
+    error: str
+
+
+class CheckInImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[CheckInImportError]
+    errors_truncated: bool = False  # Só os primeiros erros são listados
+
+
+class PatientImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: list[CheckInImportError]
+    errors_truncated: bool = False
+
+
 # Patient Detail with checkins
 class PatientDetailResponse(PatientResponse):
     checkins: list[CheckInResponse] = []
+    checkins_next_cursor: Optional[str] = None  # Próxima página em /checkins/patients/{id}/checkins
+
+
+# Série temporal em colunas (gráficos de evolução)
+class PatientSeriesResponse(BaseModel):
+    patient_id: UUID
+    total: int  # Check-ins no intervalo, antes da redução
+    downsampled: bool
+    dates: list[datetime]
+    series: dict[str, list[Optional[float]]]  # Uma lista por campo, alinhada com dates
+
+
+# Análises antropométricas (app/analytics.py)
+class PatientAnalyticsSeries(BaseModel):
+    dates: list[datetime]
+    imc: list[Optional[float]]
+    waist_hip_ratio: list[Optional[float]]
+
+
+class PatientAnalyticsResponse(BaseModel):
+    patient_id: UUID
+    goal: Goal
+    checkin_count: int
+    first_date: datetime
+    last_date: datetime
+    weight_kg: Optional[float] = None
+    weight_change_kg: Optional[float] = None  # Último peso menos o primeiro
+    weight_rate_kg_per_week: Optional[float] = None  # Tendência (mínimos quadrados)
+    goal_progress_kg: Optional[float] = None  # Variação no sentido do objetivo; None para manutenção
+    on_track: Optional[bool] = None
+    imc: Optional[float] = None
+    imc_class: Optional[str] = None
+    waist_hip_ratio: Optional[float] = None
+    body_fat_pct: Optional[float] = None
+    body_fat_rate_pct_per_week: Optional[float] = None
+    series: PatientAnalyticsSeries
+
+
+class AnalyticsSummary(BaseModel):
+    mean: Optional[float] = None
+    median: Optional[float] = None
+
+
+class CohortGoalAnalytics(BaseModel):
+    goal: Goal
+    patients: int
+    on_track: int
+    evaluated: int  # Pacientes com ao menos 2 pesos (com tendência)
+    weight_change_kg: AnalyticsSummary
+    weight_rate_kg_per_week: AnalyticsSummary
+    waist_hip_ratio: AnalyticsSummary
+    body_fat_rate_pct_per_week: AnalyticsSummary
+
+
+class CohortAnalyticsResponse(BaseModel):
+    patients: int
+    checkins: int
+    imc_classes: dict[str, int]  # Pacientes por classe do último IMC
+    imc: AnalyticsSummary
+    goals: list[CohortGoalAnalytics]
 
 
 # Templates
@@ -188,3 +286,72 @@ class DefaultTemplatesResponse(BaseModel):
     training: str
     lifestyle: str
 
+
+# Dashboard
+class DashboardStatsResponse(BaseModel):
+    total_patients: int
+    upcoming_returns: int
+    recent_checkins: int
+    upcoming_days: int
+    recent_days: int
+
+
+# Agenda de retornos
+class AgendaPatient(BaseModel):
+    id: UUID
+    full_name: str
+    goal: Goal
+    next_return_date: datetime
+    last_checkin_date: Optional[datetime] = None
+
+
+class AgendaDay(BaseModel):
+    date: date
+    count: int
+    patients: list[AgendaPatient]  # Até limit_per_day, em ordem de horário
+
+
+class AgendaOverdue(BaseModel):
+    count: int
+    patients: list[AgendaPatient]  # Os mais recentes primeiro, até overdue_limit
+
+
+class AgendaResponse(BaseModel):
+    date_from: date
+    date_to: date
+    days: list[AgendaDay]  # Só dias com retornos
+    overdue: AgendaOverdue  # Retornos anteriores a hoje sem check-in depois
+
+
+# Regras de retorno
+class ReturnRuleItem(BaseModel):
+    goal: Optional[Goal] = None
+    adherence: Optional[Adherence] = None
+    activity_level: Optional[ActivityLevel] = None
+    imc_class: Optional[str] = None
+    days: int
+    
+    @field_validator("imc_class")
+    @classmethod
+    def validate_imc_class(cls, v):
+        if v is not None and v not in IMC_CLASSES:
+            raise ValueError(f"Classe de IMC deve ser uma de: {', '.join(IMC_CLASSES)}")
+        return v
+    
+    @field_validator("days")
+    @classmethod
+    def validate_days(cls, v):
+        if v < 1 or v > 365:
+            raise ValueError("Intervalo deve estar entre 1 e 365 dias")
+        return v
+    
+    class Config:
+        from_attributes = True
+
+
+class ReturnRulesUpdate(BaseModel):
+    rules: list[ReturnRuleItem]
+
+
+class ReturnRulesResponse(BaseModel):
+    rules: list[ReturnRuleItem]
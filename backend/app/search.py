@@ -0,0 +1,252 @@
+import re
+import unicodedata
+from sqlalchemy import Engine, case, column, exists, false, func, literal, literal_column, or_, table, text
+from sqlmodel import Session, select, update
+from typing import Iterable
+from uuid import UUID
+from app.models import Patient
+
+# Tabela FTS5 (apenas SQLite) espelhando Patient.search_name por tenant
+FTS_TABLE = "patients_fts"
+patients_fts = table(FTS_TABLE, column("tenant"), column("search_name"), column("patient_id"))
+
+# Termos distintos dos nomes por tenant (apenas SQLite), para a busca tolerante a
+# erros. Um termo sai quando o último paciente do tenant com ele é removido ou
+# renomeado; os candidatos de uma busca são os do tenant com a mesma inicial e
+# comprimento próximo (ix_patient_search_terms_lookup)
+TERMS_TABLE = "patient_search_terms"
+search_terms = table(TERMS_TABLE, column("tenant"), column("term"), column("initial"), column("length"))
+
+
+def normalize_name(name: str) -> str:
+    """Normaliza nome para busca: sem acentos, minúsculo, apenas letras/dígitos"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[^\W_]+", without_accents.lower()))
+
+
+def init_search_backend(engine: Engine) -> None:
+    """Cria as estruturas de busca do dialeto (FTS5 no SQLite, pg_trgm no Postgres)"""
+    with engine.begin() as connection:
+        if engine.dialect.name == "sqlite":
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "tenant, search_name, patient_id UNINDEXED, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            ))
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {TERMS_TABLE} ("
+                "tenant VARCHAR NOT NULL, term VARCHAR NOT NULL, initial VARCHAR NOT NULL, "
+                "length INTEGER NOT NULL, PRIMARY KEY (tenant, term))"
+            ))
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{TERMS_TABLE}_lookup ON {TERMS_TABLE} (tenant, initial, length)"
+            ))
+        elif engine.dialect.name == "postgresql":
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_patients_search_name_trgm "
+                "ON patients USING gin (search_name gin_trgm_ops)"
+            ))
+
+
+def max_typos(term: str) -> int:
+    """Edições toleradas por termo: nenhuma abaixo de 4 letras (ruído demais), 2 a partir de 8"""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Distância de edição (inserção, remoção e troca de um caractere)"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def register_sqlite_functions(dbapi_connection) -> None:
+    """Funções SQL da busca em cada conexão SQLite (ver app/engine.configure_engine)"""
+    dbapi_connection.create_function("levenshtein", 2, levenshtein, deterministic=True)
+
+
+def _uses_fts(session: Session) -> bool:
+    return session.get_bind().dialect.name == "sqlite"
+
+
+def _terms(name) -> set[str]:
+    return set(name.split()) if name else set()
+
+
+def _add_terms(session: Session, names: Iterable[tuple[str, str]]) -> None:
+    """Acrescenta ao vocabulário os termos de (tenant, search_name)"""
+    terms = {(tenant, term) for tenant, name in names for term in _terms(name)}
+    if terms:
+        session.exec(
+            search_terms.insert().prefix_with("OR IGNORE"),
+            params=[
+                {"tenant": tenant, "term": term, "initial": term[0], "length": len(term)}
+                for tenant, term in terms
+            ]
+        )
+
+
+def _prune_terms(session: Session, tenant: str, terms: set[str]) -> None:
+    """Remove do vocabulário do tenant os termos que nenhum paciente indexado usa mais"""
+    if not terms:
+        return
+    in_use = select(patients_fts.c.patient_id).where(
+        literal_column(FTS_TABLE).op("MATCH")(
+            literal(f'tenant:"{tenant}" AND search_name:"') + search_terms.c.term + literal('"')
+        )
+    )
+    session.exec(search_terms.delete().where(
+        search_terms.c.tenant == tenant,
+        search_terms.c.term.in_(terms),
+        ~exists(in_use)
+    ))
+
+
+def index_patient(session: Session, patient: Patient) -> None:
+    """Atualiza o nome normalizado e o índice de busca do paciente (sem commit)"""
+    previous = patient.search_name
+    patient.search_name = normalize_name(patient.full_name)
+    session.add(patient)
+
+    if _uses_fts(session):
+        tenant = patient.professional_id.hex
+        session.exec(patients_fts.delete().where(patients_fts.c.patient_id == patient.id.hex))
+        session.exec(patients_fts.insert().values(
+            tenant=tenant,
+            search_name=patient.search_name,
+            patient_id=patient.id.hex
+        ))
+        _add_terms(session, [(tenant, patient.search_name)])
+        _prune_terms(session, tenant, _terms(previous) - _terms(patient.search_name))
+
+
+def index_patients(session: Session, rows: list[dict]) -> None:
+    """Indexa pacientes recém-inseridos em lote, já com search_name (sem commit)
+
+    Pacientes novos não tiram termos de ninguém: o vocabulário só recebe inserções.
+    """
+    if rows and _uses_fts(session):
+        session.exec(
+            patients_fts.insert(),
+            params=[
+                {"tenant": row["professional_id"].hex, "search_name": row["search_name"], "patient_id": row["id"].hex}
+                for row in rows
+            ]
+        )
+        _add_terms(session, [(row["professional_id"].hex, row["search_name"]) for row in rows])
+
+
+def remove_patient(session: Session, patient: Patient) -> None:
+    """Remove o paciente do índice de busca e os termos que só ele usava (sem commit)"""
+    if _uses_fts(session):
+        session.exec(patients_fts.delete().where(patients_fts.c.patient_id == patient.id.hex))
+        _prune_terms(session, patient.professional_id.hex, _terms(patient.search_name))
+
+
+def rebuild_search_index(session: Session) -> int:
+    """Recalcula search_name de todos os pacientes e reconstrói o índice (sem commit)"""
+    rows = session.exec(select(Patient.id, Patient.professional_id, Patient.full_name)).all()
+    if not rows:
+        return 0
+
+    names = [normalize_name(full_name) for _, _, full_name in rows]
+    session.exec(
+        update(Patient),
+        params=[{"id": patient_id, "search_name": name} for (patient_id, _, _), name in zip(rows, names)]
+    )
+
+    if _uses_fts(session):
+        session.exec(patients_fts.delete())
+        session.exec(
+            patients_fts.insert(),
+            params=[
+                {"tenant": professional_id.hex, "search_name": name, "patient_id": patient_id.hex}
+                for (patient_id, professional_id, _), name in zip(rows, names)
+            ]
+        )
+        # Vocabulário refeito do zero: nenhum termo órfão sobrevive ao rebuild
+        session.exec(search_terms.delete())
+        _add_terms(session, [(professional_id.hex, name) for (_, professional_id, _), name in zip(rows, names)])
+    return len(rows)
+
+
+def _fts_term(tenant: str, term: str):
+    """Prefixo do termo ("joao"*) ou, com 4+ letras, também os termos do vocabulário a poucas edições
+
+    Candidatos: termos do tenant com a mesma inicial e comprimento a até
+    max_typos do termo; um erro na primeira letra não é corrigido.
+
+    Monta a expressão MATCH no próprio SQL: "jaao" vira
+    (search_name:"jaao"* OR search_name:"joao"). Termos do vocabulário e da
+    busca passam por normalize_name, então não contêm aspas.
+    """
+    prefix = f'search_name:"{term}"*'
+    typos = max_typos(term)
+    if not typos:
+        return literal(prefix)
+    corrections = select(
+        func.group_concat(literal(' OR search_name:"') + search_terms.c.term + literal('"'), literal(""))
+    ).where(
+        search_terms.c.tenant == tenant,
+        search_terms.c.initial == term[0],
+        search_terms.c.length.between(len(term) - typos, len(term) + typos),
+        func.levenshtein(search_terms.c.term, term) <= typos
+    ).scalar_subquery()
+    return literal(f"({prefix}") + func.coalesce(corrections, literal("")) + literal(")")
+
+
+def _fts_query(professional_id: UUID, terms: list[str]):
+    # Todos os termos, restritos ao tenant
+    query = literal(f'tenant:"{professional_id.hex}"')
+    for term in terms:
+        query = query + literal(" AND ") + _fts_term(professional_id.hex, term)
+    return query
+
+
+def apply_name_search(statement, session: Session, professional_id: UUID, search: str):
+    """Filtra e ordena por relevância a consulta de pacientes pelo nome"""
+    query = normalize_name(search)
+    if not query:
+        return statement.where(false())
+
+    dialect = session.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        matches = select(
+            patients_fts.c.patient_id,
+            literal_column("rank").label("rank")
+        ).where(
+            literal_column(FTS_TABLE).op("MATCH")(_fts_query(professional_id, query.split()))
+        ).subquery("matches")
+        # Prefixo exato primeiro; os achados só por edição vêm depois
+        exact = or_(Patient.search_name.like(f"{query}%"), Patient.search_name.like(f"% {query}%"))
+        return statement.join(
+            matches, matches.c.patient_id == Patient.id
+        ).order_by(case((exact, 0), else_=1), matches.c.rank, Patient.full_name)
+
+    if dialect == "postgresql":
+        # Prefixo exato ou similaridade por trigramas (tolera erros de digitação)
+        return statement.where(
+            or_(
+                Patient.search_name.like(f"{query}%"),
+                Patient.search_name.like(f"% {query}%"),
+                literal(query).op("<%")(Patient.search_name)
+            )
+        ).order_by(
+            func.word_similarity(query, Patient.search_name).desc(),
+            Patient.full_name
+        )
+
+    return statement.where(
+        Patient.search_name.like(f"%{query}%")
+    ).order_by(Patient.full_name)
@@ -1,7 +1,11 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Optional
 from cryptography.fernet import Fernet
 from app.config import settings
 
@@ -17,6 +21,98 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordPoolBusy(Exception):
+    """Fila do pool de senhas cheia: a requisição deve ser recusada"""
+
+
+class PasswordPool:
+    """Pool de threads dedicado e limitado para o bcrypt
+
+    O bcrypt libera o GIL, então as threads usam todos os núcleos sem
+    travar o event loop. Acima de workers + max_pending tarefas, novas
+    chamadas são recusadas com PasswordPoolBusy em vez de enfileiradas.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.in_flight = 0
+        self.started = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        # Contadores só são alterados no event loop, sem necessidade de lock
+        if self.in_flight >= self.workers + self.max_pending:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+
+        def task():
+            waited = time.perf_counter() - submitted
+            loop.call_soon_threadsafe(self._record_wait, waited)
+            return fn(*args)
+
+        # A vaga só é liberada quando a thread termina, mesmo se o cliente desistir antes
+        self.in_flight += 1
+        future = self.executor.submit(task)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future)
+
+    def _record_wait(self, waited: float) -> None:
+        self.started += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self.completed += 1
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": max(self.in_flight - self.workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds_total / self.started * 1000, 2) if self.started else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password executado no pool de senhas"""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash executado no pool de senhas"""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
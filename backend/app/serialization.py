@@ -0,0 +1,30 @@
+from typing import Sequence
+from sqlmodel import select
+from app.models import CheckIn
+from app.recommendations import TEXT_FIELDS, join_texts, text_column
+from app.schemas import CheckInResponse
+
+# Caminho rápido das listagens: o endpoint seleciona só as colunas da
+# resposta e devolve ORJSONResponse com dicts montados das tuplas. Como o
+# retorno já é uma Response, o FastAPI não valida o response_model de novo
+# (ele continua declarado para a documentação). orjson codifica datetime,
+# UUID e Enum no mesmo formato do Pydantic.
+
+# Colunas de CheckInResponse, na ordem do schema (textos exigem join_texts)
+CHECKIN_RESPONSE_COLUMNS = [
+    text_column(field) if field in TEXT_FIELDS else getattr(CheckIn, field)
+    for field in CheckInResponse.model_fields
+]
+
+
+def checkin_rows_statement():
+    """SELECT das colunas de CheckInResponse com os textos de recomendação"""
+    return join_texts(select(*CHECKIN_RESPONSE_COLUMNS))
+
+
+def row_dicts(rows: Sequence) -> list[dict]:
+    """Linhas (Row) em dicts pelos nomes das colunas selecionadas"""
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
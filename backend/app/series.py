@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Optional, Sequence
+
+# Colunas numéricas de CheckIn disponíveis em /patients/{id}/series
+SERIES_FIELDS = ("weight_kg", "imc", "waist_cm", "hip_cm", "body_fat_pct")
+DOWNSAMPLE_METHODS = ("lttb", "avg")
+
+Column = list[Optional[float]]
+
+
+def parse_fields(fields: str) -> list[str]:
+    """Lista de campos pedida (separada por vírgula), sem repetições; ValueError se inválida"""
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    if not names:
+        raise ValueError(f"Informe ao menos um campo: {', '.join(SERIES_FIELDS)}")
+    invalid = [name for name in names if name not in SERIES_FIELDS]
+    if invalid:
+        raise ValueError(f"Campos inválidos: {', '.join(invalid)}. Disponíveis: {', '.join(SERIES_FIELDS)}")
+    return names
+
+
+def lttb_indices(x: Sequence[float], y: Sequence[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets: índices dos pontos que preservam a forma da curva
+
+    Mantém o primeiro e o último ponto; de cada bucket intermediário fica o
+    ponto que forma o maior triângulo com o escolhido no bucket anterior e a
+    média do bucket seguinte.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(x[next_start:next_end]) / span
+        avg_y = sum(y[next_start:next_end]) / span
+
+        ax, ay = x[a], y[a]
+        best = start
+        best_area = -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (y[j] - ay) - (ax - x[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+        indices.append(best)
+        a = best
+
+    indices.append(n - 1)
+    return indices
+
+
+def mean(values) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def bucket_average(
+    dates: list[datetime],
+    columns: dict[str, Column],
+    buckets: int
+) -> tuple[list[datetime], dict[str, Column]]:
+    """Médias em buckets de mesma duração; buckets vazios são omitidos e nulos ignorados"""
+    if len(dates) <= buckets:
+        return dates, columns
+    first = dates[0].timestamp()
+    width = (dates[-1].timestamp() - first) / buckets or 1.0
+
+    groups: dict[int, list[int]] = {}
+    for i, date in enumerate(dates):
+        groups.setdefault(min(int((date.timestamp() - first) / width), buckets - 1), []).append(i)
+
+    out_dates = []
+    out_columns: dict[str, Column] = {name: [] for name in columns}
+    for members in groups.values():
+        out_dates.append(datetime.fromtimestamp(sum(dates[i].timestamp() for i in members) / len(members)))
+        for name, values in columns.items():
+            value = mean(values[i] for i in members)
+            out_columns[name].append(round(value, 2) if value is not None else None)
+    return out_dates, out_columns
+
+
+def downsample(
+    dates: list[datetime],
+    columns: dict[str, Column],
+    points: int,
+    method: str
+) -> tuple[list[datetime], dict[str, Column]]:
+    """Reduz a série a no máximo points pontos, com as colunas sempre alinhadas
+
+    O LTTB escolhe os pontos pela primeira coluna sem nulos e aplica os
+    mesmos índices às demais; sem coluna completa, cai para médias.
+    """
+    if len(dates) <= points:
+        return dates, columns
+    if method == "lttb":
+        reference = next((values for values in columns.values() if None not in values), None)
+        if reference is not None:
+            x = [date.timestamp() for date in dates]
+            indices = lttb_indices(x, reference, points)
+            return (
+                [dates[i] for i in indices],
+                {name: [values[i] for i in indices] for name, values in columns.items()}
+            )
+    return bucket_average(dates, columns, points)
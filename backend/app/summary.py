@@ -0,0 +1,207 @@
+from collections import Counter
+from datetime import datetime
+from sqlmodel import Session, select, func, update
+from typing import Iterable, Iterator, Optional
+from uuid import UUID
+from app.models import Patient, CheckIn
+from app.tenant_counters import add_daily, pending_checkin_days, rebuild_tenant_counters, return_move
+
+# Colunas do resumo em Patient e a coluna de origem no último check-in
+SUMMARY_FIELDS = {
+    "last_checkin_date": "date",
+    "last_weight_kg": "weight_kg",
+    "last_imc": "imc",
+    "next_return_date": "next_return_date",
+}
+
+
+def latest_checkin_subquery(patient_ids, dialect_name: str):
+    """Subquery com o check-in mais recente de cada paciente informado"""
+    columns = [
+        CheckIn.patient_id,
+        CheckIn.date,
+        CheckIn.weight_kg,
+        CheckIn.imc,
+        CheckIn.next_return_date
+    ]
+
+    if dialect_name == "postgresql":
+        return select(*columns).where(
+            CheckIn.patient_id.in_(patient_ids)
+        ).distinct(
+            CheckIn.patient_id
+        ).order_by(
+            CheckIn.patient_id, CheckIn.date.desc(), CheckIn.id.desc()
+        ).subquery("latest")
+
+    ranked = select(
+        *columns,
+        func.row_number().over(
+            partition_by=CheckIn.patient_id,
+            order_by=(CheckIn.date.desc(), CheckIn.id.desc())
+        ).label("rn")
+    ).where(
+        CheckIn.patient_id.in_(patient_ids)
+    ).subquery("ranked")
+
+    return select(
+        *[ranked.c[column.key] for column in columns]
+    ).where(ranked.c.rn == 1).subquery("latest")
+
+
+def compute_patient_summary(session: Session, patient_id: UUID) -> dict:
+    """Calcula o resumo do paciente a partir dos check-ins"""
+    last_checkin = session.exec(
+        select(*[getattr(CheckIn, source) for source in SUMMARY_FIELDS.values()]).where(
+            CheckIn.patient_id == patient_id
+        ).order_by(CheckIn.date.desc(), CheckIn.id.desc()).limit(1)
+    ).first()
+    count = session.exec(
+        select(func.count()).select_from(CheckIn).where(CheckIn.patient_id == patient_id)
+    ).one()
+
+    summary = {
+        field: getattr(last_checkin, source) if last_checkin else None
+        for field, source in SUMMARY_FIELDS.items()
+    }
+    summary["checkin_count"] = count
+    return summary
+
+
+def lock_patient(session: Session, patient_id: UUID) -> Patient:
+    """Bloqueia a linha do paciente (SELECT ... FOR UPDATE) até o fim da transação"""
+    return session.exec(
+        select(Patient).where(
+            Patient.id == patient_id
+        ).with_for_update().execution_options(populate_existing=True)
+    ).one()
+
+
+def refresh_patient_summary(session: Session, patient: Patient) -> None:
+    """Atualiza o resumo do paciente na transação corrente (sem commit)
+
+    O chamador deve obter o paciente com lock_patient antes de alterar os
+    check-ins, para que escritas concorrentes não gravem um resumo defasado.
+    Também incrementa a versão do paciente e toca updated_at, já que o
+    detalhe e o histórico mudaram, e aplica aos contadores do tenant os
+    check-ins pendentes na sessão e a mudança do próximo retorno.
+    """
+    checkin_deltas = pending_checkin_days(session, patient.professional_id, patient.id)
+    previous_return = patient.next_return_date
+    session.flush()
+    for field, value in compute_patient_summary(session, patient.id).items():
+        setattr(patient, field, value)
+    add_daily(
+        session,
+        checkins=checkin_deltas,
+        returns=return_move(patient.professional_id, previous_return, patient.next_return_date)
+    )
+    patient.version = Patient.version + 1
+    patient.updated_at = datetime.utcnow()
+    session.add(patient)
+
+
+def backfill_patient_summaries(
+    session: Session,
+    professional_id: Optional[UUID] = None,
+    patient_ids: Optional[Iterable[UUID]] = None,
+    touch: bool = False
+) -> int:
+    """Recalcula o resumo dos pacientes (todos ou os informados) em um único UPDATE (sem commit)
+
+    A versão dos pacientes é sempre incrementada; com touch, updated_at
+    também é atualizado (check-ins gravados, não só o resumo recalculado).
+
+    Contadores do tenant: com patient_ids, só os retornos são ajustados (quem
+    inseriu os check-ins soma os check-ins, ver app/checkin_import.py); sem
+    eles, os contadores do escopo são recalculados do zero.
+    """
+    def latest(column):
+        return select(column).where(
+            CheckIn.patient_id == Patient.id
+        ).order_by(
+            CheckIn.date.desc(), CheckIn.id.desc()
+        ).limit(1).scalar_subquery()
+
+    values = {
+        field: latest(getattr(CheckIn, source))
+        for field, source in SUMMARY_FIELDS.items()
+    }
+    values["checkin_count"] = select(func.count()).select_from(CheckIn).where(
+        CheckIn.patient_id == Patient.id
+    ).scalar_subquery()
+    values["version"] = Patient.version + 1
+    if touch:
+        values["updated_at"] = datetime.utcnow()
+
+    filters = []
+    if professional_id:
+        filters.append(Patient.professional_id == professional_id)
+    if patient_ids is not None:
+        patient_ids = list(patient_ids)
+        filters.append(Patient.id.in_(patient_ids))
+
+    def next_returns() -> dict:
+        rows = session.exec(select(Patient.id, Patient.professional_id, Patient.next_return_date).where(*filters))
+        return {patient_id: (tenant, next_return) for patient_id, tenant, next_return in rows}
+
+    before = next_returns() if patient_ids is not None else None
+    result = session.exec(update(Patient).where(*filters).values(**values).execution_options(synchronize_session=False))
+
+    if patient_ids is None:
+        rebuild_tenant_counters(session, professional_id)
+    else:
+        returns = Counter()
+        for patient_id, (tenant, next_return) in next_returns().items():
+            returns.update(return_move(tenant, before[patient_id][1], next_return))
+        add_daily(session, returns=returns)
+    return result.rowcount
+
+
+def find_summary_drift(session: Session, batch_size: int = 1000) -> Iterator[tuple[UUID, dict, dict]]:
+    """Percorre os pacientes e retorna (id, resumo gravado, resumo esperado) dos divergentes"""
+    latest = latest_checkin_subquery(select(Patient.id), session.get_bind().dialect.name)
+    counts = select(
+        CheckIn.patient_id,
+        func.count().label("checkin_count")
+    ).group_by(CheckIn.patient_id).subquery("counts")
+
+    statement = select(
+        Patient.id,
+        *[getattr(Patient, field) for field in SUMMARY_FIELDS],
+        Patient.checkin_count,
+        *[latest.c[source].label(f"expected_{field}") for field, source in SUMMARY_FIELDS.items()],
+        func.coalesce(counts.c.checkin_count, 0).label("expected_checkin_count")
+    ).outerjoin(
+        latest, latest.c.patient_id == Patient.id
+    ).outerjoin(
+        counts, counts.c.patient_id == Patient.id
+    ).execution_options(yield_per=batch_size)
+
+    fields = [*SUMMARY_FIELDS, "checkin_count"]
+    for row in session.exec(statement):
+        mapping = row._mapping
+        current = {field: mapping[field] for field in fields}
+        expected = {field: mapping[f"expected_{field}"] for field in fields}
+        if current != expected:
+            yield mapping["id"], current, expected
+
+
+def repair_summary_drift(session: Session, drift: list[tuple[UUID, dict, dict]]) -> int:
+    """Grava o resumo esperado para os pacientes divergentes (sem commit)"""
+    if not drift:
+        return 0
+    session.exec(
+        update(Patient),
+        params=[{"id": patient_id, **expected} for patient_id, _, expected in drift]
+    )
+    patient_ids = [patient_id for patient_id, _, _ in drift]
+    session.exec(
+        update(Patient).where(
+            Patient.id.in_(patient_ids)
+        ).values(version=Patient.version + 1).execution_options(synchronize_session=False)
+    )
+    # Retornos mudaram por fora dos deltas: recalcula os contadores dos tenants afetados
+    for professional_id in session.exec(select(Patient.professional_id).where(Patient.id.in_(patient_ids)).distinct()):
+        rebuild_tenant_counters(session, professional_id)
+    return len(drift)
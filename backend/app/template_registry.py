@@ -0,0 +1,84 @@
+import hashlib
+import json
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import event
+from sqlmodel import select
+from app.cache import TTLCache
+from app.config import settings
+from app.models import Goal, Patient
+from app.read_cache import read_cache
+from app.utils import DEFAULT_TEMPLATES
+
+TEMPLATE_KINDS = ("diet", "training", "lifestyle")
+
+
+class TemplateSet:
+    """Templates de um objetivo, com o corpo JSON e o ETag forte já calculados"""
+
+    def __init__(self, texts: dict[str, str]):
+        self.texts = MappingProxyType(dict(texts))
+        self.body = json.dumps(dict(texts), ensure_ascii=False, separators=(",", ":")).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+
+def load_templates(directory: str = "") -> dict[Goal, TemplateSet]:
+    """Templates padrão, sobrepostos pelos arquivos <directory>/<objetivo>/<tipo>.txt
+
+    objetivo é o nome do Goal em minúsculas (emagrecimento, hipertrofia,
+    manutencao, saude_geral) e tipo é diet, training ou lifestyle. Arquivos
+    ausentes mantêm o texto padrão. O ETag vem do conteúdo, então cada
+    versão dos arquivos tem o seu.
+    """
+    registry = {}
+    for goal in Goal:
+        texts = dict(DEFAULT_TEMPLATES.get(goal, DEFAULT_TEMPLATES[Goal.SAUDE_GERAL]))
+        if directory:
+            for kind in TEMPLATE_KINDS:
+                path = Path(directory) / goal.name.lower() / f"{kind}.txt"
+                if path.is_file():
+                    texts[kind] = path.read_text(encoding="utf-8").strip()
+        registry[goal] = TemplateSet(texts)
+    return registry
+
+
+# Montado uma vez na importação; mudanças nos arquivos valem após reiniciar
+template_registry = load_templates(settings.TEMPLATES_DIR)
+
+
+# Objetivo do paciente por (profissional, paciente), para os templates do paciente,
+# junto com o token de versão do cache de leitura em que foi lido. O cache é por
+# worker: com o cache de leitura compartilhado (redis), a escrita em qualquer worker
+# troca o token e as entradas antigas deixam de valer; sem ele, a troca de objetivo
+# feita em outro worker só aparece aqui quando a entrada expira (TTL curto).
+patient_goal_cache: TTLCache[tuple[str, Goal]] = TTLCache(
+    ttl_seconds=settings.PATIENT_GOAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PATIENT_GOAL_CACHE_MAX_ENTRIES
+)
+
+
+async def resolve_patient_goal(session, professional_id: UUID, patient_id: UUID) -> Optional[Goal]:
+    """Objetivo do paciente do profissional (None se não existe ou é de outro tenant)"""
+    key = (professional_id, patient_id)
+    version = await read_cache.version(professional_id, patient_id)
+    entry = patient_goal_cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    goal = (await session.exec(
+        select(Patient.goal).where(
+            Patient.id == patient_id,
+            Patient.professional_id == professional_id
+        )
+    )).first()
+    if goal is not None:
+        patient_goal_cache.put(key, (version, goal))
+    return goal
+
+
+# Alterações via ORM neste worker invalidam a entrada no flush; as demais dependem da versão ou do TTL
+@event.listens_for(Patient, "after_update")
+@event.listens_for(Patient, "after_delete")
+def invalidate_patient_goal(mapper, connection, target: Patient) -> None:
+    patient_goal_cache.invalidate((target.professional_id, target.id))
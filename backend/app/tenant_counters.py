@@ -0,0 +1,187 @@
+from collections import Counter
+from datetime import date, datetime
+from typing import Iterable, Optional
+from uuid import UUID
+from sqlalchemy import Date, cast, delete, func, inspect, literal, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+from app.models import CheckIn, Patient, TenantCounter, TenantDailyCounter
+
+# Contadores por tenant lidos pelo dashboard (ver app/routers/dashboard.py)
+#
+# tenant_counters guarda o total de pacientes e tenant_daily_counters, por dia
+# (UTC), os check-ins feitos e os retornos previstos (pacientes cujo
+# next_return_date do resumo cai no dia). São atualizados por deltas na mesma
+# transação que grava pacientes, check-ins e o resumo (app/summary.py), com
+# INSERT ... ON CONFLICT DO UPDATE somando ao valor atual: escritas concorrentes
+# no mesmo tenant não perdem incrementos. O dashboard lê uma linha por dia da
+# janela, qualquer que seja o tamanho do tenant.
+#
+# Inserções fora desses caminhos (scripts que gravam direto nas tabelas) são
+# cobertas por rebuild_tenant_counters, que o backfill do resumo por tenant
+# chama; scripts/patient_summary.py check também compara os contadores.
+
+DailyDeltas = Counter  # (professional_id, dia) -> delta; somar com update(), "+" descarta negativos
+
+
+def day_of(value: Optional[datetime]) -> Optional[date]:
+    return value.date() if value is not None else None
+
+
+def _insert(session: Session):
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert
+
+
+def add_patients(session: Session, professional_id: UUID, delta: int) -> None:
+    """Soma delta ao total de pacientes do tenant (sem commit)"""
+    if not delta:
+        return
+    statement = _insert(session)(TenantCounter).values(professional_id=professional_id, patients=delta)
+    session.exec(statement.on_conflict_do_update(
+        index_elements=[TenantCounter.professional_id],
+        set_={"patients": TenantCounter.patients + statement.excluded.patients}
+    ))
+
+
+def add_daily(session: Session, checkins: DailyDeltas = None, returns: DailyDeltas = None) -> None:
+    """Soma os deltas de check-ins e retornos por (tenant, dia) (sem commit)"""
+    checkins, returns = checkins or Counter(), returns or Counter()
+    # Ordem fixa das chaves: transações concorrentes travam as linhas na mesma ordem
+    keys = sorted(key for key in set(checkins) | set(returns) if key[1] is not None and (checkins[key] or returns[key]))
+    if not keys:
+        return
+    statement = _insert(session)(TenantDailyCounter).values([
+        {"professional_id": key[0], "day": key[1], "checkins": checkins[key], "returns": returns[key]}
+        for key in keys
+    ])
+    session.exec(statement.on_conflict_do_update(
+        index_elements=[TenantDailyCounter.professional_id, TenantDailyCounter.day],
+        set_={
+            "checkins": TenantDailyCounter.checkins + statement.excluded.checkins,
+            "returns": TenantDailyCounter.returns + statement.excluded.returns,
+        }
+    ))
+
+
+def checkin_days(professional_id: UUID, dates: Iterable[datetime], sign: int = 1) -> DailyDeltas:
+    return Counter({(professional_id, day): sign * count for day, count in Counter(map(day_of, dates)).items()})
+
+
+def return_move(professional_id: UUID, before: Optional[datetime], after: Optional[datetime]) -> DailyDeltas:
+    """Delta de retornos quando o próximo retorno de um paciente passa de before para after"""
+    deltas = Counter()
+    if day_of(before) != day_of(after):
+        deltas[(professional_id, day_of(before))] -= 1
+        deltas[(professional_id, day_of(after))] += 1
+    return deltas
+
+
+def pending_checkin_days(session: Session, professional_id: UUID, patient_id: UUID) -> DailyDeltas:
+    """Check-ins do paciente criados, removidos ou com a data alterada na sessão, ainda sem flush"""
+    deltas = Counter()
+    for checkin in session.new:
+        if isinstance(checkin, CheckIn) and checkin.patient_id == patient_id:
+            deltas[(professional_id, day_of(checkin.date))] += 1
+    for checkin in session.deleted:
+        if isinstance(checkin, CheckIn) and checkin.patient_id == patient_id:
+            deltas[(professional_id, day_of(checkin.date))] -= 1
+    for checkin in session.dirty:
+        if isinstance(checkin, CheckIn) and checkin.patient_id == patient_id:
+            history = inspect(checkin).attrs.date.history
+            if history.deleted and history.added:
+                deltas[(professional_id, day_of(history.deleted[0]))] -= 1
+                deltas[(professional_id, day_of(history.added[0]))] += 1
+    return deltas
+
+
+def remove_patient_counts(session: Session, patient: Patient) -> None:
+    """Desconta o paciente e os seus check-ins dos contadores antes de apagá-lo (sem commit)"""
+    dates = session.exec(select(CheckIn.date).where(CheckIn.patient_id == patient.id)).all()
+    add_patients(session, patient.professional_id, -1)
+    add_daily(
+        session,
+        checkins=checkin_days(patient.professional_id, dates, sign=-1),
+        returns=return_move(patient.professional_id, patient.next_return_date, None)
+    )
+
+
+def _day_expression(session: Session, column):
+    # No SQLite DateTime é texto e date() devolve o formato que o tipo Date grava
+    if session.get_bind().dialect.name == "sqlite":
+        return func.date(column)
+    return cast(column, Date)
+
+
+def rebuild_tenant_counters(session: Session, professional_id: Optional[UUID] = None) -> None:
+    """Recalcula os contadores do tenant (ou de todos) a partir de pacientes e check-ins (sem commit)"""
+    patient_filter = [Patient.professional_id == professional_id] if professional_id else []
+    counter_filter = [TenantCounter.professional_id == professional_id] if professional_id else []
+    daily_filter = [TenantDailyCounter.professional_id == professional_id] if professional_id else []
+    session.exec(delete(TenantCounter).where(*counter_filter))
+    session.exec(delete(TenantDailyCounter).where(*daily_filter))
+
+    session.exec(TenantCounter.__table__.insert().from_select(
+        ["professional_id", "patients"],
+        select(Patient.professional_id, func.count()).where(*patient_filter).group_by(Patient.professional_id)
+    ))
+
+    events = union_all(
+        select(
+            Patient.professional_id.label("professional_id"),
+            _day_expression(session, CheckIn.date).label("day"),
+            literal(1).label("checkins"),
+            literal(0).label("returns")
+        ).select_from(CheckIn).join(Patient, Patient.id == CheckIn.patient_id).where(*patient_filter),
+        select(
+            Patient.professional_id,
+            _day_expression(session, Patient.next_return_date),
+            literal(0),
+            literal(1)
+        ).where(*patient_filter, Patient.next_return_date.is_not(None))
+    ).subquery("events")
+    session.exec(TenantDailyCounter.__table__.insert().from_select(
+        ["professional_id", "day", "checkins", "returns"],
+        select(
+            events.c.professional_id, events.c.day, func.sum(events.c.checkins), func.sum(events.c.returns)
+        ).group_by(events.c.professional_id, events.c.day)
+    ))
+
+
+def find_counter_drift(session: Session) -> list[UUID]:
+    """Tenants cujos contadores gravados divergem de pacientes e check-ins"""
+    expected_patients = dict(session.exec(
+        select(Patient.professional_id, func.count()).group_by(Patient.professional_id)
+    ).all())
+    stored_patients = {
+        professional_id: patients
+        for professional_id, patients in session.exec(select(TenantCounter.professional_id, TenantCounter.patients))
+        if patients
+    }
+
+    expected_daily = Counter()
+    for professional_id, day, count in session.exec(
+        select(Patient.professional_id, _day_expression(session, CheckIn.date), func.count())
+        .select_from(CheckIn)
+        .join(Patient, Patient.id == CheckIn.patient_id)
+        .group_by(Patient.professional_id, _day_expression(session, CheckIn.date))
+    ):
+        expected_daily[(professional_id, str(day), "checkins")] = count
+    for professional_id, day, count in session.exec(
+        select(Patient.professional_id, _day_expression(session, Patient.next_return_date), func.count())
+        .where(Patient.next_return_date.is_not(None))
+        .group_by(Patient.professional_id, _day_expression(session, Patient.next_return_date))
+    ):
+        expected_daily[(professional_id, str(day), "returns")] = count
+    stored_daily = Counter()
+    for row in session.exec(select(TenantDailyCounter)):
+        stored_daily[(row.professional_id, str(row.day), "checkins")] = row.checkins
+        stored_daily[(row.professional_id, str(row.day), "returns")] = row.returns
+
+    drifted = {
+        professional_id
+        for professional_id in set(expected_patients) | set(stored_patients)
+        if expected_patients.get(professional_id, 0) != stored_patients.get(professional_id, 0)
+    }
+    drifted |= {key[0] for key in set(expected_daily) | set(stored_daily) if expected_daily[key] != stored_daily[key]}
+    return sorted(drifted)
@@ -1,6 +1,5 @@
-from datetime import datetime, timedelta
-from app.models import Goal, Adherence
-from app.config import settings
+from bisect import bisect_right
+from app.models import Goal
 
 
 def calculate_imc(weight_kg: float, height_cm: float) -> float:
@@ -10,50 +9,28 @@ def calculate_imc(weight_kg: float, height_cm: float) -> float:
     return round(imc, 2)
 
 
+# Classes de IMC da OMS e os limites superiores (exclusivos) de cada uma
+IMC_CLASSES = (
+    "Abaixo do peso",
+    "Peso normal",
+    "Sobrepeso",
+    "Obesidade grau I",
+    "Obesidade grau II",
+    "Obesidade grau III",
+)
+IMC_CLASS_BOUNDS = (18.5, 25, 30, 35, 40)
+
+
 def classify_imc(imc: float) -> str:
     """Classifica IMC segundo padrão OMS (apenas informativo)"""
-    if imc < 18.5:
-        return "Abaixo do peso"
-    elif imc < 25:
-        return "Peso normal"
-    elif imc < 30:
-        return "Sobrepeso"
-    elif imc < 35:
-        return "Obesidade grau I"
-    elif imc < 40:
-        return "Obesidade grau II"
-    else:
-        return "Obesidade grau III"
-
-
-def suggest_next_return_date(
-    goal: Goal,
-    adherence: Adherence | None,
-    current_date: datetime
-) -> datetime:
-    """Sugere data de próximo retorno baseado em regras configuráveis"""
-    base_days = {
-        Goal.EMAGRECIMENTO: settings.RETURN_RULE_EMAGRECIMENTO,
-        Goal.HIPERTROFIA: settings.RETURN_RULE_HIPERTROFIA,
-        Goal.MANUTENCAO: settings.RETURN_RULE_MANUTENCAO,
-        Goal.SAUDE_GERAL: settings.RETURN_RULE_SAUDE_GERAL,
-    }
-    
-    days = base_days.get(goal, 30)
-    
-    # Reduz intervalo se adesão baixa
-    if adherence == Adherence.BAIXA:
-        days -= settings.RETURN_RULE_REDUCAO_ADESAO_BAIXA
-    
-    return current_date + timedelta(days=max(days, 7))  # Mínimo 7 dias
+    return IMC_CLASSES[bisect_right(IMC_CLASS_BOUNDS, imc)]
 
 
-def get_default_templates(goal: Goal) -> dict[str, str]:
-    """Retorna templates padrão baseados no objetivo"""
-    
-    templates = {
-        Goal.EMAGRECIMENTO: {
-            "diet": """RECOMENDAÇÕES DIETÉTICAS - EMAGRECIMENTO
+# Templates padrão por objetivo, montados uma vez na importação
+# (personalizações por arquivo ficam em app/template_registry.py)
+DEFAULT_TEMPLATES = {
+    Goal.EMAGRECIMENTO: {
+        "diet": """RECOMENDAÇÕES DIETÉTICAS - EMAGRECIMENTO
 
 • Priorize alimentos in natura e minimamente processados
 • Consuma 5-6 refeições ao dia em porções moderadas
@@ -63,7 +40,7 @@ def get_default_templates(goal: Goal) -> dict[str, str]:
 • Prefira métodos de cocção: grelhado, assado, cozido, refogado
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - EMAGRECIMENTO
+        "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - EMAGRECIMENTO
 
 • Pratique exercícios aeróbicos 3-5x/semana (30-60 min)
 • Inclua treinamento de força 2-3x/semana
@@ -72,7 +49,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Progressão gradual de intensidade e volume
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - EMAGRECIMENTO
+        "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - EMAGRECIMENTO
 
 • Durma 7-9 horas por noite
 • Gerencie o estresse (meditação, respiração, hobbies)
@@ -81,9 +58,9 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Registre progresso e dificuldades
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual."""
-        },
-        Goal.HIPERTROFIA: {
-            "diet": """RECOMENDAÇÕES DIETÉTICAS - HIPERTROFIA
+    },
+    Goal.HIPERTROFIA: {
+        "diet": """RECOMENDAÇÕES DIETÉTICAS - HIPERTROFIA
 
 • Aumente o consumo de proteínas de alto valor biológico
 • Distribua proteínas ao longo do dia (1,6-2,2g/kg)
@@ -93,7 +70,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Refeição pós-treino rica em proteína e carboidrato
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - HIPERTROFIA
+        "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - HIPERTROFIA
 
 • Treinamento de força 3-5x/semana
 • Priorize exercícios multiarticulares
@@ -102,7 +79,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Inclua exercícios aeróbicos moderados 2-3x/semana
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - HIPERTROFIA
+        "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - HIPERTROFIA
 
 • Sono de qualidade (7-9h) para recuperação
 • Evite estresse crônico
@@ -111,9 +88,9 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Monitore progresso (medidas, força, composição corporal)
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual."""
-        },
-        Goal.MANUTENCAO: {
-            "diet": """RECOMENDAÇÕES DIETÉTICAS - MANUTENÇÃO
+    },
+    Goal.MANUTENCAO: {
+        "diet": """RECOMENDAÇÕES DIETÉTICAS - MANUTENÇÃO
 
 • Mantenha alimentação equilibrada e variada
 • Consuma todos os grupos alimentares com moderação
@@ -123,7 +100,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Pratique alimentação consciente
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - MANUTENÇÃO
+        "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - MANUTENÇÃO
 
 • Pratique atividade física regular (150 min/semana moderada ou 75 min intensa)
 • Combine exercícios aeróbicos e de força
@@ -132,7 +109,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Mantenha movimento ao longo do dia
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - MANUTENÇÃO
+        "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - MANUTENÇÃO
 
 • Mantenha rotina de sono regular (7-9h)
 • Gerencie estresse adequadamente
@@ -141,9 +118,9 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Monitore peso e medidas periodicamente
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual."""
-        },
-        Goal.SAUDE_GERAL: {
-            "diet": """RECOMENDAÇÕES DIETÉTICAS - SAÚDE GERAL
+    },
+    Goal.SAUDE_GERAL: {
+        "diet": """RECOMENDAÇÕES DIETÉTICAS - SAÚDE GERAL
 
 • Alimentação variada e colorida
 • Priorize alimentos in natura e minimamente processados
@@ -153,7 +130,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Respeite sinais de fome e saciedade
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - SAÚDE GERAL
+        "training": """RECOMENDAÇÕES DE ATIVIDADE FÍSICA - SAÚDE GERAL
 
 • Pratique atividade física regular (150 min/semana moderada)
 • Combine exercícios aeróbicos, força e flexibilidade
@@ -162,7 +139,7 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Progressão gradual e segura
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual.""",
-            "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - SAÚDE GERAL
+        "lifestyle": """RECOMENDAÇÕES DE ESTILO DE VIDA - SAÚDE GERAL
 
 • Sono adequado e regular (7-9h)
 • Gerencie estresse (técnicas de relaxamento)
@@ -171,8 +148,11 @@ IMPORTANTE: Este é um template educativo. Personalize conforme avaliação indi
 • Realize check-ups médicos periódicos
 
 IMPORTANTE: Este é um template educativo. Personalize conforme avaliação individual."""
-        }
     }
-    
-    return templates.get(goal, templates[Goal.SAUDE_GERAL])
+}
+
+
+def get_default_templates(goal: Goal) -> dict[str, str]:
+    """Retorna templates padrão baseados no objetivo"""
+    return DEFAULT_TEMPLATES.get(goal, DEFAULT_TEMPLATES[Goal.SAUDE_GERAL])
 
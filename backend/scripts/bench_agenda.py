@@ -0,0 +1,68 @@
+"""
+Benchmark da agenda de retornos
+Mede a latência de compute_agenda (GET /agenda) para tenants de 1k a 100k
+pacientes, com os parâmetros padrão do endpoint (7 dias, 20 por dia,
+atrasados dos últimos 30 dias), com outro tenant do mesmo tamanho
+no banco
+"""
+import sys
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from datetime import datetime, timedelta
+from sqlmodel import SQLModel, Session
+from app.database import create_engine_for
+from app.models import Professional
+from app.routers.agenda import compute_agenda
+from scripts.bench_dashboard import populate
+
+
+def run(sizes: list[int], repeat: int, days: int):
+    today = datetime.utcnow().date()
+    date_to = today + timedelta(days=days - 1)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine_for(f"sqlite:///{tmp}/bench.db")
+            SQLModel.metadata.create_all(engine)
+
+            with Session(engine) as session:
+                professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+                other = Professional(name="Outro", email="outro@example.com", password_hash="x")
+                session.add(professional)
+                session.add(other)
+                session.commit()
+                professional_id = professional.id
+                populate(session, professional_id, size, checkins_per_patient=1)
+                populate(session, other.id, size, checkins_per_patient=1)
+
+            timings = []
+            with Session(engine) as session:
+                compute_agenda(session, professional_id, today, date_to, 20, 50, 30)  # aquecimento
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    agenda = compute_agenda(session, professional_id, today, date_to, 20, 50, 30)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            engine.dispose()
+            upcoming = sum(day["count"] for day in agenda["days"])
+            print(
+                f"{size:>7} pacientes | mediana {statistics.median(timings):7.2f} ms"
+                f" | p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:7.2f} ms"
+                f" | dias={len(agenda['days'])} retornos={upcoming} atrasados={agenda['overdue']['count']}"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--days", type=int, default=7, help="Tamanho da janela da agenda")
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat, args.days)
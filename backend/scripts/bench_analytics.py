@@ -0,0 +1,210 @@
+"""
+Benchmark das análises antropométricas
+Compara patient_metrics (NumPy, app/analytics.py) com um laço em Python puro
+que calcula as mesmas métricas por paciente, sobre linhas sintéticas
+(padrão: 1M check-ins de 10k pacientes). A conversão das linhas no formato
+de CHECKIN_COLUMNS em colunas NumPy é medida à parte. Com --db mede também
+compute_cohort_analytics lendo de um SQLite temporário.
+
+Uso:
+  python scripts/bench_analytics.py
+  python scripts/bench_analytics.py --checkins 1000000 --patients 10000 --db
+"""
+import sys
+import math
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from app.analytics import (
+    GOAL_DIRECTION,
+    MAINTENANCE_TOLERANCE_KG_PER_WEEK,
+    SECONDS_PER_WEEK,
+    CheckInArrays,
+    patient_metrics
+)
+from app.models import Goal
+from app.utils import classify_imc
+
+
+def synthetic_rows(n_checkins: int, n_patients: int) -> list[tuple]:
+    """Linhas (patient_id, date, peso, cintura, quadril, gordura, altura, objetivo) em ordem de (paciente, data)"""
+    random.seed(42)
+    per_patient = n_checkins // n_patients
+    start = datetime(2020, 1, 1)
+    rows = []
+    for _ in range(n_patients):
+        patient_id = uuid4()
+        goal = random.choice(list(Goal))
+        height = random.uniform(150, 195)
+        weight = random.uniform(55, 120)
+        trend = random.uniform(-0.8, 0.6)
+        for i in range(per_patient):
+            weight += trend + random.gauss(0, 0.4)
+            measured = i % 3 != 2
+            rows.append((
+                patient_id,
+                start + timedelta(days=7 * i, hours=random.randint(0, 12)),
+                round(weight, 1),
+                round(weight * 1.1, 1) if measured else None,
+                round(weight * 1.25, 1) if measured else None,
+                round(random.uniform(15, 40), 1) if i % 2 == 0 else None,
+                height,
+                goal,
+            ))
+    return rows
+
+
+def slope(xs: list[float], ys: list[float]) -> float:
+    points = [(x, y) for x, y in zip(xs, ys) if y is not None]
+    n = len(points)
+    if n < 2:
+        return math.nan
+    sx = sum(x for x, _ in points)
+    sy = sum(y for _, y in points)
+    sxx = sum(x * x for x, _ in points)
+    sxy = sum(x * y for x, y in points)
+    denominator = n * sxx - sx * sx
+    return (n * sxy - sx * sy) / denominator if abs(denominator) > 1e-12 else math.nan
+
+
+def python_metrics(rows: list[tuple]) -> list[dict]:
+    """Mesmas métricas de patient_metrics, paciente a paciente em Python puro"""
+    results = []
+    i = 0
+    while i < len(rows):
+        j = i
+        while j < len(rows) and rows[j][0] == rows[i][0]:
+            j += 1
+        group = rows[i:j]
+        first_seconds = group[0][1].timestamp()
+        weeks = [(row[1].timestamp() - first_seconds) / SECONDS_PER_WEEK for row in group]
+        weights = [row[2] for row in group]
+        height = group[0][6]
+        imcs = [weight / (height / 100) ** 2 for weight in weights]
+        whrs = [row[3] / row[4] for row in group if row[3] is not None and row[4]]
+        body_fat = [row[5] for row in group]
+        rate = slope(weeks, weights)
+        direction = GOAL_DIRECTION.get(group[0][7], 0)
+        if math.isnan(rate):
+            on_track = None
+        elif direction == 0:
+            on_track = abs(rate) <= MAINTENANCE_TOLERANCE_KG_PER_WEEK
+        else:
+            on_track = rate * direction > 0
+        results.append({
+            "checkin_count": len(group),
+            "weight_kg": weights[-1],
+            "weight_change_kg": weights[-1] - weights[0],
+            "weight_rate_kg_per_week": rate,
+            "on_track": on_track,
+            "imc": imcs[-1],
+            "imc_class": classify_imc(imcs[-1]),
+            "waist_hip_ratio": whrs[-1] if whrs else None,
+            "body_fat_rate_pct_per_week": slope(weeks, body_fat),
+        })
+        i = j
+    return results
+
+
+def timed(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def run_db(rows: list[tuple], repeat: int):
+    from sqlalchemy import insert
+    from sqlmodel import SQLModel, Session
+    from app.analytics import cohort_analytics_from_rows, compute_cohort_analytics, load_cohort_rows
+    from app.database import create_engine_for
+    from app.models import ActivityLevel, CheckIn, Patient, Professional, Sex
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine_for(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+            session.add(professional)
+            session.commit()
+            professional_id = professional.id
+
+            now = datetime.utcnow()
+            patients = {}
+            for row in rows:
+                patients.setdefault(row[0], row)
+            session.execute(insert(Patient), [
+                {
+                    "id": patient_id, "professional_id": professional_id, "full_name": "Paciente",
+                    "birth_date": datetime(1990, 1, 1), "sex": Sex.OUTRO, "height_cm": row[6],
+                    "activity_level": ActivityLevel.MODERADO, "goal": row[7],
+                    "created_at": now, "updated_at": now,
+                }
+                for patient_id, row in patients.items()
+            ])
+            for offset in range(0, len(rows), 50_000):
+                session.execute(insert(CheckIn), [
+                    {
+                        "id": uuid4(), "patient_id": row[0], "date": row[1], "weight_kg": row[2],
+                        "waist_cm": row[3], "hip_cm": row[4], "body_fat_pct": row[5],
+                        "imc": row[2] / (row[6] / 100) ** 2, "created_at": now,
+                    }
+                    for row in rows[offset:offset + 50_000]
+                ])
+            session.commit()
+
+            seconds, cohort = timed(lambda: compute_cohort_analytics(session, professional_id), repeat)
+            # No endpoint só a leitura roda na thread da sessão; as contas vão para o threadpool
+            load_s, (checkin_rows, patients) = timed(lambda: load_cohort_rows(session, professional_id), repeat)
+            compute_s, _ = timed(lambda: cohort_analytics_from_rows(checkin_rows, patients), repeat)
+        engine.dispose()
+    print(f"compute_cohort_analytics (SQLite, {cohort['checkins']} check-ins): {seconds * 1000:.0f} ms")
+    print(f"  load_cohort_rows: {load_s * 1000:.0f} ms, cohort_analytics_from_rows: {compute_s * 1000:.0f} ms")
+
+
+def run(n_checkins: int, n_patients: int, repeat: int, db: bool):
+    rows = synthetic_rows(n_checkins, n_patients)
+    print(f"{len(rows)} check-ins, {n_patients} pacientes")
+
+    python_s, python_result = timed(lambda: python_metrics(rows), repeat)
+    checkin_rows = [(str(row[0]), *row[1:6]) for row in rows]
+    patients = {str(row[0]): (row[0], row[6], row[7]) for row in rows}
+    columns_s, arrays = timed(lambda: CheckInArrays(checkin_rows, patients), repeat)
+    numpy_s, metrics = timed(lambda: patient_metrics(arrays), repeat)
+
+    # Os dois caminhos devem concordar
+    rates = np.array([result["weight_rate_kg_per_week"] for result in python_result])
+    assert np.allclose(rates, metrics["weight_rate_kg_per_week"], equal_nan=True)
+    assert np.allclose([result["imc"] for result in python_result], metrics["imc"])
+
+    print(f"{'caminho':<30} | {'ms':>8}")
+    print(f"{'Python puro':<30} | {python_s * 1000:8.0f}")
+    print(f"{'linhas -> colunas NumPy':<30} | {columns_s * 1000:8.0f}")
+    print(f"{'patient_metrics (NumPy)':<30} | {numpy_s * 1000:8.0f}")
+    print(f"ganho: cálculo {python_s / numpy_s:.0f}x, com conversão {python_s / (columns_s + numpy_s):.1f}x")
+
+    if db:
+        run_db(rows, repeat)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkins", type=int, default=1_000_000)
+    parser.add_argument("--patients", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", action="store_true", help="Mede também a leitura do SQLite")
+    args = parser.parse_args()
+
+    run(args.checkins, args.patients, args.repeat, args.db)
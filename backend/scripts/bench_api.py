@@ -0,0 +1,250 @@
+"""
+Benchmark da API em processo, com baseline para detectar regressões
+Popula um SQLite temporário com scripts/synthetic_data.py e percorre todos
+os routers com httpx.AsyncClient sobre a aplicação (ASGITransport, sem
+servidor), uma requisição por vez com alvos sorteados por semente. Para cada
+cenário reporta p50/p95/p99 e consultas SQL por requisição.
+
+Com --save-baseline grava os resultados em JSON; com --baseline compara e
+termina com exit code 1 se algum cenário passar a emitir mais consultas ou
+ficar com p95 acima da tolerância (latência só é comparável na mesma máquina
+e com o mesmo tamanho de dados, que ficam gravados na baseline). Cada cenário
+mede pelo menos MIN_SAMPLES requisições, para que o p95 não seja só o máximo;
+contra baselines com menos amostras a comparação usa o p50.
+
+Uso:
+  python scripts/bench_api.py --save-baseline .bench/api.json
+  python scripts/bench_api.py --baseline .bench/api.json
+  python scripts/bench_api.py --patients 20000 --checkins 30 --requests 100 --sync
+"""
+import sys
+import asyncio
+import json
+import math
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, select
+from app.database import create_async_engine_for, create_engine_for, get_session, make_session_dependency
+from app.main import app
+from app.models import CheckIn, Goal, Patient
+from app.search import init_search_backend
+from app.security import create_access_token, create_refresh_token
+from scripts.synthetic_data import SYNTHETIC_PASSWORD, generate
+
+# Margem absoluta na comparação de p95, para cenários de 1 ms não falharem por ruído
+LATENCY_FLOOR_MS = 2.0
+MIN_SAMPLES = 30  # Por cenário; com menos, o p95 é o próprio máximo e o gate oscila
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # (contexto, gerador) -> (url, corpo JSON ou None)
+    request: Callable[["Context", random.Random], tuple[str, Optional[dict]]]
+    weight: float = 1.0  # Fração de --requests (cenários caros rodam menos vezes)
+    expected_status: int = 200
+
+
+@dataclass
+class Context:
+    professional_email: str
+    refresh_token: str
+    patient_ids: list
+    checkin_ids: list
+
+
+def pick(items: list, rng: random.Random):
+    return items[rng.randrange(len(items))]
+
+
+def new_checkin(rng: random.Random) -> dict:
+    date = datetime.utcnow() - timedelta(days=rng.randint(0, 30))
+    return {"date": date.isoformat(), "weight_kg": round(rng.uniform(55, 110), 1), "adherence": "média"}
+
+
+SCENARIOS = [
+    Scenario("auth: login", "POST", lambda c, r: ("/auth/login", {"email": c.professional_email, "password": SYNTHETIC_PASSWORD}), 0.2),
+    Scenario("auth: refresh", "POST", lambda c, r: ("/auth/refresh", {"refresh_token": c.refresh_token})),
+    Scenario("auth: me", "GET", lambda c, r: ("/auth/me", None)),
+    Scenario("patients: lista", "GET", lambda c, r: ("/patients?limit=100", None)),
+    Scenario("patients: busca", "GET", lambda c, r: (f"/patients?search={pick(['silva', 'ana', 'souza lima', 'joão'], r)}", None)),
+    Scenario("patients: por objetivo", "GET", lambda c, r: (f"/patients?goal={pick(list(Goal), r).value}", None)),
+    Scenario("patients: detalhe", "GET", lambda c, r: (f"/patients/{pick(c.patient_ids, r)}", None)),
+    Scenario("patients: série", "GET", lambda c, r: (f"/patients/{pick(c.patient_ids, r)}/series?points=100", None)),
+    Scenario("patients: análise", "GET", lambda c, r: (f"/patients/{pick(c.patient_ids, r)}/analytics", None)),
+    Scenario("patients: atualização", "PUT", lambda c, r: (f"/patients/{pick(c.patient_ids, r)}", {"notes": f"nota {r.random()}"})),
+    Scenario("checkins: lista", "GET", lambda c, r: (f"/checkins/patients/{pick(c.patient_ids, r)}/checkins", None)),
+    Scenario("checkins: detalhe", "GET", lambda c, r: (f"/checkins/{pick(c.checkin_ids, r)}", None)),
+    Scenario("checkins: criação", "POST", lambda c, r: (f"/checkins/patients/{pick(c.patient_ids, r)}/checkins", new_checkin(r)), 1.0, 201),
+    Scenario("checkins: atualização", "PUT", lambda c, r: (f"/checkins/{pick(c.checkin_ids, r)}", {"adherence": pick(["baixa", "alta"], r)})),
+    Scenario("templates: por objetivo", "GET", lambda c, r: (f"/templates/defaults/{pick(list(Goal), r).value}", None)),
+    Scenario("templates: por paciente", "GET", lambda c, r: (f"/templates/defaults/patient/{pick(c.patient_ids, r)}", None)),
+    Scenario("dashboard: estatísticas", "GET", lambda c, r: ("/dashboard/stats", None)),
+    Scenario("agenda: semana", "GET", lambda c, r: ("/agenda", None)),
+    Scenario("return-rules: leitura", "GET", lambda c, r: ("/return-rules", None)),
+    Scenario("analytics: coorte", "GET", lambda c, r: ("/analytics/cohort", None), 0.2),
+    Scenario("export: pacientes", "GET", lambda c, r: ("/export/patients?format=ndjson", None), 0.1),
+    Scenario("export: check-ins", "GET", lambda c, r: ("/export/checkins?format=ndjson", None), 0.1),
+]
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentil pelo posto mais próximo"""
+    return sorted_values[max(math.ceil(p * len(sorted_values)) - 1, 0)]
+
+
+async def run_scenario(client: httpx.AsyncClient, engines: list, scenario: Scenario, context: Context, n: int, warmup: int) -> dict:
+    rng = random.Random(scenario.name)
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, ctx, executemany):
+        statements.append(statement)
+
+    timings = []
+    for i in range(warmup + n):
+        url, body = scenario.request(context, rng)
+        if i == warmup:
+            for engine in engines:
+                event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        start = time.perf_counter()
+        response = await client.request(scenario.method, url, json=body)
+        elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != scenario.expected_status:
+            raise RuntimeError(f"{scenario.name}: {scenario.method} {url} -> {response.status_code} {response.text[:200]}")
+        if i >= warmup:
+            timings.append(elapsed)
+    for engine in engines:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    timings.sort()
+    return {
+        "requests": n,
+        "p50_ms": round(percentile(timings, 0.50), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "p99_ms": round(percentile(timings, 0.99), 3),
+        "queries": round(len(statements) / n, 2),
+    }
+
+
+def compare(baseline: dict, config: dict, results: dict, tolerance: float) -> list[str]:
+    """Regressões em relação à baseline (consultas a mais ou p95 acima da tolerância; p50 com poucas amostras)"""
+    if baseline["config"] != config:
+        return [f"configuração diferente da baseline: {baseline['config']} != {config}"]
+    regressions = []
+    for name, result in results.items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        if result["queries"] > before["queries"]:
+            regressions.append(f"{name}: consultas/req {before['queries']} -> {result['queries']}")
+        stat = "p95" if min(before["requests"], result["requests"]) >= MIN_SAMPLES else "p50"
+        limit = max(before[f"{stat}_ms"] * (1 + tolerance), before[f"{stat}_ms"] + LATENCY_FLOOR_MS)
+        if result[f"{stat}_ms"] > limit:
+            regressions.append(
+                f"{name}: {stat} {before[f'{stat}_ms']:.1f} -> {result[f'{stat}_ms']:.1f} ms (limite {limit:.1f})"
+            )
+    return regressions
+
+
+async def main(args) -> int:
+    config = {
+        "professionals": args.professionals,
+        "patients": args.patients,
+        "checkins": args.checkins,
+        "requests": args.requests,
+        "session": "sync" if args.sync else "async",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_engine_for(url)
+        async_engine = None if args.sync else create_async_engine_for(url)
+        SQLModel.metadata.create_all(engine)
+        init_search_backend(engine)
+
+        start = time.perf_counter()
+        with Session(engine) as session:
+            professional_ids = generate(session, args.professionals, args.patients, args.checkins)
+            professional_id = professional_ids[0]
+            patient_ids = list(session.exec(select(Patient.id).where(Patient.professional_id == professional_id)))
+            checkin_ids = list(session.exec(
+                select(CheckIn.id).join(Patient).where(Patient.professional_id == professional_id).limit(10_000)
+            ))
+        print(f"dados gerados em {time.perf_counter() - start:.1f} s ({config})")
+
+        context = Context(
+            professional_email="carga0@example.com",
+            refresh_token=create_refresh_token(data={"sub": str(professional_id)}),
+            patient_ids=patient_ids,
+            checkin_ids=checkin_ids,
+        )
+        token = create_access_token(data={"sub": str(professional_id)})
+        engines = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+        app.dependency_overrides[get_session] = make_session_dependency(engine, async_engine)
+
+        results = {}
+        try:
+            transport = httpx.ASGITransport(app=app)
+            headers = {"Authorization": f"Bearer {token}"}
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", headers=headers, timeout=120) as client:
+                print(f"{'cenário':<26} | {'n':>4} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'p99 (ms)':>8} | {'consultas/req':>13}")
+                for scenario in SCENARIOS:
+                    if args.only and not any(part in scenario.name for part in args.only):
+                        continue
+                    n = max(int(args.requests * scenario.weight), MIN_SAMPLES)
+                    result = await run_scenario(client, engines, scenario, context, n, args.warmup)
+                    results[scenario.name] = result
+                    print(
+                        f"{scenario.name:<26} | {n:>4} | {result['p50_ms']:8.2f} | {result['p95_ms']:8.2f}"
+                        f" | {result['p99_ms']:8.2f} | {result['queries']:13.2f}"
+                    )
+        finally:
+            app.dependency_overrides.clear()
+            if async_engine is not None:
+                await async_engine.dispose()
+            engine.dispose()
+
+    if args.save_baseline:
+        path = Path(args.save_baseline)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"config": config, "results": results}, indent=2, ensure_ascii=False) + "\n")
+        print(f"baseline gravada em {path}")
+
+    if args.baseline:
+        regressions = compare(json.loads(Path(args.baseline).read_text()), config, results, args.tolerance)
+        if regressions:
+            print("FALHA: regressões em relação à baseline")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("OK: sem regressões em relação à baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--professionals", type=int, default=2)
+    parser.add_argument("--patients", type=int, default=5_000, help="Pacientes por profissional")
+    parser.add_argument("--checkins", type=int, default=12, help="Check-ins por paciente (média)")
+    parser.add_argument("--requests", type=int, default=50, help="Requisições medidas por cenário (mínimo MIN_SAMPLES)")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--sync", action="store_true", help="Sessão síncrona em threads (DATABASE_ASYNC=false)")
+    parser.add_argument("--only", nargs="+", help="Só cenários cujo nome contém um destes trechos")
+    parser.add_argument("--baseline", help="JSON de baseline para comparar")
+    parser.add_argument("--save-baseline", help="Grava os resultados como baseline neste caminho")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Aumento relativo de p95 (ou p50) tolerado")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args)))
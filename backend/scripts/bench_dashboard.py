@@ -0,0 +1,110 @@
+"""
+Benchmark do endpoint de estatísticas do dashboard
+Mede a latência de /dashboard/stats para tenants de 100 a 100k pacientes
+
+O endpoint lê os contadores do tenant (app/tenant_counters.py), uma linha por
+dia das janelas, então o custo não depende do número de pacientes. Referência
+em SQLite: ~1 ms de 100 a 100k pacientes. O populate grava direto nas tabelas
+e os contadores vêm do backfill do resumo por tenant.
+"""
+import sys
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import SQLModel, Session, create_engine, insert
+from app.models import Professional, Patient, CheckIn, Sex, ActivityLevel, Goal, Adherence
+from app.routers.dashboard import compute_dashboard_stats
+from app.summary import backfill_patient_summaries
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+
+def populate(session: Session, professional_id, n_patients: int, checkins_per_patient: int = 2):
+    """Insere pacientes e check-ins sintéticos em lote"""
+    now = datetime.utcnow()
+    goals = list(Goal)
+    patients = []
+    checkins = []
+    for i in range(n_patients):
+        patient_id = uuid4()
+        created = now - timedelta(days=random.randint(0, 730))
+        patients.append({
+            "id": patient_id,
+            "professional_id": professional_id,
+            "full_name": f"Paciente {i}",
+            "birth_date": datetime(1980, 1, 1),
+            "sex": Sex.FEMININO,
+            "height_cm": 165.0,
+            "activity_level": ActivityLevel.MODERADO,
+            "goal": random.choice(goals),
+            "created_at": created,
+            "updated_at": created,
+        })
+        for _ in range(checkins_per_patient):
+            date = now - timedelta(days=random.randint(0, 365))
+            checkins.append({
+                "id": uuid4(),
+                "patient_id": patient_id,
+                "date": date,
+                "weight_kg": 70.0,
+                "adherence": Adherence.MEDIA,
+                "imc": 25.7,
+                "next_return_date": date + timedelta(days=random.randint(7, 30)),
+                "created_at": date,
+            })
+    session.execute(insert(Patient), patients)
+    session.execute(insert(CheckIn), checkins)
+    backfill_patient_summaries(session, professional_id)
+    session.commit()
+
+
+def run(sizes: list[int], repeat: int):
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/bench.db")
+            SQLModel.metadata.create_all(engine)
+
+            with Session(engine) as session:
+                professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+                session.add(professional)
+                session.commit()
+                professional_id = professional.id
+
+                # Outro tenant do mesmo tamanho para garantir o filtro por professional_id
+                other = Professional(name="Outro", email="outro@example.com", password_hash="x")
+                session.add(other)
+                session.commit()
+                populate(session, professional_id, size)
+                populate(session, other.id, size)
+
+            timings = []
+            with Session(engine) as session:
+                compute_dashboard_stats(session, professional_id, 7, 30)  # aquecimento
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    stats = compute_dashboard_stats(session, professional_id, 7, 30)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            engine.dispose()
+            print(
+                f"{size:>7} pacientes | mediana {statistics.median(timings):7.2f} ms"
+                f" | p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:7.2f} ms"
+                f" | total={stats.total_patients} retornos={stats.upcoming_returns}"
+                f" recentes={stats.recent_checkins}"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat)
@@ -0,0 +1,144 @@
+"""
+Benchmark da exportação em streaming
+Popula um SQLite com N check-ins (em blocos, sem montar tudo em memória),
+sobe um worker uvicorn e baixa GET /export/checkins acompanhando o RSS do
+servidor (/proc/<pid>/status): com cursor do servidor o RSS fica estável
+do início ao fim, independentemente do tamanho do tenant.
+
+Uso:
+  python scripts/bench_export.py
+  python scripts/bench_export.py --checkins 1000000 --format csv --gzip
+"""
+import sys
+import asyncio
+import os
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, select
+from app.database import create_engine_for
+from app.models import Professional, Patient, CheckIn, Adherence
+from app.security import create_access_token
+from scripts.bench_dashboard import populate
+from scripts.load_test import free_port, wait_until_ready
+
+SEED_CHUNK = 20_000
+
+
+def prepare_database(url: str, n_checkins: int, n_patients: int) -> str:
+    """Popula o banco e retorna um access token do profissional"""
+    engine = create_engine_for(url)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        professional = Professional(name="Export", email="export@example.com", password_hash="x")
+        session.add(professional)
+        session.commit()
+        populate(session, professional.id, n_patients, checkins_per_patient=1)
+        patient_ids = session.exec(select(Patient.id)).all()
+        token = create_access_token(data={"sub": str(professional.id)})
+
+        now = datetime.utcnow()
+        remaining = n_checkins - n_patients
+        while remaining > 0:
+            chunk = min(SEED_CHUNK, remaining)
+            rows = []
+            for _ in range(chunk):
+                date = now - timedelta(days=random.randint(0, 730))
+                rows.append({
+                    "id": uuid4(),
+                    "patient_id": random.choice(patient_ids),
+                    "date": date,
+                    "weight_kg": round(random.uniform(50, 120), 1),
+                    "adherence": Adherence.MEDIA,
+                    "observations": "Check-in sintético",
+                    "imc": 25.7,
+                    "next_return_date": date + timedelta(days=30),
+                    "created_at": date,
+                })
+            session.execute(insert(CheckIn), rows)
+            session.commit()
+            remaining -= chunk
+    engine.dispose()
+    return token
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def download(base_url: str, token: str, pid: int, fmt: str, gzip: bool, n_checkins: int):
+    headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip" if gzip else "identity"}
+    print(f"{'linhas':>9} | {'MB recebidos':>12} | {'RSS (MB)':>8}")
+    print(f"{0:9} | {0:12.1f} | {rss_mb(pid):8.1f}")
+
+    received = 0
+    lines = 0
+    step = max(n_checkins // 10, 1)
+    next_report = step
+    peak = 0.0
+    start = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async with client.stream("GET", "/export/checkins", params={"format": fmt}, headers=headers) as response:
+            response.raise_for_status()
+            # aiter_bytes descomprime o gzip; o volume recebido é o do corpo comprimido
+            async for chunk in response.aiter_bytes():
+                received = response.num_bytes_downloaded
+                lines += chunk.count(b"\n")
+                peak = max(peak, rss_mb(pid))
+                if lines >= next_report:
+                    print(f"{lines:9} | {received / 1e6:12.1f} | {rss_mb(pid):8.1f}")
+                    next_report += step
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{lines} linhas em {elapsed:.1f}s ({lines / elapsed:,.0f} linhas/s), "
+          f"{received / 1e6:.1f} MB transferidos, pico de RSS {peak:.1f} MB")
+
+
+async def main(n_checkins: int, n_patients: int, fmt: str, gzip: bool, async_db: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/export.db"
+        start = time.perf_counter()
+        token = prepare_database(url, n_checkins, n_patients)
+        print(f"{n_checkins} check-ins gerados em {time.perf_counter() - start:.1f}s\n")
+
+        port = free_port()
+        env = {**os.environ, "DATABASE_URL": url, "DATABASE_ASYNC": str(async_db).lower()}
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+            cwd=Path(__file__).parent.parent,
+            env=env
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            await wait_until_ready(base_url)
+            await download(base_url, token, server.pid, fmt, gzip, n_checkins)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkins", type=int, default=1_000_000)
+    parser.add_argument("--patients", type=int, default=5_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="Pede a resposta comprimida")
+    parser.add_argument("--sync", action="store_true", help="Servidor com DATABASE_ASYNC=false (ThreadedSession)")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.checkins, args.patients, args.format, args.gzip, not args.sync))
@@ -0,0 +1,88 @@
+"""
+Benchmark da importação de check-ins em lote
+Gera arquivos CSV e NDJSON sintéticos (com uma fração de linhas inválidas)
+e mede linhas/s de import_file em um SQLite temporário.
+"""
+import sys
+import csv
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import SQLModel, Session, select
+from app.database import create_engine_for
+from app.models import Professional, Patient, Adherence
+from scripts.bench_dashboard import populate
+from scripts.import_checkins import import_file
+
+FIELDS = ["patient_id", "date", "weight_kg", "waist_cm", "adherence", "observations"]
+
+
+def generate_rows(patient_ids: list, n_rows: int, invalid_ratio: float):
+    now = datetime.utcnow()
+    adherences = [adherence.value for adherence in Adherence]
+    for i in range(n_rows):
+        row = {
+            "patient_id": str(random.choice(patient_ids)),
+            "date": (now - timedelta(days=random.randint(0, 730))).isoformat(),
+            "weight_kg": round(random.uniform(50, 120), 1),
+            "waist_cm": round(random.uniform(60, 120), 1),
+            "adherence": random.choice(adherences),
+            "observations": f"Importado, linha {i}",
+        }
+        if random.random() < invalid_ratio:
+            row["weight_kg"] = 5  # Fora da faixa aceita
+        yield row
+
+
+def write_file(path: Path, fmt: str, rows: list[dict]):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+
+
+def run(n_rows: int, n_patients: int, invalid_ratio: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine_for(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+            session.add(professional)
+            session.commit()
+            populate(session, professional.id, n_patients, checkins_per_patient=1)
+            patient_ids = session.exec(select(Patient.id)).all()
+            rows = list(generate_rows(patient_ids, n_rows, invalid_ratio))
+
+            print(f"{'formato':<7} | {'linhas':>8} | {'importadas':>10} | {'erros':>6} | {'linhas/s':>9}")
+            for fmt in ("csv", "ndjson"):
+                path = Path(tmp) / f"checkins.{fmt}"
+                write_file(path, fmt, rows)
+                start = time.perf_counter()
+                result = import_file(session, professional.id, path, fmt)
+                elapsed = time.perf_counter() - start
+                print(f"{fmt:<7} | {n_rows:8} | {result.imported:10} | {result.failed:6} | {n_rows / elapsed:9,.0f}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--patients", type=int, default=2_000)
+    parser.add_argument("--invalid", type=float, default=0.01, help="Fração de linhas inválidas")
+    args = parser.parse_args()
+
+    run(args.rows, args.patients, args.invalid)
@@ -0,0 +1,103 @@
+"""
+Benchmark de login em um único worker uvicorn
+Dispara logins concorrentes (bcrypt) e, em paralelo, mede a latência de
+/health: com o hashing fora do event loop, o p99 de /health fica estável
+enquanto a vazão de logins cresce com PASSWORD_HASH_WORKERS.
+
+Uso:
+  python scripts/bench_login.py
+  python scripts/bench_login.py --workers 1 2 4 --concurrency 16 --requests 200
+"""
+import sys
+import asyncio
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from scripts.load_test import free_port, probe_health, wait_until_ready
+
+CREDENTIALS = {"email": "login@example.com", "password": "nutri123"}
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[max(int(len(values) * pct) - 1, 0)]
+
+
+async def run_logins(base_url: str, concurrency: int, total: int) -> tuple[float, float, int, list[float]]:
+    """Retorna (logins/s, p99 do login em ms, respostas 503, latências de /health)"""
+    latencies = []
+    busy = 0
+    remaining = total
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal remaining, busy
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json=CREDENTIALS)
+            if response.status_code == 503:
+                busy += 1
+                continue
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_health(base_url, stop))
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    stop.set()
+    health = await probe
+
+    return len(latencies) / elapsed, percentile(latencies, 0.99), busy, health
+
+
+async def run_workers(url: str, workers: int, concurrency: int, total: int):
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": url, "PASSWORD_HASH_WORKERS": str(workers)}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=Path(__file__).parent.parent,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_until_ready(base_url)
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            await client.post("/auth/register", json=CREDENTIALS)
+        throughput, login_p99, busy, health = await run_logins(base_url, concurrency, total)
+        print(
+            f"{workers:>7} | {throughput:9.1f} | {login_p99:14.1f} | {busy:>5} | "
+            f"{statistics.median(health):11.1f} | {percentile(health, 0.99):11.1f}"
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main(worker_counts: list[int], concurrency: int, total: int):
+    print(f"{'threads':>7} | {'logins/s':>9} | {'login p99 (ms)':>14} | {'503':>5} | {'/health p50':>11} | {'/health p99':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in worker_counts:
+            await run_workers(f"sqlite:///{tmp}/login_{workers}.db", workers, concurrency, total)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, os.cpu_count() or 1], help="Valores de PASSWORD_HASH_WORKERS")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="Logins por rodada")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.workers, args.concurrency, args.requests))
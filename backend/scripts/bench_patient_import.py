@@ -0,0 +1,81 @@
+"""
+Benchmark da importação de pacientes em lote
+Gera um CSV sintético com CPF em todas as linhas e mede linhas/s com
+diferentes números de processos (BULK_PROCESS_WORKERS), em SQLite temporário.
+"""
+import sys
+import csv
+import random
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import SQLModel, Session
+from app.config import settings
+from app.database import create_engine_for
+from app.models import Professional, Sex, ActivityLevel, Goal
+from app.patient_bulk import shutdown_process_pool
+from app.search import init_search_backend
+from scripts.patients_bulk import export_file, import_file
+
+FIELDS = ["full_name", "birth_date", "sex", "height_cm", "activity_level", "goal", "cpf"]
+
+
+def write_csv(path: Path, n_rows: int):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for i in range(n_rows):
+            writer.writerow({
+                "full_name": f"Paciente Importado {i}",
+                "birth_date": f"{random.randint(1950, 2005)}-01-01T00:00:00",
+                "sex": random.choice(list(Sex)).value,
+                "height_cm": random.randint(150, 195),
+                "activity_level": random.choice(list(ActivityLevel)).value,
+                "goal": random.choice(list(Goal)).value,
+                "cpf": f"{random.randint(0, 10**11 - 1):011d}",
+            })
+
+
+def run(n_rows: int, worker_counts: list[int]):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "pacientes.csv"
+        write_csv(source, n_rows)
+
+        print(f"{'processos':>9} | {'importação (linhas/s)':>21} | {'exportação c/ CPF (linhas/s)':>28}")
+        for workers in worker_counts:
+            settings.BULK_PROCESS_WORKERS = workers
+            engine = create_engine_for(f"sqlite:///{tmp}/bench_{workers}.db")
+            SQLModel.metadata.create_all(engine)
+            init_search_backend(engine)
+
+            with Session(engine) as session:
+                professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+                session.add(professional)
+                session.commit()
+
+                start = time.perf_counter()
+                result = import_file(session, professional.id, source, "csv", verbose=False)
+                import_rate = result.imported / (time.perf_counter() - start)
+                shutdown_process_pool()
+
+                start = time.perf_counter()
+                exported = export_file(session, professional.id, Path(tmp) / "saida.csv", "csv", include_cpf=True)
+                export_rate = exported / (time.perf_counter() - start)
+
+            print(f"{workers:>9} | {import_rate:21,.0f} | {export_rate:28,.0f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    run(args.rows, args.workers)
@@ -0,0 +1,113 @@
+"""
+Benchmark do cache de leitura por paciente
+Mede a latência de GET /patients/{id} (detalhe com a primeira página de
+check-ins) com o cache frio (versão do paciente trocada antes de cada
+requisição) e quente, e conta as consultas SQL de cada caminho. O caminho
+quente deve servir sem consultas.
+
+Uso:
+  python scripts/bench_read_cache.py
+  python scripts/bench_read_cache.py --patients 1000 --checkins 50 --repeat 200
+"""
+import os
+import sys
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+# Um processo só: o backend em memória serve (sem READ_CACHE_URL o padrão é none)
+os.environ.setdefault("READ_CACHE_BACKEND", "memory")
+
+import httpx
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.database import create_async_engine_for, get_session, make_session_dependency
+from app.dependencies import get_current_professional
+from app.main import app
+from app.models import Patient, Professional
+from app.read_cache import read_cache
+from scripts.bench_dashboard import populate
+
+
+async def measure(client: httpx.AsyncClient, engine, urls: list[str], cold: bool, professional_id, patient_ids):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    timings = []
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for url, patient_id in zip(urls, patient_ids):
+            if cold:
+                await read_cache.invalidate(professional_id, patient_id)
+            start = time.perf_counter()
+            response = await client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return timings, len(statements) / len(urls)
+
+
+async def main(n_patients: int, checkins: int, repeat: int):
+    if not read_cache.enabled:
+        print("Cache de leitura desabilitado (READ_CACHE_BACKEND/READ_CACHE_TTL_SECONDS)")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        engine = create_engine(url)
+        async_engine = create_async_engine_for(url)
+        SQLModel.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+            session.add(professional)
+            session.commit()
+            populate(session, professional.id, n_patients, checkins_per_patient=checkins)
+            session.refresh(professional)
+            session.expunge(professional)
+            patient_ids = list(session.exec(select(Patient.id).where(Patient.professional_id == professional.id)))
+
+        app.dependency_overrides[get_session] = make_session_dependency(engine, async_engine)
+        app.dependency_overrides[get_current_professional] = lambda: professional
+
+        random.seed(42)
+        sample = [random.choice(patient_ids) for _ in range(repeat)]
+        urls = [f"/patients/{patient_id}" for patient_id in sample]
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await measure(client, async_engine.sync_engine, urls[:10], True, professional.id, sample)  # aquecimento
+                cold, cold_queries = await measure(client, async_engine.sync_engine, urls, True, professional.id, sample)
+                await measure(client, async_engine.sync_engine, urls, False, professional.id, sample)  # preenche
+                warm, warm_queries = await measure(client, async_engine.sync_engine, urls, False, professional.id, sample)
+        finally:
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+            engine.dispose()
+
+    print(f"{n_patients} pacientes, {checkins} check-ins cada, {repeat} requisições")
+    print(f"{'cache':<6} | {'mediana (ms)':>12} | {'p95 (ms)':>8} | {'consultas/req':>13}")
+    for name, timings, queries in (("frio", cold, cold_queries), ("quente", warm, warm_queries)):
+        p95 = sorted(timings)[int(len(timings) * 0.95) - 1]
+        print(f"{name:<6} | {statistics.median(timings):12.2f} | {p95:8.2f} | {queries:13.1f}")
+    print(f"ganho: {statistics.median(cold) / statistics.median(warm):.1f}x")
+    print(await read_cache.stats())
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patients", type=int, default=1_000)
+    parser.add_argument("--checkins", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.patients, args.checkins, args.repeat))
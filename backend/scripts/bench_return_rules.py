@@ -0,0 +1,102 @@
+"""
+Micro-benchmark das regras de retorno
+Compara a sugestão anterior (dict montado da configuração a cada chamada,
+só objetivo e adesão baixa) com a tabela compilada de app/return_rules.py:
+uma linha por chamada e o lote inteiro com next_return_dates. Mede também
+a compilação de uma tabela com N regras.
+
+Uso:
+  python scripts/bench_return_rules.py
+  python scripts/bench_return_rules.py --rows 100000 --rules 50
+"""
+import sys
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.models import ActivityLevel, Adherence, Goal
+from app.return_rules import RULE_ADHERENCES, ReturnRuleTable
+from app.schemas import ReturnRuleItem
+from app.utils import IMC_CLASSES
+
+
+def legacy_next_return_date(goal: Goal, adherence, current_date: datetime) -> datetime:
+    # Cópia da implementação anterior (app/utils.suggest_next_return_date)
+    base_days = {
+        Goal.EMAGRECIMENTO: settings.RETURN_RULE_EMAGRECIMENTO,
+        Goal.HIPERTROFIA: settings.RETURN_RULE_HIPERTROFIA,
+        Goal.MANUTENCAO: settings.RETURN_RULE_MANUTENCAO,
+        Goal.SAUDE_GERAL: settings.RETURN_RULE_SAUDE_GERAL,
+    }
+    days = base_days.get(goal, 30)
+    if adherence == Adherence.BAIXA:
+        days -= settings.RETURN_RULE_REDUCAO_ADESAO_BAIXA
+    return current_date + timedelta(days=max(days, 7))
+
+
+def random_rules(n: int) -> list[ReturnRuleItem]:
+    rules = []
+    for _ in range(n):
+        rules.append(ReturnRuleItem(
+            goal=random.choice([None, *Goal]),
+            adherence=random.choice([None, *Adherence]),
+            activity_level=random.choice([None, *ActivityLevel]),
+            imc_class=random.choice([None, *IMC_CLASSES]),
+            days=random.randint(7, 60)
+        ))
+    return rules
+
+
+def timed(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(n_rows: int, n_rules: int, repeat: int):
+    random.seed(42)
+    now = datetime.utcnow()
+    dates = [now - timedelta(hours=i) for i in range(n_rows)]
+    goals = [random.choice(list(Goal)) for _ in range(n_rows)]
+    adherences = [random.choice(RULE_ADHERENCES) for _ in range(n_rows)]
+    activity_levels = [random.choice(list(ActivityLevel)) for _ in range(n_rows)]
+    imcs = [random.uniform(16, 45) for _ in range(n_rows)]
+    rules = random_rules(n_rules)
+
+    compile_s = timed(lambda: ReturnRuleTable(rules), repeat)
+    print(f"compilação ({n_rules} regras): {compile_s * 1000:.2f} ms")
+
+    table = ReturnRuleTable(rules)
+    columns = (dates, goals, adherences, activity_levels, imcs)
+    legacy_s = timed(lambda: [legacy_next_return_date(g, a, d) for d, g, a in zip(dates, goals, adherences)], repeat)
+    single_s = timed(lambda: [table.next_return_date(*row) for row in zip(*columns)], repeat)
+    batch_s = timed(lambda: table.next_return_dates(*columns), repeat)
+
+    print(f"{'caminho':<28} | {'total (ms)':>10} | {'ns/linha':>8}")
+    for name, seconds in (
+        ("anterior (por chamada)", legacy_s),
+        ("compilada (por chamada)", single_s),
+        ("compilada (lote)", batch_s),
+    ):
+        print(f"{name:<28} | {seconds * 1000:10.1f} | {seconds / n_rows * 1e9:8.0f}")
+    print(f"ganho: por chamada {legacy_s / single_s:.1f}x, lote {legacy_s / batch_s:.1f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run(args.rows, args.rules, args.repeat)
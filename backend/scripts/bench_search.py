@@ -0,0 +1,119 @@
+"""
+Benchmark da busca de pacientes por nome
+Compara o ILIKE '%termo%' anterior com o backend de busca (FTS5 no SQLite)
+em tenants de 50k pacientes; "jaao" e "conseicao" medem a tolerância a erros.
+Com --vocabulary, cada tenant ganha sobrenomes aleatórios distintos para medir
+a busca com vocabulário grande (os candidatos a correção ficam limitados ao
+tenant, à inicial e ao comprimento)
+"""
+import sys
+import random
+import string
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import SQLModel, Session, insert, select
+from app.database import create_engine_for
+from app.models import Professional, Patient, Sex, ActivityLevel, Goal
+from app.search import apply_name_search, init_search_backend, rebuild_search_index
+from datetime import datetime
+from uuid import uuid4
+
+FIRST_NAMES = [
+    "João", "José", "Maria", "Ana", "Antônio", "Francisco", "Luíza", "Márcia", "Cláudio",
+    "Sérgio", "Fábio", "Letícia", "Mônica", "Raí", "Inês", "Conceição", "Luís", "Patrícia",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Conceição", "Simões", "Araújo", "Gonçalves",
+    "Magalhães", "Brandão", "Falcão", "Assunção", "Lima", "Pereira", "Ávila", "Guimarães",
+]
+QUERIES = ["joao", "conceicao", "sim", "luiza araujo", "GONÇALVES", "fab mag", "jaao", "conseicao"]
+
+
+def random_surnames(n: int) -> list[str]:
+    """Sobrenomes inventados de 4 a 10 letras, para inflar o vocabulário"""
+    return [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10))).capitalize()
+        for _ in range(n)
+    ]
+
+
+def populate(session: Session, professional_id, n_patients: int, vocabulary: int = 0):
+    """Insere pacientes com nomes acentuados aleatórios (e sobrenomes inventados com vocabulary)"""
+    now = datetime.utcnow()
+    extra = random_surnames(vocabulary)
+    session.execute(insert(Patient), [
+        {
+            "id": uuid4(),
+            "professional_id": professional_id,
+            "full_name": f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {random.choice(extra or LAST_NAMES)}",
+            "birth_date": datetime(1980, 1, 1),
+            "sex": Sex.FEMININO,
+            "height_cm": 165.0,
+            "activity_level": ActivityLevel.MODERADO,
+            "goal": random.choice(list(Goal)),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for _ in range(n_patients)
+    ])
+
+
+def timed(session: Session, statement, repeat: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = session.exec(statement).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def run(size: int, tenants: int, repeat: int, limit: int, vocabulary: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine_for(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+        init_search_backend(engine)
+
+        with Session(engine) as session:
+            professional_ids = []
+            for i in range(tenants):
+                professional = Professional(name=f"Bench {i}", email=f"bench{i}@example.com", password_hash="x")
+                session.add(professional)
+                session.commit()
+                professional_ids.append(professional.id)
+                populate(session, professional.id, size, vocabulary)
+            start = time.perf_counter()
+            rebuild_search_index(session)
+            session.commit()
+            print(f"Indexação de {size * tenants} pacientes: {time.perf_counter() - start:.1f} s\n")
+
+            professional_id = professional_ids[0]
+            base = select(Patient.id, Patient.full_name).where(Patient.professional_id == professional_id)
+
+            print(f"{'termo':<14} | {'ILIKE (ms)':>10} {'linhas':>7} | {'busca (ms)':>10} {'linhas':>7}")
+            for query in QUERIES:
+                ilike = base.where(Patient.full_name.ilike(f"%{query}%")).limit(limit)
+                search = apply_name_search(base, session, professional_id, query).limit(limit)
+                ilike_ms, ilike_rows = timed(session, ilike, repeat)
+                search_ms, search_rows = timed(session, search, repeat)
+                print(f"{query:<14} | {ilike_ms:10.2f} {ilike_rows:7} | {search_ms:10.2f} {search_rows:7}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=50_000, help="Pacientes por tenant")
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--vocabulary", type=int, default=0, help="Sobrenomes inventados por tenant")
+    args = parser.parse_args()
+
+    run(args.size, args.tenants, args.repeat, args.limit, args.vocabulary)
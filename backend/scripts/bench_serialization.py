@@ -0,0 +1,134 @@
+"""
+Benchmark da serialização de check-ins
+Compara, para históricos de 1k, 10k e 100k check-ins, o caminho anterior
+(entidades ORM -> CheckInResponse.model_validate -> validação do
+response_model pelo FastAPI -> JSONResponse) com o caminho rápido (colunas
+em tuplas -> dicts -> ORJSONResponse). Mede a consulta e a serialização
+separadamente em um SQLite temporário.
+
+Uso:
+  python scripts/bench_serialization.py
+  python scripts/bench_serialization.py --sizes 1000 10000 --repeat 5
+"""
+import sys
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, select
+from app.database import create_engine_for
+from app.models import Professional, Patient, CheckIn, Adherence, Goal
+from app.recommendations import intern_texts
+from app.schemas import CheckInPage, CheckInResponse
+from app.serialization import checkin_rows_statement, row_dicts
+from app.utils import get_default_templates
+from scripts.bench_dashboard import populate
+
+PAGE_FIELD = create_response_field(name="Response_bench", type_=CheckInPage, mode="serialization")
+
+
+def add_checkins(session: Session, patient_id, n: int):
+    templates = get_default_templates(Goal.EMAGRECIMENTO)
+    now = datetime.utcnow()
+    rows = []
+    for i in range(n):
+        date = now - timedelta(hours=i)
+        rows.append({
+            "id": uuid4(),
+            "patient_id": patient_id,
+            "date": date,
+            "weight_kg": 70.0 + (i % 50) / 10,
+            "waist_cm": 90.0,
+            "adherence": Adherence.MEDIA,
+            "observations": f"Consulta {i}",
+            "imc": 25.7,
+            "recommendation_template_diet": templates["diet"],
+            "recommendation_template_training": templates["training"],
+            "recommendation_template_lifestyle": templates["lifestyle"],
+            "next_return_date": date + timedelta(days=14),
+            "created_at": date,
+        })
+    intern_texts(session, rows)
+    session.execute(insert(CheckIn), rows)
+    session.commit()
+
+
+def current_path(session: Session, patient_id) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    checkins = session.exec(
+        select(CheckIn).where(CheckIn.patient_id == patient_id).order_by(CheckIn.date.desc(), CheckIn.id.desc())
+    ).all()
+    fetched = time.perf_counter()
+    page = CheckInPage(items=[CheckInResponse.model_validate(c) for c in checkins], next_cursor=None)
+    content = asyncio.run(serialize_response(field=PAGE_FIELD, response_content=page))
+    body = JSONResponse(content).body
+    return fetched - start, time.perf_counter() - fetched, len(body)
+
+
+def fast_path(session: Session, patient_id) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    rows = session.exec(
+        checkin_rows_statement().where(CheckIn.patient_id == patient_id).order_by(CheckIn.date.desc(), CheckIn.id.desc())
+    ).all()
+    fetched = time.perf_counter()
+    body = ORJSONResponse({"items": row_dicts(rows), "next_cursor": None}).body
+    return fetched - start, time.perf_counter() - fetched, len(body)
+
+
+def measure(path, session: Session, patient_id, repeat: int) -> tuple[float, float, int]:
+    runs = []
+    for _ in range(repeat):
+        session.expunge_all()
+        runs.append(path(session, patient_id))
+    return (
+        statistics.median(run[0] for run in runs) * 1000,
+        statistics.median(run[1] for run in runs) * 1000,
+        runs[0][2]
+    )
+
+
+def run(sizes: list[int], repeat: int):
+    print(f"{'check-ins':>9} | {'caminho':<7} | {'consulta (ms)':>13} | {'serialização (ms)':>17} | {'total (ms)':>10} | {'MB':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine_for(f"sqlite:///{tmp}/bench.db")
+        SQLModel.metadata.create_all(engine)
+        with Session(engine) as session:
+            professional = Professional(name="Bench", email="bench@example.com", password_hash="x")
+            session.add(professional)
+            session.commit()
+            populate(session, professional.id, len(sizes), checkins_per_patient=1)
+            patient_ids = session.exec(select(Patient.id)).all()
+
+            for size, patient_id in zip(sizes, patient_ids):
+                add_checkins(session, patient_id, size)
+                results = {}
+                for name, path in (("atual", current_path), ("rápido", fast_path)):
+                    query_ms, serialize_ms, size_bytes = measure(path, session, patient_id, repeat)
+                    results[name] = query_ms + serialize_ms
+                    print(
+                        f"{size:9} | {name:<7} | {query_ms:13.1f} | {serialize_ms:17.1f} | "
+                        f"{query_ms + serialize_ms:10.1f} | {size_bytes / 1e6:6.1f}"
+                    )
+                print(f"{'':9} | ganho: {results['atual'] / results['rápido']:.1f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.sizes, args.repeat)
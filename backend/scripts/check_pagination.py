@@ -0,0 +1,140 @@
+"""
+Verificação de regressão da paginação por cursor
+Percorre todas as páginas da listagem de pacientes e dos check-ins de um
+paciente (primeira página no detalhe do paciente, como o frontend, e a
+listagem desde o início), com as duas sessões (AsyncSession e
+ThreadedSession). Falha (exit code 1) se alguma página passar do limite,
+se um item se repetir ou se o total não bater com o banco. Parte dos
+check-ins compartilha a data para exercitar o desempate por id.
+"""
+import sys
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import insert
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.database import create_async_engine_for, get_session, make_session_dependency
+from app.dependencies import get_current_professional
+from app.main import app
+from app.models import ActivityLevel, Adherence, CheckIn, Goal, Patient, Professional, Sex
+from app.summary import backfill_patient_summaries
+from scripts.bench_dashboard import populate
+
+PAGE_SIZE = 10
+N_PATIENTS = 45
+N_CHECKINS = 45
+SAME_DATE = 3  # Check-ins por data
+
+
+async def walk(client: httpx.AsyncClient, url: str, detail_url: str = None) -> tuple[list[str], list[str]]:
+    """Ids de todas as páginas e os problemas encontrados
+
+    Com detail_url, a primeira página vem do detalhe do paciente (checkins e
+    checkins_next_cursor) e as seguintes de url, como no frontend.
+    """
+    ids, problems = [], []
+    if detail_url:
+        page = (await client.get(detail_url)).json()
+        items, cursor = page["checkins"], page["checkins_next_cursor"]
+    else:
+        page = (await client.get(url)).json()
+        items, cursor = page["items"], page["next_cursor"]
+    while True:
+        if len(items) > PAGE_SIZE:
+            problems.append(f"{url}: página com {len(items)} itens (limite {PAGE_SIZE})")
+        ids.extend(item["id"] for item in items)
+        if cursor is None:
+            return ids, problems
+        response = await client.get(url, params={"cursor": cursor})
+        response.raise_for_status()
+        page = response.json()
+        items, cursor = page["items"], page["next_cursor"]
+
+
+def check(name: str, ids: list[str], expected: int) -> list[str]:
+    problems = []
+    if len(ids) != len(set(ids)):
+        problems.append(f"{name}: {len(ids) - len(set(ids))} item(ns) repetido(s)")
+    if len(set(ids)) != expected:
+        problems.append(f"{name}: {len(set(ids))} itens distintos, esperado {expected}")
+    print(f"{name:<42} -> {len(ids)} itens")
+    return problems
+
+
+async def main() -> int:
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/pagination.db"
+        engine = create_engine(url)
+        async_engine = create_async_engine_for(url)
+        SQLModel.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            professional = Professional(name="Paginação", email="pagination@example.com", password_hash="x")
+            session.add(professional)
+            session.commit()
+            populate(session, professional.id, N_PATIENTS - 1, checkins_per_patient=1)
+            patient_id = uuid4()
+            now = datetime.utcnow()
+            session.execute(insert(Patient), [{
+                "id": patient_id, "professional_id": professional.id, "full_name": "Paciente paginado",
+                "birth_date": datetime(1980, 1, 1), "sex": Sex.FEMININO, "height_cm": 165.0,
+                "activity_level": ActivityLevel.MODERADO, "goal": Goal.EMAGRECIMENTO, "created_at": now, "updated_at": now,
+            }])
+            session.execute(insert(CheckIn), [
+                {
+                    "id": uuid4(), "patient_id": patient_id, "date": now - timedelta(days=i // SAME_DATE),
+                    "weight_kg": 70.0, "adherence": Adherence.MEDIA, "imc": 25.7, "created_at": now,
+                }
+                for i in range(N_CHECKINS)
+            ])
+            backfill_patient_summaries(session, professional.id)
+            session.commit()
+            n_checkins = len(session.exec(select(CheckIn.id).where(CheckIn.patient_id == patient_id)).all())
+            session.refresh(professional)
+            session.expunge(professional)
+
+        app.dependency_overrides[get_current_professional] = lambda: professional
+        try:
+            transport = httpx.ASGITransport(app=app)
+            for mode, dependency in (
+                ("async", make_session_dependency(engine, async_engine)),
+                ("sync", make_session_dependency(engine)),
+            ):
+                app.dependency_overrides[get_session] = dependency
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    patients_url = f"/patients?limit={PAGE_SIZE}"
+                    checkins_url = f"/checkins/patients/{patient_id}/checkins?limit={PAGE_SIZE}"
+                    detail = f"/patients/{patient_id}?checkins_limit={PAGE_SIZE}"
+                    for name, url, detail_url, expected in (
+                        (f"[{mode}] GET {patients_url}", patients_url, None, N_PATIENTS),
+                        (f"[{mode}] GET .../checkins?limit={PAGE_SIZE}", checkins_url, None, n_checkins),
+                        (f"[{mode}] detalhe + GET .../checkins", checkins_url, detail, n_checkins),
+                    ):
+                        ids, page_problems = await walk(client, url, detail_url)
+                        problems += page_problems
+                        problems += check(name, ids, expected)
+        finally:
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+            engine.dispose()
+
+    if problems:
+        print("FALHA: paginação com itens repetidos, faltando ou páginas acima do limite")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+
+    print("OK: paginação sem repetições e com o total esperado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,83 @@
+"""
+Verificação de regressão do número de consultas SQL por página
+Falha (exit code 1) se a listagem de pacientes emitir um número de
+consultas que cresce com o tamanho da página (padrão N+1)
+"""
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import event
+from sqlmodel import SQLModel, Session, create_engine
+from app.database import create_async_engine_for, get_session, make_session_dependency
+from app.dependencies import get_current_professional
+from app.main import app
+from app.models import Professional
+from scripts.bench_dashboard import populate
+
+PAGE_SIZES = [1, 10, 50, 100]
+
+
+async def count_queries(client: httpx.AsyncClient, engine, url: str) -> int:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(statements)
+
+
+async def main() -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/queries.db"
+        engine = create_engine(url)
+        async_engine = create_async_engine_for(url)
+        SQLModel.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            professional = Professional(name="Query", email="query@example.com", password_hash="x")
+            session.add(professional)
+            session.commit()
+            populate(session, professional.id, max(PAGE_SIZES), checkins_per_patient=3)
+            session.refresh(professional)
+            session.expunge(professional)
+
+        app.dependency_overrides[get_session] = make_session_dependency(engine, async_engine)
+        app.dependency_overrides[get_current_professional] = lambda: professional
+
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                counts = {
+                    size: await count_queries(client, async_engine.sync_engine, f"/patients?limit={size}")
+                    for size in PAGE_SIZES
+                }
+        finally:
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+            engine.dispose()
+
+    for size, count in counts.items():
+        print(f"GET /patients?limit={size:<3} -> {count} consulta(s)")
+
+    if len(set(counts.values())) != 1:
+        print("FALHA: número de consultas varia com o tamanho da página")
+        return 1
+
+    print("OK: número de consultas constante por página")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
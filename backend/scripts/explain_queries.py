@@ -0,0 +1,160 @@
+"""
+Verificação dos planos de execução das consultas dos routers
+Executa os endpoints contra dados sintéticos, captura cada SELECT emitido
+e roda EXPLAIN. Falha (exit code 1) se alguma consulta usar varredura
+sequencial ou ordenação fora de índice.
+
+Uso:
+  python scripts/explain_queries.py                      # SQLite temporário
+  python scripts/explain_queries.py --database-url URL   # banco descartável (ex.: Postgres)
+"""
+import sys
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import event, text
+from sqlmodel import SQLModel, Session, create_engine, select
+from app.database import create_async_engine_for, get_session, make_session_dependency
+from app.dependencies import get_current_professional
+from app.main import app
+from app.models import Professional, Patient, CheckIn
+from scripts.bench_dashboard import populate
+
+
+def endpoints(patient_id, checkin_id, cursor) -> list[str]:
+    return [
+        "/patients",
+        "/patients?goal=emagrecimento",
+        "/patients?activity_level=moderado",
+        "/patients?goal=emagrecimento&activity_level=moderado",
+        f"/patients?cursor={cursor}",
+        f"/patients/{patient_id}",
+        f"/checkins/patients/{patient_id}/checkins",
+        f"/checkins/{checkin_id}",
+        "/dashboard/stats",
+        f"/templates/defaults/patient/{patient_id}",
+    ]
+
+
+async def capture_statements(client: httpx.AsyncClient, engine, url: str) -> list[tuple[str, object]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        (await client.get(url)).raise_for_status()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def sqlite_problems(connection, statement: str, parameters) -> list[str]:
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    problems = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "CONSTANT ROW" not in detail:
+            problems.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            problems.append(detail)
+    return problems
+
+
+def postgresql_problems(connection, statement: str, parameters) -> list[str]:
+    # Desabilita seq scan/sort: se ainda aparecerem, não há índice que sirva a consulta
+    connection.execute(text("SET LOCAL enable_seqscan = off"))
+    connection.execute(text("SET LOCAL enable_sort = off"))
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    problems = []
+
+    def walk(node):
+        if node["Node Type"] in ("Seq Scan", "Sort"):
+            problems.append(f"{node['Node Type']} {node.get('Relation Name', '')}".strip())
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return problems
+
+
+async def main(database_url: str | None) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = database_url or f"sqlite:///{tmp}/explain.db"
+        engine = create_engine(database_url)
+        async_engine = create_async_engine_for(database_url)
+        SQLModel.metadata.drop_all(engine)
+        SQLModel.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            professionals = []
+            for i in range(5):
+                professional = Professional(name=f"Explain {i}", email=f"explain{i}@example.com", password_hash="x")
+                session.add(professional)
+                session.commit()
+                populate(session, professional.id, 2_000, checkins_per_patient=5)
+                professionals.append(professional.id)
+            session.exec(text("ANALYZE"))
+            session.commit()
+
+            professional = session.get(Professional, professionals[0])
+            patient_id = session.exec(
+                select(Patient.id).where(Patient.professional_id == professional.id)
+            ).first()
+            checkin_id = session.exec(
+                select(CheckIn.id).where(CheckIn.patient_id == patient_id)
+            ).first()
+            session.expunge(professional)
+
+        app.dependency_overrides[get_session] = make_session_dependency(engine, async_engine)
+        app.dependency_overrides[get_current_professional] = lambda: professional
+
+        failures = 0
+        try:
+            transport = httpx.ASGITransport(app=app)
+            client = httpx.AsyncClient(transport=transport, base_url="http://test")
+            cursor = (await client.get("/patients?limit=10")).json()["next_cursor"]
+            check = postgresql_problems if engine.dialect.name == "postgresql" else sqlite_problems
+
+            for url in endpoints(patient_id, checkin_id, cursor):
+                for statement, parameters in await capture_statements(client, async_engine.sync_engine, url):
+                    with engine.begin() as connection:
+                        problems = check(connection, statement, parameters)
+                    summary = " ".join(statement.split())[:100]
+                    if problems:
+                        failures += 1
+                        print(f"✗ {url}\n    {summary}\n    {'; '.join(problems)}")
+                    else:
+                        print(f"✓ {url}\n    {summary}")
+        finally:
+            await client.aclose()
+            app.dependency_overrides.clear()
+            await async_engine.dispose()
+            engine.dispose()
+
+    if failures:
+        print(f"\nFALHA: {failures} consulta(s) sem índice adequado")
+        return 1
+
+    print("\nOK: todas as consultas usam índices")
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", help="Banco descartável (as tabelas são recriadas!)")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(main(args.database_url)))
@@ -0,0 +1,79 @@
+"""
+Importa check-ins em lote de um arquivo CSV (com cabeçalho) ou NDJSON
+Cada linha traz patient_id e os campos de CheckInCreate. Linhas inválidas
+são listadas sem interromper a importação.
+
+Uso:
+  python scripts/import_checkins.py nutri@example.com historico.csv
+  python scripts/import_checkins.py nutri@example.com balanca.ndjson --format ndjson
+"""
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import Session, select
+from app.checkin_import import IMPORT_BATCH_SIZE, ImportResult, RecordParser, import_batch
+from app.database import engine
+from app.models import Professional
+
+
+def import_file(session: Session, professional_id, path: Path, fmt: str, batch_size: int = IMPORT_BATCH_SIZE) -> ImportResult:
+    """Importa o arquivo em lotes, com um commit por lote"""
+    parser = RecordParser(fmt)
+    patients = {}
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        result.add(*import_batch(session, professional_id, batch, patients))
+        session.commit()
+        batch.clear()
+
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line in f:
+            record = parser.feed(line.rstrip("\r\n"))
+            if record is not None:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    flush()
+
+    record = parser.finish()
+    if record is not None:
+        batch.append(record)
+    if batch:
+        flush()
+    return result
+
+
+def main(email: str, path: Path, fmt: str) -> int:
+    with Session(engine) as session:
+        professional = session.exec(select(Professional).where(Professional.email == email)).first()
+        if professional is None:
+            print(f"✗ Profissional não encontrado: {email}")
+            return 1
+
+        start = time.perf_counter()
+        result = import_file(session, professional.id, path, fmt)
+        elapsed = time.perf_counter() - start
+
+    for error in result.errors:
+        print(f"✗ linha {error['line']}: {error['error']}")
+    if result.failed > len(result.errors):
+        print(f"... e mais {result.failed - len(result.errors)} erro(s)")
+    print(f"✓ {result.imported} check-in(s) importado(s), {result.failed} com erro, {result.imported / elapsed:,.0f} linhas/s")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("email", help="Email do profissional dono dos pacientes")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Padrão: pela extensão do arquivo")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.suffix in (".ndjson", ".jsonl") else "csv")
+    sys.exit(main(args.email, args.path, fmt))
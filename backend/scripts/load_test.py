@@ -0,0 +1,145 @@
+"""
+Teste de carga de um único worker uvicorn
+Sobe a API com um banco SQLite temporário populado e mede vazão e latência
+com concorrência crescente, para cada modo de sessão (DATABASE_ASYNC).
+A coluna /health mede a latência de uma rota sem banco durante a carga:
+se o event loop estiver bloqueado por consultas, ela cresce junto.
+
+Uso:
+  python scripts/load_test.py
+  python scripts/load_test.py --modes true --concurrency 1 8 32 --requests 400
+"""
+import sys
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlmodel import SQLModel, Session, create_engine
+from app.search import init_search_backend
+from app.security import create_access_token
+from scripts.synthetic_data import generate
+
+ENDPOINTS = ["/patients?limit=100", "/dashboard/stats"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def prepare_database(url: str, n_patients: int) -> str:
+    """Popula o banco e retorna um access token do profissional"""
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    init_search_backend(engine)
+    with Session(engine) as session:
+        professional_id = generate(session, 1, n_patients, 5)[0]
+        token = create_access_token(data={"sub": str(professional_id)})
+    engine.dispose()
+    return token
+
+
+async def wait_until_ready(base_url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError("Servidor não respondeu a tempo")
+
+
+async def probe_health(base_url: str, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.02)
+    return latencies
+
+
+async def run_level(base_url: str, token: str, concurrency: int, total: int) -> tuple[float, float, float, float]:
+    """Dispara total requisições com concorrência fixa; retorna (req/s, p50 ms, p95 ms, p50 /health ms)"""
+    latencies = []
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(ENDPOINTS[i % len(ENDPOINTS)])
+
+    async def worker(client: httpx.AsyncClient):
+        while not queue.empty():
+            url = queue.get_nowait()
+            start = time.perf_counter()
+            response = await client.get(url)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    headers = {"Authorization": f"Bearer {token}"}
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_health(base_url, stop))
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[worker(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    stop.set()
+    health = await probe
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    return total / elapsed, statistics.median(latencies), p95, statistics.median(health)
+
+
+async def run_mode(mode: str, url: str, token: str, levels: list[int], total: int):
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": url, "DATABASE_ASYNC": mode}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", "1", "--log-level", "warning"],
+        cwd=Path(__file__).parent.parent,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_until_ready(base_url)
+        print(f"\nDATABASE_ASYNC={mode}")
+        print(f"{'concorrência':>12} | {'req/s':>8} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'/health p50':>11}")
+        for concurrency in levels:
+            throughput, p50, p95, health = await run_level(base_url, token, concurrency, total)
+            print(f"{concurrency:>12} | {throughput:8.1f} | {p50:9.1f} | {p95:9.1f} | {health:11.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main(modes: list[str], levels: list[int], total: int, n_patients: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/load.db"
+        token = prepare_database(url, n_patients)
+        for mode in modes:
+            await run_mode(mode, url, token, levels, total)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modes", nargs="+", default=["true", "false"], help="Valores de DATABASE_ASYNC")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16, 32])
+    parser.add_argument("--requests", type=int, default=400, help="Requisições por nível")
+    parser.add_argument("--patients", type=int, default=5_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.modes, args.concurrency, args.requests, args.patients))
@@ -0,0 +1,77 @@
+"""
+Manutenção do resumo de último check-in dos pacientes
+  backfill: recalcula o resumo de todos os pacientes
+  check:    detecta divergências entre o resumo e os check-ins e nos contadores
+            do dashboard por tenant (--repair corrige)
+"""
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import Session
+from app.database import engine
+from app.summary import backfill_patient_summaries, find_summary_drift, repair_summary_drift
+from app.tenant_counters import find_counter_drift, rebuild_tenant_counters
+
+
+def backfill():
+    """Recalcula o resumo de todos os pacientes"""
+    with Session(engine) as session:
+        updated = backfill_patient_summaries(session)
+        session.commit()
+    print(f"✓ Resumo recalculado para {updated} paciente(s)")
+
+
+def check(repair: bool) -> int:
+    """Verifica (e opcionalmente corrige) divergências no resumo e nos contadores"""
+    with Session(engine) as session:
+        drift = list(find_summary_drift(session))
+
+        for patient_id, current, expected in drift:
+            fields = [field for field in expected if current[field] != expected[field]]
+            print(f"✗ {patient_id}: {', '.join(fields)}")
+
+        if drift and repair:
+            repaired = repair_summary_drift(session, drift)
+            session.commit()
+            print(f"✓ {repaired} paciente(s) corrigido(s)")
+
+        # Depois do reparo do resumo, que já recalcula os contadores dos tenants afetados
+        tenants = find_counter_drift(session)
+        for professional_id in tenants:
+            print(f"✗ contadores do profissional {professional_id}")
+
+        if tenants and repair:
+            for professional_id in tenants:
+                rebuild_tenant_counters(session, professional_id)
+            session.commit()
+            print(f"✓ contadores de {len(tenants)} profissional(is) recalculados")
+
+        if not drift and not tenants:
+            print("✓ Nenhuma divergência encontrada")
+            return 0
+        if repair:
+            return 0
+
+    print(
+        f"{len(drift)} paciente(s) e {len(tenants)} profissional(is) com divergência. "
+        "Use --repair para corrigir."
+    )
+    return 1
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("backfill", help="Recalcula o resumo de todos os pacientes")
+    check_parser = subparsers.add_parser("check", help="Detecta divergências no resumo e nos contadores")
+    check_parser.add_argument("--repair", action="store_true", help="Corrige as divergências encontradas")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        backfill()
+    else:
+        sys.exit(check(args.repair))
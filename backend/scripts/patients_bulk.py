@@ -0,0 +1,145 @@
+"""
+Importação e exportação de pacientes em lote (CSV com cabeçalho ou NDJSON)
+  import: valida e criptografa os CPFs no pool de processos e insere em lotes
+  export: grava todos os pacientes do profissional (--include-cpf para CPF completo)
+
+Uso:
+  python scripts/patients_bulk.py import nutri@example.com pacientes.csv
+  python scripts/patients_bulk.py export nutri@example.com saida.ndjson --include-cpf
+"""
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import Session, select
+from app.checkin_import import IMPORT_BATCH_SIZE, ImportResult, RecordParser
+from app.database import engine
+from app.models import Professional
+from app.patient_bulk import (
+    export_chunks,
+    export_statement,
+    insert_patients,
+    merge_prepared,
+    prepare_patients,
+    process_pool,
+    shutdown_process_pool,
+    submit_prepare
+)
+
+
+def file_format(path: Path) -> str:
+    return "ndjson" if path.suffix in (".ndjson", ".jsonl") else "csv"
+
+
+def read_batches(path: Path, fmt: str, batch_size: int):
+    parser = RecordParser(fmt)
+    batch = []
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line in f:
+            record = parser.feed(line.rstrip("\r\n"))
+            if record is not None:
+                batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    record = parser.finish()
+    if record is not None:
+        batch.append(record)
+    if batch:
+        yield batch
+
+
+def import_file(
+    session: Session,
+    professional_id,
+    path: Path,
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    verbose: bool = True
+) -> ImportResult:
+    """Importa o arquivo; o pool prepara o próximo lote enquanto o atual é inserido"""
+    pool = process_pool()
+    result = ImportResult()
+    start = time.perf_counter()
+    pending = None
+
+    def insert(prepared):
+        rows, errors = prepared
+        result.add(insert_patients(session, professional_id, rows), errors)
+        session.commit()
+        if verbose:
+            processed = result.imported + result.failed
+            print(f"  {processed:,} linha(s), {processed / (time.perf_counter() - start):,.0f} linhas/s", file=sys.stderr)
+
+    for batch in read_batches(path, fmt, batch_size):
+        if pool is None:
+            insert(prepare_patients(batch))
+            continue
+        futures = submit_prepare(pool, batch)
+        if pending is not None:
+            insert(merge_prepared([future.result() for future in pending]))
+        pending = futures
+
+    if pending is not None:
+        insert(merge_prepared([future.result() for future in pending]))
+    return result
+
+
+def export_file(session: Session, professional_id, path: Path, fmt: str, include_cpf: bool, batch_size: int = IMPORT_BATCH_SIZE) -> int:
+    """Mesma consulta e ordem de GET /export/patients, lida com cursor do servidor"""
+    statement = export_statement(professional_id).execution_options(yield_per=batch_size)
+    exported = 0
+
+    def batches():
+        nonlocal exported
+        for rows in session.exec(statement).partitions():
+            exported += len(rows)
+            yield rows
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in export_chunks(batches(), fmt, include_cpf):
+            f.write(chunk)
+    return exported
+
+
+def main(command: str, email: str, path: Path, fmt: str, include_cpf: bool) -> int:
+    with Session(engine) as session:
+        professional = session.exec(select(Professional).where(Professional.email == email)).first()
+        if professional is None:
+            print(f"✗ Profissional não encontrado: {email}")
+            return 1
+
+        start = time.perf_counter()
+        if command == "export":
+            exported = export_file(session, professional.id, path, fmt, include_cpf)
+            print(f"✓ {exported} paciente(s) exportado(s) em {time.perf_counter() - start:.1f} s")
+            return 0
+
+        try:
+            result = import_file(session, professional.id, path, fmt)
+        finally:
+            shutdown_process_pool()
+        elapsed = time.perf_counter() - start
+
+    for error in result.errors:
+        print(f"✗ linha {error['line']}: {error['error']}")
+    if result.failed > len(result.errors):
+        print(f"... e mais {result.failed - len(result.errors)} erro(s)")
+    print(f"✓ {result.imported} paciente(s) importado(s), {result.failed} com erro, {result.imported / elapsed:,.0f} linhas/s")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("email", help="Email do profissional")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Padrão: pela extensão do arquivo")
+    parser.add_argument("--include-cpf", action="store_true", help="export: CPF completo em vez do mascarado")
+    args = parser.parse_args()
+
+    sys.exit(main(args.command, args.email, args.path, args.format or file_format(args.path), args.include_cpf))
@@ -0,0 +1,92 @@
+"""
+Relatório do armazenamento dos textos de recomendação
+Compara os bytes que os check-ins ocupariam com os textos inline (um por
+linha, como antes da deduplicação) com o armazenamento atual: cada texto
+uma vez em recommendation_texts mais as referências de 32 caracteres.
+Tamanhos medidos com length() (caracteres, próximo dos bytes em UTF-8).
+
+Uso:
+  python scripts/recommendation_storage.py
+  python scripts/recommendation_storage.py --prune   # remove textos sem referência (com a API parada)
+"""
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import delete, func, union
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import CheckIn, RecommendationText
+from app.recommendations import TEXT_FIELDS
+
+ID_BYTES = 32
+
+
+def referenced_ids():
+    return union(*[
+        select(getattr(CheckIn, column)).where(getattr(CheckIn, column).isnot(None))
+        for column in TEXT_FIELDS.values()
+    ])
+
+
+def storage_report(session: Session) -> dict:
+    text_bytes = func.length(RecommendationText.text)
+    inline = 0
+    references = 0
+    for column in TEXT_FIELDS.values():
+        count, total = session.exec(
+            select(func.count(), func.coalesce(func.sum(text_bytes), 0)).select_from(CheckIn).join(
+                RecommendationText, RecommendationText.id == getattr(CheckIn, column)
+            )
+        ).one()
+        references += count
+        inline += total
+
+    texts, stored = session.exec(
+        select(func.count(), func.coalesce(func.sum(text_bytes), 0)).select_from(RecommendationText)
+    ).one()
+    deduplicated = stored + texts * ID_BYTES + references * ID_BYTES
+    return {
+        "checkins": session.exec(select(func.count()).select_from(CheckIn)).one(),
+        "references": references,
+        "texts": texts,
+        "inline_bytes": inline,
+        "deduplicated_bytes": deduplicated,
+        "saved_bytes": inline - deduplicated,
+    }
+
+
+def prune(session: Session) -> int:
+    """Remove textos que nenhum check-in referencia (ex.: após excluir pacientes)"""
+    result = session.execute(
+        delete(RecommendationText).where(RecommendationText.id.not_in(select(referenced_ids().subquery())))
+    )
+    session.commit()
+    return result.rowcount
+
+
+def main(prune_texts: bool):
+    with Session(engine) as session:
+        if prune_texts:
+            print(f"Textos sem referência removidos: {prune(session)}")
+        report = storage_report(session)
+
+    mb = 1024 * 1024
+    saved_pct = report["saved_bytes"] / report["inline_bytes"] * 100 if report["inline_bytes"] else 0.0
+    print(f"Check-ins:               {report['checkins']:,}")
+    print(f"Referências a textos:    {report['references']:,}")
+    print(f"Textos distintos:        {report['texts']:,}")
+    print(f"Inline (antes):          {report['inline_bytes'] / mb:,.2f} MB")
+    print(f"Deduplicado (agora):     {report['deduplicated_bytes'] / mb:,.2f} MB")
+    print(f"Economia:                {report['saved_bytes'] / mb:,.2f} MB ({saved_pct:.1f}%)")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prune", action="store_true", help="Remove textos sem referência antes do relatório")
+    args = parser.parse_args()
+
+    main(args.prune)
@@ -0,0 +1,25 @@
+"""
+Reconstrói o índice de busca de pacientes (search_name e, no SQLite, a tabela FTS5)
+"""
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import Session
+from app.database import engine
+from app.search import init_search_backend, rebuild_search_index
+
+
+def rebuild():
+    """Recria as estruturas de busca e reindexa todos os pacientes"""
+    init_search_backend(engine)
+    with Session(engine) as session:
+        indexed = rebuild_search_index(session)
+        session.commit()
+    print(f"✓ {indexed} paciente(s) indexado(s)")
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -12,7 +12,11 @@ from sqlmodel import Session, select
 from app.database import engine, init_db
 from app.models import Professional, Patient, CheckIn, Sex, ActivityLevel, Goal, Adherence
 from app.security import get_password_hash
-from app.utils import calculate_imc, suggest_next_return_date
+from app.utils import calculate_imc
+from app.return_rules import DEFAULT_RETURN_RULES
+from app.summary import backfill_patient_summaries
+from app.search import rebuild_search_index
+from app.recommendations import intern_texts
 from datetime import datetime, timedelta
 from uuid import uuid4
 
@@ -75,12 +79,21 @@ def seed():
         
         for i, (date, weight) in enumerate(zip(dates, weights)):
             imc = calculate_imc(weight, patient1.height_cm)
-            next_return = suggest_next_return_date(
+            next_return = DEFAULT_RETURN_RULES.next_return_date(
+                date,
                 patient1.goal,
                 Adherence.MEDIA if i < 2 else Adherence.ALTA,
-                date
+                patient1.activity_level,
+                imc
             )
             
+            texts = {
+                "recommendation_template_diet": "Priorizar alimentos in natura, reduzir processados.",
+                "recommendation_template_training": "Caminhadas 30min/dia, 5x/semana.",
+                "recommendation_template_lifestyle": "Dormir 8h, reduzir estresse.",
+            }
+            intern_texts(session, [texts])
+            
             checkin = CheckIn(
                 id=uuid4(),
                 patient_id=patient1.id,
@@ -92,11 +105,9 @@ def seed():
                 adherence=Adherence.MEDIA if i < 2 else Adherence.ALTA,
                 observations=f"Consulta {i+1}: Evolução positiva." if i > 0 else "Consulta inicial.",
                 imc=imc,
-                recommendation_template_diet="Priorizar alimentos in natura, reduzir processados.",
-                recommendation_template_training="Caminhadas 30min/dia, 5x/semana.",
-                recommendation_template_lifestyle="Dormir 8h, reduzir estresse.",
                 next_return_date=next_return,
-                created_at=date
+                created_at=date,
+                **texts
             )
             session.add(checkin)
         
@@ -133,12 +144,21 @@ def seed():
         
         for i, (date, weight) in enumerate(zip(dates2, weights2)):
             imc = calculate_imc(weight, patient2.height_cm)
-            next_return = suggest_next_return_date(
+            next_return = DEFAULT_RETURN_RULES.next_return_date(
+                date,
                 patient2.goal,
                 Adherence.ALTA,
-                date
+                patient2.activity_level,
+                imc
             )
             
+            texts = {
+                "recommendation_template_diet": "Aumentar proteínas, carboidratos pós-treino.",
+                "recommendation_template_training": "Treino de força 4x/semana, progressão de carga.",
+                "recommendation_template_lifestyle": "Sono 8h, recuperação adequada.",
+            }
+            intern_texts(session, [texts])
+            
             checkin = CheckIn(
                 id=uuid4(),
                 patient_id=patient2.id,
@@ -150,17 +170,20 @@ def seed():
                 adherence=Adherence.ALTA,
                 observations=f"Consulta {i+1}: Ganho de massa conforme esperado." if i > 0 else "Consulta inicial.",
                 imc=imc,
-                recommendation_template_diet="Aumentar proteínas, carboidratos pós-treino.",
-                recommendation_template_training="Treino de força 4x/semana, progressão de carga.",
-                recommendation_template_lifestyle="Sono 8h, recuperação adequada.",
                 next_return_date=next_return,
-                created_at=date
+                created_at=date,
+                **texts
             )
             session.add(checkin)
         
         session.commit()
         print(f"  ✓ 2 check-ins criados para {patient2.full_name}")
         
+        # Resumo de último check-in dos pacientes
+        backfill_patient_summaries(session, professional.id)
+        rebuild_search_index(session)
+        session.commit()
+        
         print("\n✅ Seed concluído com sucesso!")
         print("\nCredenciais de acesso:")
         print("  Email: nutri@example.com")
@@ -173,7 +196,7 @@ if __name__ == "__main__":
     parser.add_argument("--reset", action="store_true", help="Resetar dados existentes")
     args = parser.parse_args()
     
-        if args.reset:
+    if args.reset:
         with Session(engine) as session:
             # Deleta tudo (cuidado em produção!)
             from sqlmodel import text
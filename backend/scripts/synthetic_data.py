@@ -0,0 +1,216 @@
+"""
+Gerador de dados sintéticos em escala de produção
+Cria N profissionais × M pacientes × K check-ins (em média por paciente)
+com inserts em lote e distribuições realistas: objetivos, adesão, nível de
+atividade e sexo com pesos, altura por sexo, peso inicial a partir de um IMC
+sorteado e trajetória de peso conforme objetivo e adesão, datas espaçadas
+pelos intervalos de retorno (com pacientes que abandonaram o acompanhamento)
+e próximo retorno pelas regras padrão. O resumo dos pacientes e o índice de
+busca são preenchidos no fim.
+
+Todos os profissionais usam a senha SYNTHETIC_PASSWORD e o e-mail
+carga<i>@example.com. Usar em um banco vazio (os e-mails são únicos).
+
+Uso:
+  python scripts/synthetic_data.py --database-url sqlite:///./carga.db
+  python scripts/synthetic_data.py --database-url sqlite:///./carga.db --professionals 10 --patients 5000 --checkins 20
+"""
+import sys
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+# Adiciona o diretório raiz ao path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlmodel import SQLModel, Session
+from app.models import ActivityLevel, Adherence, CheckIn, Goal, Patient, Professional, Sex
+from app.return_rules import DEFAULT_DAYS_BY_GOAL, DEFAULT_RETURN_RULES
+from app.search import index_patients, init_search_backend, normalize_name
+from app.security import get_password_hash
+from app.summary import backfill_patient_summaries
+from app.utils import calculate_imc
+
+SYNTHETIC_PASSWORD = "carga123"
+INSERT_BATCH_SIZE = 20_000
+
+GOAL_WEIGHTS = {Goal.EMAGRECIMENTO: 50, Goal.HIPERTROFIA: 20, Goal.MANUTENCAO: 15, Goal.SAUDE_GERAL: 15}
+ADHERENCE_WEIGHTS = {None: 10, Adherence.BAIXA: 25, Adherence.MEDIA: 45, Adherence.ALTA: 20}
+ACTIVITY_WEIGHTS = {
+    ActivityLevel.SEDENTARIO: 35, ActivityLevel.LEVE: 30, ActivityLevel.MODERADO: 25, ActivityLevel.ALTO: 10
+}
+SEX_WEIGHTS = {Sex.FEMININO: 60, Sex.MASCULINO: 38, Sex.OUTRO: 2}
+HEIGHT_BY_SEX = {Sex.FEMININO: (162.0, 7.0), Sex.MASCULINO: (175.0, 7.5), Sex.OUTRO: (168.0, 9.0)}
+
+# kg por semana esperados pelo objetivo; a adesão escala a tendência
+WEEKLY_TREND_BY_GOAL = {Goal.EMAGRECIMENTO: -0.45, Goal.HIPERTROFIA: 0.15, Goal.MANUTENCAO: 0.0, Goal.SAUDE_GERAL: -0.1}
+ADHERENCE_FACTOR = {None: 0.7, Adherence.BAIXA: 0.3, Adherence.MEDIA: 0.8, Adherence.ALTA: 1.2}
+DROPOUT_RATE = 0.2  # Pacientes cujo último check-in foi há 2 a 12 meses
+
+FIRST_NAMES = [
+    "Ana", "Maria", "Juliana", "Fernanda", "Camila", "Beatriz", "Larissa", "Patrícia", "Aline", "Letícia",
+    "João", "José", "Pedro", "Lucas", "Gabriel", "Rafael", "Mateus", "André", "Felipe", "Thiago",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Araújo", "Melo", "Barbosa", "Cardoso", "Rocha", "Conceição",
+]
+
+
+def random_uuid(rng: random.Random) -> UUID:
+    # Do gerador com semente: a mesma semente gera os mesmos ids (e é mais rápido que uuid4)
+    return UUID(int=rng.getrandbits(128), version=4)
+
+
+def weighted(rng: random.Random, weights: dict, k: int) -> list:
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def patient_rows(rng: random.Random, professional_id: UUID, n_patients: int, n_checkins: int, now: datetime):
+    """Pacientes de um profissional e seus check-ins (dicts prontos para insert em lote)"""
+    goals = weighted(rng, GOAL_WEIGHTS, n_patients)
+    activity_levels = weighted(rng, ACTIVITY_WEIGHTS, n_patients)
+    sexes = weighted(rng, SEX_WEIGHTS, n_patients)
+    patients = []
+    checkins = []
+    suggest = []  # (check-in, objetivo, nível de atividade) para o próximo retorno em lote
+    for goal, activity_level, sex in zip(goals, activity_levels, sexes):
+        patient_id = random_uuid(rng)
+        mean, deviation = HEIGHT_BY_SEX[sex]
+        height = round(rng.gauss(mean, deviation), 1)
+        weight = rng.lognormvariate(3.3, 0.18) * (height / 100) ** 2  # IMC em torno de 27
+        # A variação acumulada para entre -25% e +15% do peso inicial (platô)
+        min_weight, max_weight = max(weight * 0.75, 16 * (height / 100) ** 2), weight * 1.15
+        # Média de n_checkins por paciente, de 1 a 2n-1
+        count = rng.randint(1, 2 * n_checkins - 1) if n_checkins else 0
+        adherences = weighted(rng, ADHERENCE_WEIGHTS, count)
+        trend = WEEKLY_TREND_BY_GOAL[goal]
+
+        # Datas de trás para frente a partir do último check-in
+        if rng.random() < DROPOUT_RATE:
+            last = now - timedelta(days=rng.uniform(60, 365))
+        else:
+            last = now - timedelta(days=rng.uniform(0, 45))
+        interval = DEFAULT_DAYS_BY_GOAL[goal]
+        dates = [last]
+        for _ in range(count - 1):
+            dates.append(dates[-1] - timedelta(days=max(interval + rng.gauss(0, interval / 4), 5)))
+        dates.reverse()
+        created = dates[0] - timedelta(days=rng.uniform(0, 10))
+
+        full_name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+        patients.append({
+            "id": patient_id,
+            "professional_id": professional_id,
+            "full_name": full_name,
+            "search_name": normalize_name(full_name),
+            "birth_date": now - timedelta(days=rng.randint(18 * 365, 75 * 365)),
+            "sex": sex,
+            "height_cm": height,
+            "activity_level": activity_level,
+            "goal": goal,
+            "created_at": created,
+            "updated_at": created,
+        })
+
+        previous = dates[0] if dates else created
+        for date, adherence in zip(dates, adherences):
+            weeks = (date - previous).days / 7
+            weight += trend * ADHERENCE_FACTOR[adherence] * weeks + rng.gauss(0, 0.5)
+            weight = min(max(weight, min_weight), max_weight)
+            previous = date
+            measured = rng.random() < 0.6
+            checkin = {
+                "id": random_uuid(rng),
+                "patient_id": patient_id,
+                "date": date,
+                "weight_kg": round(weight, 1),
+                "waist_cm": round(weight * rng.uniform(1.0, 1.2), 1) if measured else None,
+                "hip_cm": round(weight * rng.uniform(1.2, 1.45), 1) if measured else None,
+                "body_fat_pct": round(rng.uniform(12, 42), 1) if rng.random() < 0.4 else None,
+                "adherence": adherence,
+                "observations": None,
+                "imc": calculate_imc(weight, height),
+                "next_return_date": None,
+                "created_at": date,
+            }
+            checkins.append(checkin)
+            suggest.append((checkin, goal, activity_level))
+
+    suggested = DEFAULT_RETURN_RULES.next_return_dates(
+        [checkin["date"] for checkin, _, _ in suggest],
+        [goal for _, goal, _ in suggest],
+        [checkin["adherence"] for checkin, _, _ in suggest],
+        [activity_level for _, _, activity_level in suggest],
+        [checkin["imc"] for checkin, _, _ in suggest]
+    )
+    for (checkin, _, _), next_return in zip(suggest, suggested):
+        checkin["next_return_date"] = next_return
+    return patients, checkins
+
+
+def insert_batched(session: Session, model, rows: list[dict]) -> None:
+    # executemany direto na tabela: o bulk insert do ORM acaba emitindo um INSERT por linha
+    for offset in range(0, len(rows), INSERT_BATCH_SIZE):
+        session.execute(model.__table__.insert(), rows[offset:offset + INSERT_BATCH_SIZE])
+
+
+def generate(
+    session: Session,
+    n_professionals: int,
+    n_patients: int,
+    n_checkins: int,
+    seed: int = 42
+) -> list[UUID]:
+    """Popula o banco (com commit) e retorna os ids dos profissionais, na ordem dos e-mails"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = get_password_hash(SYNTHETIC_PASSWORD)
+    professional_ids = [random_uuid(rng) for _ in range(n_professionals)]
+    session.execute(Professional.__table__.insert(), [
+        {
+            "id": professional_id,
+            "name": f"Profissional {i}",
+            "email": f"carga{i}@example.com",
+            "password_hash": password_hash,
+            "created_at": now,
+        }
+        for i, professional_id in enumerate(professional_ids)
+    ])
+    for professional_id in professional_ids:
+        patients, checkins = patient_rows(rng, professional_id, n_patients, n_checkins, now)
+        insert_batched(session, Patient, patients)
+        index_patients(session, patients)
+        insert_batched(session, CheckIn, checkins)
+    backfill_patient_summaries(session)
+    session.commit()
+    return professional_ids
+
+
+if __name__ == "__main__":
+    import argparse
+    from app.database import create_engine_for
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", required=True, help="Banco vazio que receberá os dados")
+    parser.add_argument("--professionals", type=int, default=5)
+    parser.add_argument("--patients", type=int, default=2_000, help="Pacientes por profissional")
+    parser.add_argument("--checkins", type=int, default=12, help="Check-ins por paciente (média)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine_for(args.database_url)
+    SQLModel.metadata.create_all(engine)
+    init_search_backend(engine)
+    start = time.perf_counter()
+    with Session(engine) as session:
+        generate(session, args.professionals, args.patients, args.checkins, args.seed)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    patients = args.professionals * args.patients
+    print(
+        f"✓ {args.professionals} profissionais, {patients} pacientes, ~{patients * args.checkins} check-ins"
+        f" em {elapsed:.1f} s (senha: {SYNTHETIC_PASSWORD})"
+    )
@@ -39,29 +39,13 @@ export default function DashboardPage() {
 
   const fetchStats = async () => {
     try {
-      const [patientsRes, checkinsRes] = await Promise.all([
-        api.get('/patients?limit=1000'),
-        api.get('/checkins?limit=1000'),
-      ])
-
-      const patients = patientsRes.data
-      const checkins = checkinsRes.data
-
-      const now = new Date()
-      const upcoming = checkins.filter((c: any) => {
-        if (!c.next_return_date) return false
-        const returnDate = new Date(c.next_return_date)
-        return returnDate >= now && returnDate <= new Date(now.getTime() + 7 * 24 * 60 * 60 * 1000)
-      })
+      const response = await api.get('/dashboard/stats?upcoming_days=7&recent_days=30')
+      const data = response.data
 
       setStats({
-        total_patients: patients.length,
-        upcoming_returns: upcoming.length,
-        recent_checkins: checkins.filter((c: any) => {
-          const date = new Date(c.date)
-          const daysDiff = (now.getTime() - date.getTime()) / (1000 * 60 * 60 * 24)
-          return daysDiff <= 30
-        }).length,
+        total_patients: data.total_patients,
+        upcoming_returns: data.upcoming_returns,
+        recent_checkins: data.recent_checkins,
       })
     } catch (error) {
       console.error('Erro ao buscar estatísticas:', error)
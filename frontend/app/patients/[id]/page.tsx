@@ -24,6 +24,7 @@ interface PatientDetail {
   created_at: string
   updated_at: string
   checkins: CheckIn[]
+  checkins_next_cursor: string | null
 }
 
 interface CheckIn {
@@ -43,13 +44,26 @@ interface CheckIn {
   created_at: string
 }
 
+interface PatientSeries {
+  total: number
+  downsampled: boolean
+  dates: string[]
+  series: Record<string, (number | null)[]>
+}
+
+// Pontos do gráfico; históricos maiores são reduzidos no servidor
+const CHART_POINTS = 200
+
 export default function PatientDetailPage() {
   const { professional, loading: authLoading } = useAuth()
   const router = useRouter()
   const params = useParams()
   const patientId = params.id as string
   const [patient, setPatient] = useState<PatientDetail | null>(null)
+  const [series, setSeries] = useState<PatientSeries | null>(null)
+  const [checkinsCursor, setCheckinsCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
 
   useEffect(() => {
     if (!authLoading && !professional) {
@@ -66,8 +80,15 @@ export default function PatientDetailPage() {
   const fetchPatient = async () => {
     try {
       setLoading(true)
-      const response = await api.get(`/patients/${patientId}`)
+      const [response, seriesResponse] = await Promise.all([
+        api.get(`/patients/${patientId}`),
+        api.get(`/patients/${patientId}/series`, {
+          params: { fields: 'weight_kg,imc', points: CHART_POINTS },
+        }),
+      ])
       setPatient(response.data)
+      setCheckinsCursor(response.data.checkins_next_cursor)
+      setSeries(seriesResponse.data)
     } catch (error) {
       console.error('Erro ao buscar paciente:', error)
       router.push('/patients')
@@ -76,6 +97,25 @@ export default function PatientDetailPage() {
     }
   }
 
+  // O detalhe traz só a primeira página de check-ins; as seguintes vêm da listagem paginada
+  const fetchMoreCheckins = async (cursor: string) => {
+    try {
+      setLoadingMore(true)
+      const response = await api.get(`/checkins/patients/${patientId}/checkins`, {
+        params: { cursor },
+      })
+      setPatient((current) => current && {
+        ...current,
+        checkins: [...current.checkins, ...response.data.items],
+      })
+      setCheckinsCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error('Erro ao buscar consultas:', error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const calculateAge = (birthDate: string) => {
     const today = new Date()
     const birth = new Date(birthDate)
@@ -87,13 +127,11 @@ export default function PatientDetailPage() {
     return age
   }
 
-  const chartData = patient?.checkins
-    .map(c => ({
-      date: formatDate(c.date),
-      imc: c.imc,
-      peso: c.weight_kg,
-    }))
-    .reverse() || []
+  const chartData = series?.dates.map((date, i) => ({
+    date: formatDate(date),
+    imc: series.series.imc[i],
+    peso: series.series.weight_kg[i],
+  })) || []
 
   if (authLoading || loading) {
     return (
@@ -309,6 +347,14 @@ export default function PatientDetailPage() {
                 ))}
               </div>
             )}
+
+            {checkinsCursor && (
+              <div className="mt-6 flex justify-center">
+                <Button variant="outline" disabled={loadingMore} onClick={() => fetchMoreCheckins(checkinsCursor)}>
+                  Carregar mais
+                </Button>
+              </div>
+            )}
           </CardContent>
         </Card>
       </main>
@@ -26,6 +26,7 @@ export default function PatientsPage() {
   const { professional, loading: authLoading } = useAuth()
   const router = useRouter()
   const [patients, setPatients] = useState<Patient[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [search, setSearch] = useState('')
   const [goalFilter, setGoalFilter] = useState('')
@@ -43,16 +44,18 @@ export default function PatientsPage() {
     }
   }, [professional, search, goalFilter, activityFilter])
 
-  const fetchPatients = async () => {
+  const fetchPatients = async (cursor?: string) => {
     try {
-      setLoading(true)
+      if (!cursor) setLoading(true)
       const params = new URLSearchParams()
       if (search) params.append('search', search)
       if (goalFilter) params.append('goal', goalFilter)
       if (activityFilter) params.append('activity_level', activityFilter)
+      if (cursor) params.append('cursor', cursor)
 
       const response = await api.get(`/patients?${params.toString()}`)
-      setPatients(response.data)
+      setPatients(cursor ? [...patients, ...response.data.items] : response.data.items)
+      setNextCursor(response.data.next_cursor)
     } catch (error) {
       console.error('Erro ao buscar pacientes:', error)
     } finally {
@@ -172,6 +175,14 @@ export default function PatientsPage() {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <div className="mt-6 flex justify-center">
+            <Button variant="outline" onClick={() => fetchPatients(nextCursor)}>
+              Carregar mais
+            </Button>
+          </div>
+        )}
       </main>
     </div>
   )